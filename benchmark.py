@@ -0,0 +1,281 @@
+# 재실행(rerun) 지연 시간 벤치마크
+# - streamlit.testing.v1.AppTest로 앱을 화면 없이 실행하고 버튼/필터 조작을 재현
+# - c1_telc_voca.csv와 같은 스키마의 합성 덱(1k/10k/100k/1M 행)에서 측정
+# - 동작별 p50/p95/p99 재실행 시간과 최대 메모리 할당량을 JSON으로 저장
+#
+# 사용 예:
+#   python benchmark.py --sizes 1000,10000 --repeat 30 --output bench.json
+#   python benchmark.py --compare bench_old.json bench.json
+
+import argparse
+import csv
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(APP_DIR, 'woca.py')
+TEMPLATE_PATH = os.path.join(APP_DIR, 'c1_telc_voca.csv')
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+PERCENTILES = (50, 95, 99)
+
+# --- 1) 합성 덱 생성 ---
+def generate_deck(path: str, rows: int, template_path: str = TEMPLATE_PATH) -> None:
+    """원본 단어장의 행을 반복해 rows 행짜리 CSV를 만듭니다 (단어는 반복 회차를 붙여 고유하게)."""
+    with open(template_path, encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        template = [row for row in reader if any(row)]
+    word_col = header.index('german_word')
+
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for i in range(rows):
+            lap, offset = divmod(i, len(template))
+            row = template[offset]
+            if lap:
+                row = list(row)
+                row[word_col] = f"{row[word_col]} {lap}"
+            writer.writerow(row)
+
+# --- 2) 앱 조작 ---
+def find_button(at, label: str):
+    for button in at.button:
+        if button.label == label:
+            return button
+    raise LookupError(f"button not found: {label}")
+
+def find_multiselect(at, label: str):
+    for widget in at.multiselect:
+        if widget.label == label:
+            return widget
+    raise LookupError(f"multiselect not found: {label}")
+
+def click(label: str) -> Callable:
+    def action(at) -> None:
+        find_button(at, label).click()
+    return action
+
+def toggle_pos_filter(at) -> None:
+    """품사 필터를 첫 번째 품사 <-> 전체로 번갈아 바꿉니다."""
+    widget = find_multiselect(at, "품사 선택")
+    if widget.value == ['전체']:
+        widget.set_value([widget.options[1]])
+    else:
+        widget.set_value(['전체'])
+
+def mark_difficult(at) -> None:
+    find_button(at, "😅 어려워요").click()
+    at.run()
+
+def leave_review(at) -> None:
+    for button in at.button:
+        if button.label == "📚 전체 카드로":
+            button.click()
+            at.run()
+            return
+
+# (이름, 측정 전 준비, 측정할 조작, 측정 후 정리)
+ACTIONS: List[Tuple[str, Optional[Callable], Callable, Optional[Callable]]] = [
+    ('next', None, click("➡️ 다음"), None),
+    ('previous', None, click("⬅️ 이전"), None),
+    ('flip', None, click("🔄 문제/정답 전환"), None),
+    ('first', None, click("⏮️ 처음"), None),
+    ('shuffle', None, click("🔀 카드 섞기"), None),
+    ('filter', None, toggle_pos_filter, None),
+    ('difficult_only', mark_difficult, click("🎯 어려운 카드만"), leave_review),
+]
+
+def wait_for_prewarm(timeout: float = 120.0) -> None:
+    """카드 HTML 사전 생성 스레드가 측정에 섞이지 않도록 끝날 때까지 기다립니다."""
+    for thread in threading.enumerate():
+        if thread.name.startswith('card-html-prewarm-'):
+            thread.join(timeout)
+
+def timed_run(at) -> float:
+    start = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return elapsed
+
+def new_session(timeout: float):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    at.query_params['uid'] = 'benchmark'
+    return at
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    values = np.asarray(samples) * 1000.0
+    summary = {f'p{q}_ms': round(float(np.percentile(values, q)), 3) for q in PERCENTILES}
+    summary['mean_ms'] = round(float(values.mean()), 3)
+    summary['samples'] = len(samples)
+    return summary
+
+def max_rss_bytes() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KiB, macOS는 바이트 단위
+    return int(rss if sys.platform == 'darwin' else rss * 1024)
+
+# --- 3) 덱 하나 측정 ---
+def bench_deck(rows: int, repeat: int, timeout: float) -> Dict:
+    """합성 덱 하나에 대해 콜드/웜 시작과 동작별 재실행 시간을 측정합니다."""
+    with tempfile.TemporaryDirectory(prefix='woca-bench-') as workdir:
+        deck_path = os.path.join(workdir, 'deck.csv')
+        start = time.perf_counter()
+        generate_deck(deck_path, rows)
+        generate_seconds = time.perf_counter() - start
+
+        os.environ['WOCA_DECK_PATH'] = deck_path
+        os.environ['WOCA_PROGRESS_DB'] = os.path.join(workdir, 'progress.sqlite3')
+
+        # 콜드 시작: CSV 파싱 + 인덱스 생성 + 스냅샷 저장
+        at = new_session(timeout)
+        cold_seconds = timed_run(at)
+        wait_for_prewarm()
+        # 웜 시작: 프로세스 캐시를 공유하는 새 세션
+        at = new_session(timeout)
+        warm_seconds = timed_run(at)
+        wait_for_prewarm()
+
+        samples: Dict[str, List[float]] = {name: [] for name, _, _, _ in ACTIONS}
+        for _ in range(repeat):
+            for name, prepare, action, cleanup in ACTIONS:
+                if prepare:
+                    prepare(at)
+                action(at)
+                samples[name].append(timed_run(at))
+                if cleanup:
+                    cleanup(at)
+
+        # 메모리는 추적 오버헤드가 지연 시간에 섞이지 않도록 별도 1회 실행으로 측정
+        peaks: Dict[str, int] = {}
+        tracemalloc.start()
+        try:
+            for name, prepare, action, cleanup in ACTIONS:
+                if prepare:
+                    prepare(at)
+                action(at)
+                baseline = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                timed_run(at)
+                peaks[name] = tracemalloc.get_traced_memory()[1] - baseline
+                if cleanup:
+                    cleanup(at)
+        finally:
+            tracemalloc.stop()
+
+    actions = {}
+    for name, values in samples.items():
+        actions[name] = summarize(values)
+        actions[name]['peak_alloc_bytes'] = peaks[name]
+    return {
+        'rows': rows,
+        'generate_seconds': round(generate_seconds, 3),
+        'cold_start_seconds': round(cold_seconds, 3),
+        'warm_start_seconds': round(warm_seconds, 3),
+        'actions': actions,
+        'max_rss_bytes': max_rss_bytes(),
+    }
+
+# --- 4) 결과 저장/비교 ---
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=APP_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment_info() -> Dict:
+    import streamlit
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'streamlit': streamlit.__version__,
+        'platform': platform.platform(),
+    }
+
+def run_isolated(rows: int, repeat: int, timeout: float) -> Dict:
+    """덱 크기마다 새 프로세스에서 측정합니다 (캐시/메모리 최대치가 서로 섞이지 않도록)."""
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+        result_path = f.name
+    try:
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--single',
+                        '--sizes', str(rows), '--repeat', str(repeat),
+                        '--timeout', str(timeout), '--output', result_path],
+                       cwd=APP_DIR, check=True)
+        with open(result_path, encoding='utf-8') as f:
+            return json.load(f)['results'][str(rows)]
+    finally:
+        os.remove(result_path)
+
+def compare(baseline_path: str, current_path: str, threshold: float = 1.1) -> int:
+    """두 결과 파일의 p95를 비교해 출력하고, threshold배 이상 느려진 항목 수를 반환합니다."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)['results']
+    with open(current_path, encoding='utf-8') as f:
+        current = json.load(f)['results']
+
+    regressions = 0
+    for rows in sorted(set(baseline) & set(current), key=int):
+        for name, stats in current[rows]['actions'].items():
+            before = baseline[rows]['actions'].get(name)
+            if not before:
+                continue
+            ratio = stats['p95_ms'] / max(before['p95_ms'], 1e-9)
+            flag = ' <-- regression' if ratio >= threshold else ''
+            regressions += bool(flag)
+            print(f"{int(rows):>9,} {name:<15} p95 {before['p95_ms']:>9.2f} -> {stats['p95_ms']:>9.2f} ms "
+                  f"({ratio:.2f}x){flag}")
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="woca.py 재실행 지연 시간 벤치마크")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="쉼표로 구분한 합성 덱 행 수")
+    parser.add_argument('--repeat', type=int, default=20, help="동작별 측정 횟수")
+    parser.add_argument('--timeout', type=float, default=600.0, help="재실행 1회 제한 시간(초)")
+    parser.add_argument('--output', default='benchmark_results.json', help="결과 JSON 경로")
+    parser.add_argument('--single', action='store_true', help="현재 프로세스에서 바로 측정")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help="두 결과 파일을 비교합니다")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return 1 if compare(*args.compare) else 0
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    results = {}
+    for rows in sizes:
+        print(f"benchmarking {rows:,} rows...", file=sys.stderr)
+        if args.single:
+            results[str(rows)] = bench_deck(rows, args.repeat, args.timeout)
+        else:
+            results[str(rows)] = run_isolated(rows, args.repeat, args.timeout)
+
+    report = {'environment': environment_info(), 'repeat': args.repeat, 'results': results}
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"wrote {args.output}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+# 단어장 CSV 오프라인 컴파일러
+# - c1_telc_voca.csv 스키마의 CSV를 앱이 바로 읽는 덱 스냅샷(CSV 옆의 *.deck.pkl)으로 만듭니다.
+# - 앱과 같은 적재 모듈(deck_store.ingest_csv)의 컬럼 매핑/정리 규칙을 쓰고, 필터/검색/오답 보기/입력 채점 인덱스와 문법 주석까지 미리 계산
+# - 여러 파일은 프로세스 풀에서 병렬로 처리하고 파일별 소요 시간과 검증 결과를 출력
+#
+# 사용 예:
+#   python compile_decks.py c1_telc_voca.csv
+#   python compile_decks.py decks/*.csv --jobs 8
+#   python compile_decks.py decks/*.csv --check     # 검증만 하고 스냅샷은 쓰지 않음
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+# 단계 -> 오류 메시지에 쓰는 설명
+PHASE_ACTIONS = {
+    'fingerprint': "CSV 파일을 읽는",
+    'ingest': "CSV 파일을 읽는",
+    'indexes': "인덱스를 만드는",
+    'write': "스냅샷을 쓰는",
+}
+
+def compile_deck(path: str, write: bool = True) -> Dict[str, object]:
+    """CSV 하나를 컴파일하고 결과(단계별 시간, 오류/경고)를 반환합니다."""
+    result = {'path': path, 'ok': False, 'rows': 0, 'version': None,
+              'timings': {}, 'errors': [], 'warnings': []}
+    timings = result['timings']
+
+    # 적재 모듈은 Streamlit 없이 동작하므로 앱(woca.py)을 실행하지 않습니다.
+    start = time.perf_counter()
+    import deck_store
+    timings['import'] = round(time.perf_counter() - start, 4)
+
+    def timed(phase: str, func, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            timings[phase] = round(time.perf_counter() - start, 4)
+
+    # 어느 단계에서 실패해도 이 파일의 오류로 보고하고 다른 파일의 컴파일은 계속합니다.
+    try:
+        fingerprint = timed('fingerprint', deck_store.source_fingerprint, path)
+        store = timed('ingest', deck_store.ingest_csv, path)
+        timed('indexes', deck_store.build_indexes, store, True)
+        result['warnings'] = validate_store(store)
+        result['rows'] = len(store)
+        result['version'] = store.version
+
+        if write:
+            if not timed('write', deck_store.write_snapshot, store, path, fingerprint):
+                result['errors'].append(f"스냅샷을 쓸 수 없습니다: {deck_store.snapshot_path(path)}")
+                return result
+            result['snapshot'] = deck_store.snapshot_path(path)
+    except (OSError, deck_store.DeckFormatError) as e:
+        result['errors'].append(str(e))
+        return result
+    except Exception as e:
+        # timed()는 실패한 단계의 시간도 기록하므로 마지막 단계가 실패한 단계
+        phase = next(reversed(timings))
+        result['errors'].append(f"{PHASE_ACTIONS.get(phase, phase)} 중 오류가 발생했습니다: {e}")
+        return result
+    result['ok'] = True
+    return result
+
+def validate_store(store) -> List[str]:
+    """적재는 되지만 학습에 문제가 되는 행을 찾습니다."""
+    warnings = []
+    for field in ('german_word', 'korean_meaning'):
+        empty = [card_id for card_id, value in enumerate(store.columns[field]) if not value]
+        if empty:
+            warnings.append(f"{field} 값이 빈 행 {len(empty)}개 (예: {format_rows(empty)})")
+    duplicates = [card_id for card_id, key in enumerate(store.keys) if '-' in key]
+    if duplicates:
+        warnings.append(f"단어+의미가 중복된 행 {len(duplicates)}개 (예: {format_rows(duplicates)})")
+    missing = [field for field in ('german_example', 'pos', 'theme') if field not in store.fields]
+    if missing:
+        warnings.append(f"선택 컬럼 없음: {', '.join(missing)}")
+    return warnings
+
+def format_rows(card_ids: List[int], limit: int = 5) -> str:
+    """카드 ID를 CSV 행 번호(헤더 = 1행)로 보여 줍니다."""
+    rows = ', '.join(str(card_id + 2) for card_id in card_ids[:limit])
+    return rows + (' ...' if len(card_ids) > limit else '')
+
+def compile_all(paths: List[str], jobs: int, write: bool = True):
+    """여러 파일을 병렬로 컴파일하고 입력 순서대로 결과를 돌려줍니다."""
+    if jobs <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield compile_deck(path, write)
+        return
+    with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+        futures = [pool.submit(compile_deck, path, write) for path in paths]
+        for future in futures:
+            yield future.result()
+
+def print_result(result: Dict[str, object]) -> None:
+    timings = result['timings']
+    # 작업 프로세스마다 한 번뿐인 import 시간은 파일별 합계에서 제외
+    total = sum(seconds for phase, seconds in timings.items() if phase != 'import')
+    status = 'ok' if result['ok'] else 'FAILED'
+    detail = ' '.join(f"{phase} {seconds:.3f}s" for phase, seconds in timings.items())
+    print(f"{status:<6} {result['path']}: {result['rows']:,} rows, {total:.3f}s ({detail})")
+    for error in result['errors']:
+        print(f"  error: {error}")
+    for warning in result['warnings']:
+        print(f"  warning: {warning}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="단어장 CSV를 덱 스냅샷으로 컴파일합니다")
+    parser.add_argument('paths', nargs='+', help="컴파일할 CSV 파일")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help="동시에 처리할 프로세스 수")
+    parser.add_argument('--check', action='store_true', help="검증만 하고 스냅샷은 쓰지 않음")
+    parser.add_argument('--json', action='store_true', help="결과를 JSON lines로 출력")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    failed = 0
+    for result in compile_all(args.paths, args.jobs, write=not args.check):
+        failed += not result['ok']
+        if args.json:
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+        else:
+            print_result(result)
+    print(f"{len(args.paths) - failed}/{len(args.paths)} decks compiled in "
+          f"{time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,432 @@
+# 단어장 적재 / 파생 인덱스 / 덱 스냅샷
+# - CSV를 청크 단위로 읽어 필드별 병렬 배열 저장소(CardStore)로 적재
+# - 필터 마스크, 오답 보기, 입력 채점, 검색 인덱스를 만들어 저장소에 붙임
+# - 정리된 저장소와 인덱스를 CSV 옆의 스냅샷(*.deck.pkl)으로 저장하고 다시 읽음
+# - 앱(woca.py)과 오프라인 컴파일러(compile_decks.py)가 함께 사용
+# - Streamlit에 의존하지 않으므로 단독으로 테스트할 수 있습니다.
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from distractors import DistractorIndex
+from grammar import CardGrammar, GrammarAnnotations, REFLEXIVE_TRUE_VALUES
+from recall import RecallIndex
+from search_index import FuzzyIndex, SearchIndex
+from timing import phase_timer
+
+if TYPE_CHECKING:
+    # pandas는 CSV 적재가 필요할 때만 불러옵니다 (스냅샷 사용 시 불필요).
+    import pandas as pd
+
+# 컬럼 매핑 후보들
+COLUMN_CANDIDATES = {
+    'german_word': ['german_word', 'german', 'word', 'item', 'deutsch', 'wort'],
+    'korean_meaning': ['korean_meaning', 'korean', 'meaning', 'bedeutung', '의미', '뜻'],
+    'german_example': ['german_example_de', 'german_example', 'example', 'beispiel', '예문', '예시'],
+    'ko_example_translation': ['ko_example_translation', 'example_ko', '예문_번역', '예문해석', 'korean_example'],
+    'pos': ['pos', 'part of speech', 'wortart', '품사'],
+    'verb_case': ['verb_case', 'kasus (verb)', 'case'],
+    'verb_prep': ['verb_prep', 'präposition (verb)', 'preposition'],
+    'reflexive': ['reflexive', 'reflexiv', '재귀'],
+    'complement_structure': ['complement_structure', 'struktur', '문장 구조', 'structure'],
+    'theme': ['theme', 'type', 'category', 'thema', 'kategorie', '테마', '유형'],
+    'adj_prep': ['adj_prep', 'präposition (adjektiv)'],
+    'adj_case': ['adj_case', 'kasus (adjektiv)'],
+}
+REQUIRED_COLUMNS = ('german_word', 'korean_meaning')
+
+class DeckFormatError(ValueError):
+    """단어장 CSV를 카드 저장소로 만들 수 없을 때 (빈 파일, 필수 컬럼 없음)"""
+
+def map_columns(columns) -> Dict[str, str]:
+    """표준 필드 -> 원본 컬럼명 매핑을 만듭니다 (대소문자/앞뒤 공백 무시)."""
+    columns = list(columns)
+    cols_lower = [str(c).lower().strip() for c in columns]
+    mapping = {}
+    for standard_name, candidates in COLUMN_CANDIDATES.items():
+        for candidate in candidates:
+            if candidate in cols_lower:
+                mapping[standard_name] = columns[cols_lower.index(candidate)]
+                break
+    return mapping
+
+# 컴파일된 카드 저장소
+# 렌더링 경로에서 pandas 행 접근(iloc + 값 정리)을 없애기 위해
+# 표준 필드를 미리 정리해 필드별 병렬 배열로 보관합니다.
+CARD_FIELDS = (
+    'german_word', 'korean_meaning', 'german_example', 'ko_example_translation',
+    'pos', 'verb_case', 'verb_prep', 'reflexive', 'complement_structure', 'theme',
+    'adj_prep', 'adj_case',
+)
+
+class Card:
+    """카드 한 장의 정리된 필드 값과 문법 주석 (읽기 전용 뷰)"""
+    __slots__ = ('card_id', 'grammar') + CARD_FIELDS
+
+    def __init__(self, card_id: int, values: Tuple[str, ...], grammar: CardGrammar):
+        self.card_id = card_id
+        self.grammar = grammar
+        for field, value in zip(CARD_FIELDS, values):
+            setattr(self, field, value)
+
+def compute_deck_version(columns: Dict[str, List[str]], fields: Tuple[str, ...]) -> str:
+    """정리된 필드 내용으로부터 덱 버전(내용 해시)을 계산합니다."""
+    digest = hashlib.blake2b(digest_size=8)
+    for field in CARD_FIELDS:
+        digest.update(f"{field}:{field in fields}\x1e".encode('utf-8'))
+        values = columns[field]
+        # 큰 덱에서도 임시 문자열이 커지지 않도록 구간별로 해시
+        for start in range(0, len(values), INGEST_CHUNK_ROWS):
+            if start:
+                digest.update(b'\x1f')
+            digest.update('\x1f'.join(values[start:start + INGEST_CHUNK_ROWS]).encode('utf-8'))
+    return digest.hexdigest()
+
+def compute_card_keys(columns: Dict[str, List[str]]) -> List[str]:
+    """단어+의미 내용 해시로 덱 버전과 무관한 카드 키를 만듭니다 (중복 항목은 순번 접미사)."""
+    keys = []
+    occurrences = {}
+    for word, meaning in zip(columns['german_word'], columns['korean_meaning']):
+        key = hashlib.blake2b(f"{word}\x1f{meaning}".encode('utf-8'), digest_size=8).hexdigest()
+        seen = occurrences.get(key, 0)
+        occurrences[key] = seen + 1
+        keys.append(key if seen == 0 else f"{key}-{seen}")
+    return keys
+
+def compute_key_hashes(keys: List[str]) -> np.ndarray:
+    """카드 키를 64비트 정수로 바꿉니다 (중복 접미사는 황금비 상수 배수로 구분)."""
+    hashes = np.empty(len(keys), dtype=np.uint64)
+    for card_id, key in enumerate(keys):
+        value = int(key[:16], 16)
+        if len(key) > 16:
+            value = (value + int(key[17:]) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        hashes[card_id] = value
+    return hashes
+
+class CardStore:
+    """정수 카드 ID로 접근하는 필드별 병렬 배열 저장소"""
+    __slots__ = ('size', 'columns', 'fields', 'version', 'keys', 'key_index', 'key_hashes', 'grammar', 'indexes')
+
+    def __init__(self, columns: Dict[str, List[str]], size: int, fields: Tuple[str, ...], version: str,
+                 keys: List[str], key_index: Dict[str, int], key_hashes: np.ndarray,
+                 grammar: GrammarAnnotations, indexes: Optional[Dict[str, object]] = None):
+        # 파생 값은 CardStoreBuilder에서 한 번 계산하고 스냅샷에 그대로 저장합니다 (복원 시 재계산 없음).
+        self.size = size
+        self.columns = columns
+        self.fields = fields
+        self.version = version
+        self.keys = keys
+        # 안정 카드 키 -> 행(카드 ID) 색인과 순서 계산용 키 해시
+        self.key_index = key_index
+        self.key_hashes = key_hashes
+        # 문법 주석 (렌더링은 이 값만 읽음)
+        self.grammar = grammar
+        # 스냅샷에 함께 저장된 파생 인덱스 ('filter', 'distractors', 'recall', 'search', 'fuzzy')
+        self.indexes = indexes if indexes is not None else {}
+
+    def __len__(self) -> int:
+        return self.size
+
+    def get(self, card_id: int) -> Card:
+        """카드 ID에 해당하는 카드 뷰를 반환합니다."""
+        return Card(card_id, tuple(self.columns[field][card_id] for field in CARD_FIELDS),
+                    self.grammar.get(card_id))
+
+    def value(self, card_id: int, field: str) -> str:
+        """단일 필드 값을 반환합니다."""
+        return self.columns[field][card_id]
+
+class CardStoreBuilder:
+    """정리된 청크를 이어 붙여 CardStore를 만드는 빌더"""
+    # 값 종류가 적은 필드는 같은 문자열 객체를 공유해 메모리를 줄입니다.
+    SHARED_VALUE_FIELDS = ('pos', 'verb_case', 'verb_prep', 'reflexive', 'complement_structure', 'theme')
+
+    def __init__(self, mapping: Dict[str, str]):
+        self.mapping = mapping
+        self.fields = tuple(field for field in CARD_FIELDS if field in mapping)
+        self.columns = {field: [] for field in CARD_FIELDS}
+        self.shared_values = {field: {} for field in self.SHARED_VALUE_FIELDS}
+        self.size = 0
+
+    @phase_timer.timed('ingest_chunk')
+    def append(self, chunk: pd.DataFrame) -> None:
+        """청크 하나를 정리해 각 필드 배열 뒤에 붙입니다."""
+        rows = len(chunk)
+        for field in CARD_FIELDS:
+            column = self.columns[field]
+            if field not in self.mapping:
+                column.extend([''] * rows)
+                continue
+            values = chunk[self.mapping[field]].fillna('').astype(str).str.strip()
+            values = values.mask(values.isin(['nan', 'None']), '')
+            if field in self.shared_values:
+                shared = self.shared_values[field]
+                column.extend(shared.setdefault(value, value) for value in values.tolist())
+            else:
+                column.extend(values.tolist())
+        self.size += rows
+
+    def build(self) -> CardStore:
+        """카드 키/색인/해시, 덱 버전, 문법 주석을 계산해 저장소를 만듭니다."""
+        keys = compute_card_keys(self.columns)
+        return CardStore(
+            self.columns, self.size, self.fields,
+            version=compute_deck_version(self.columns, self.fields),
+            keys=keys,
+            key_index={key: card_id for card_id, key in enumerate(keys)},
+            key_hashes=compute_key_hashes(keys),
+            grammar=GrammarAnnotations.build(self.columns, self.size),
+        )
+
+INGEST_CHUNK_ROWS = 50000
+
+@phase_timer.timed()
+def ingest_csv(file_path: str, chunk_rows: int = INGEST_CHUNK_ROWS, on_progress=None) -> CardStore:
+    """CSV를 청크 단위로 읽어 정리하면서 저장소에 바로 적재합니다.
+    
+    한 번에 한 청크만 DataFrame으로 존재하므로 최대 메모리가 입력 크기와 무관하게 제한됩니다.
+    on_progress(진행률 0~1, 적재된 행 수)로 진행 상황을 알립니다.
+    파일 오류는 OSError, 형식 오류는 DeckFormatError로 알립니다.
+    """
+    import pandas as pd
+    total_bytes = max(1, os.path.getsize(file_path))
+    builder = None
+    with open(file_path, 'rb') as f:
+        try:
+            reader = pd.read_csv(f, encoding='utf-8-sig', dtype=str, chunksize=chunk_rows)
+        except pd.errors.EmptyDataError:
+            reader = ()
+        for chunk in reader:
+            chunk.columns = chunk.columns.str.strip()
+            if builder is None:
+                mapping = map_columns(chunk.columns)
+                missing = [required for required in REQUIRED_COLUMNS if required not in mapping]
+                if missing:
+                    raise DeckFormatError(f"필수 컬럼이 없습니다: {', '.join(missing)}")
+                builder = CardStoreBuilder(mapping)
+            
+            # 빈 행 제거 후 적재
+            builder.append(chunk.dropna(how='all'))
+            if on_progress is not None:
+                on_progress(min(1.0, f.tell() / total_bytes), builder.size)
+    
+    if builder is None:
+        raise DeckFormatError(f"데이터 파일 '{file_path}'이(가) 비어 있습니다.")
+    return builder.build()
+
+# 필터 인덱스 (불리언 마스크)
+# 품사/테마 값별, 플래그별 마스크를 로드 시 한 번 만들어 두고
+# 필터 조합은 마스크 교집합으로만 계산합니다 (복사/문자열 연산 없음).
+GRAMMAR_FIELDS = ('verb_case', 'verb_prep', 'complement_structure')
+
+class FilterIndex:
+    """필터 조합을 마스크 연산으로 처리하는 인덱스"""
+    __slots__ = ('size', 'value_masks', 'flag_masks')
+
+    def __init__(self, size: int, value_masks: Dict[str, Dict[str, np.ndarray]],
+                 flag_masks: Dict[str, np.ndarray]):
+        self.size = size
+        self.value_masks = value_masks
+        self.flag_masks = flag_masks
+
+    @classmethod
+    def from_store(cls, store: CardStore) -> "FilterIndex":
+        """카드 저장소로부터 값별/플래그별 마스크를 생성합니다."""
+        size = len(store)
+        mapping = store.fields
+
+        value_masks = {}
+        for field in ('pos', 'theme'):
+            value_masks[field] = {}
+            if field not in mapping:
+                continue
+            value_codes: Dict[str, int] = {}
+            codes = np.fromiter((value_codes.setdefault(v, len(value_codes)) for v in store.columns[field]),
+                                dtype=np.int32, count=size)
+            for value, code in value_codes.items():
+                if value:
+                    value_masks[field][value] = codes == code
+
+        def non_empty(field: str) -> np.ndarray:
+            return np.fromiter((bool(v) for v in store.columns[field]), dtype=bool, count=size)
+
+        # 매핑에 없는 컬럼의 플래그는 None (필터를 적용하지 않음)
+        flag_masks = {'reflexive': None, 'with_examples': None,
+                      'with_grammar': None, 'with_translation': None}
+        if 'reflexive' in mapping:
+            flag_masks['reflexive'] = np.fromiter(
+                (v.lower() in REFLEXIVE_TRUE_VALUES for v in store.columns['reflexive']),
+                dtype=bool, count=size
+            )
+        if 'german_example' in mapping:
+            flag_masks['with_examples'] = non_empty('german_example')
+        grammar_fields = [f for f in GRAMMAR_FIELDS if f in mapping]
+        if grammar_fields:
+            grammar_mask = np.zeros(size, dtype=bool)
+            for field in grammar_fields:
+                grammar_mask |= non_empty(field)
+            flag_masks['with_grammar'] = grammar_mask
+        if 'ko_example_translation' in mapping:
+            flag_masks['with_translation'] = non_empty('ko_example_translation')
+
+        return cls(size, value_masks, flag_masks)
+
+    def values(self, field: str) -> List[str]:
+        """필드의 고유값 목록(정렬)을 반환합니다."""
+        return sorted(self.value_masks.get(field, {}))
+
+    def union(self, field: str, selected: List[str]) -> Optional[np.ndarray]:
+        """선택한 값들의 마스크 합집합 ('전체'/미선택/미매핑이면 None)"""
+        masks = self.value_masks.get(field)
+        if not masks or not selected or '전체' in selected:
+            return None
+        result = np.zeros(self.size, dtype=bool)
+        for value in selected:
+            mask = masks.get(value)
+            if mask is not None:
+                result |= mask
+        return result
+
+    def counts(self, field: str, card_ids: Optional[np.ndarray] = None) -> Dict[str, int]:
+        """주어진 카드 ID 범위 안에서 필드 값별 카드 수를 반환합니다 (내림차순)."""
+        counts = {}
+        for value, value_mask in self.value_masks.get(field, {}).items():
+            count = int(np.count_nonzero(value_mask if card_ids is None else value_mask[card_ids]))
+            if count:
+                counts[value] = count
+        return dict(sorted(counts.items(), key=lambda item: item[1], reverse=True))
+
+@phase_timer.timed()
+def build_indexes(store: CardStore, search: bool = False) -> None:
+    """파생 인덱스를 미리 만들어 저장소에 붙입니다 (스냅샷에 함께 저장됩니다)."""
+    if 'filter' not in store.indexes:
+        store.indexes['filter'] = FilterIndex.from_store(store)
+    if 'distractors' not in store.indexes:
+        store.indexes['distractors'] = DistractorIndex.build(store.columns, len(store))
+    if 'recall' not in store.indexes:
+        store.indexes['recall'] = RecallIndex.build(store.columns, len(store))
+    if search and 'search' not in store.indexes:
+        store.indexes['search'] = SearchIndex.build(store.columns, len(store))
+        store.indexes['fuzzy'] = FuzzyIndex.build(store.columns['german_word'])
+
+# 덱 스냅샷 (컴파일된 카드 저장소 캐시 파일)
+# CSV 옆에 정리된 카드 저장소를 바이너리로 저장해 두고, 원본 파일의
+# 크기/수정시각(바뀌었으면 내용 해시)이 같으면 CSV 파싱 없이 재사용합니다.
+SNAPSHOT_FORMAT_VERSION = 8
+
+def snapshot_path(file_path: str) -> str:
+    """CSV 파일에 대응하는 스냅샷 경로를 반환합니다."""
+    root, _ = os.path.splitext(file_path)
+    return root + '.deck.pkl'
+
+def file_digest(file_path: str) -> str:
+    """파일 내용 해시를 계산합니다."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def source_fingerprint(file_path: str, with_digest: bool = True) -> Dict[str, any]:
+    """원본 파일의 크기/수정시각/내용 해시를 반환합니다."""
+    stat = os.stat(file_path)
+    return {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'digest': file_digest(file_path) if with_digest else None,
+    }
+
+def store_from_payload(payload: Dict[str, any]) -> CardStore:
+    """스냅샷 내용으로 카드 저장소를 복원합니다."""
+    return CardStore(payload['columns'], payload['size'], payload['fields'], payload['version'],
+                     payload['keys'], payload['key_index'], payload['key_hashes'], payload['grammar'],
+                     payload['indexes'])
+
+def write_snapshot(store: CardStore, file_path: str, fingerprint: Dict[str, any]) -> bool:
+    """카드 저장소를 스냅샷 파일로 원자적으로 기록합니다."""
+    path = snapshot_path(file_path)
+    payload = {
+        'format': SNAPSHOT_FORMAT_VERSION,
+        'source': fingerprint,
+        'size': store.size,
+        'fields': store.fields,
+        'version': store.version,
+        'columns': store.columns,
+        'keys': store.keys,
+        'key_index': store.key_index,
+        'key_hashes': store.key_hashes,
+        'grammar': store.grammar,
+        'indexes': store.indexes,
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        return True
+    except OSError:
+        # 읽기 전용 배포 환경 등에서는 스냅샷 없이 계속 진행
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
+
+@phase_timer.timed()
+def read_snapshot(file_path: str) -> Optional[CardStore]:
+    """원본이 바뀌지 않았다면 스냅샷에서 카드 저장소를 복원합니다."""
+    path = snapshot_path(file_path)
+    try:
+        with open(path, 'rb') as f:
+            payload = pickle.load(f)
+        if payload.get('format') != SNAPSHOT_FORMAT_VERSION:
+            return None
+        
+        source = payload['source']
+        current = source_fingerprint(file_path, with_digest=False)
+        if (current['size'], current['mtime_ns']) != (source['size'], source['mtime_ns']):
+            # 배포/체크아웃으로 수정시각만 바뀐 경우 내용 해시로 확인
+            if current['size'] != source['size'] or file_digest(file_path) != source['digest']:
+                return None
+            current['digest'] = source['digest']
+            store = store_from_payload(payload)
+            write_snapshot(store, file_path, current)
+            return store
+        
+        return store_from_payload(payload)
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError, TypeError, AttributeError):
+        return None
+
+def load_or_build(file_path: str, on_progress=None, search: bool = False) -> CardStore:
+    """스냅샷이 유효하면 재사용하고, 아니면 CSV를 적재해 인덱스와 스냅샷을 만듭니다.
+
+    search=True이면 검색/유사 철자 인덱스까지 만들어 둡니다.
+    파일 오류는 OSError, 형식 오류는 DeckFormatError로 알립니다.
+    """
+    store = read_snapshot(file_path)
+    if store is not None:
+        if search and 'search' not in store.indexes:
+            # 다음 프로세스가 다시 만들지 않도록 검색 인덱스를 넣어 스냅샷을 다시 씀
+            build_indexes(store, search=True)
+            try:
+                write_snapshot(store, file_path, source_fingerprint(file_path))
+            except OSError:
+                pass
+        return store
+
+    try:
+        fingerprint = source_fingerprint(file_path)
+    except OSError:
+        fingerprint = None
+
+    store = ingest_csv(file_path, on_progress=on_progress)
+    build_indexes(store, search=search)
+    if fingerprint is not None:
+        write_snapshot(store, file_path, fingerprint)
+    return store
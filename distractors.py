@@ -0,0 +1,185 @@
+# 객관식 오답 보기 인덱스
+# - 카드마다 가까운 카드 k개를 덱 적재/컴파일 때 한 번 계산해 두고, 문제는 이 배열에서 O(1)로 만듭니다.
+# - 가까움: 같은 품사 안에서 독일어 철자(문자 3-gram)와 한국어 뜻(문자 1/2-gram) TF-IDF의
+#   코사인 유사도, 같은 테마면 가산점. 뜻이나 단어가 같은 카드는 오답 후보에서 제외
+# - n-gram은 고정 차원으로 해싱하고 블록 단위 행렬곱으로 계산 (NumPy만 사용)
+# - Streamlit에 의존하지 않으므로 단독으로 테스트할 수 있습니다.
+
+import random
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from search_index import LEADING_ARTICLE_PATTERN, fold_text
+
+FEATURE_DIM = 256       # 철자/뜻 각각의 해시 차원
+NEIGHBOURS = 8          # 카드당 보관하는 오답 후보 수
+BLOCK_SIZE = 2048       # 한 번에 비교하는 카드 수 (큰 품사 그룹은 이 크기로 나눠 비교)
+MIN_GROUP_SIZE = 32     # 이보다 작은 품사 그룹은 하나로 합쳐 비교
+WORD_WEIGHT = 0.5       # 철자 유사도 비중 (나머지는 뜻)
+THEME_BONUS = 0.15
+
+def char_ngrams(text: str, n: int) -> List[str]:
+    """앞뒤에 공백을 붙인 문자 n-gram 목록"""
+    if not text:
+        return []
+    padded = f" {text} "
+    return [padded[i:i + n] for i in range(len(padded) - n + 1)]
+
+def word_features(word: str) -> List[str]:
+    return char_ngrams(LEADING_ARTICLE_PATTERN.sub('', fold_text(word).strip()), 3)
+
+def meaning_features(meaning: str) -> List[str]:
+    text = ' '.join(meaning.split())
+    return [ch for ch in text if ch != ' '] + char_ngrams(text, 2)
+
+def hashed_tfidf(texts: List[str], featurize: Callable[[str], List[str]], dim: int,
+                 weight: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """해싱한 n-gram TF-IDF의 (행, 열, 값) - 행마다 L2 정규화 후 weight배"""
+    size = len(texts)
+    buckets: Dict[str, int] = {}
+    rows: List[int] = []
+    cols: List[int] = []
+    for row, text in enumerate(texts):
+        for gram in featurize(text):
+            bucket = buckets.get(gram)
+            if bucket is None:
+                bucket = buckets[gram] = zlib.crc32(gram.encode('utf-8')) % dim
+            rows.append(row)
+            cols.append(bucket)
+    if not rows:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0, dtype=np.float32)
+
+    # 같은 칸에 떨어진 n-gram은 합산 (tf)
+    cells, tf = np.unique(np.array(rows, dtype=np.int64) * dim + np.array(cols, dtype=np.int64),
+                          return_counts=True)
+    rows_arr, cols_arr = cells // dim, cells % dim
+    df = np.bincount(cols_arr, minlength=dim)
+    idf = np.log((1.0 + size) / (1.0 + df)) + 1.0
+    values = tf * idf[cols_arr]
+    norms = np.sqrt(np.bincount(rows_arr, weights=values * values, minlength=size))
+    values = values / norms[rows_arr] * weight
+    return rows_arr, cols_arr, values.astype(np.float32)
+
+class FeatureMatrix:
+    """카드별 특징 벡터 (CSR 형식, 필요한 행만 밀집 행렬로 꺼냄)"""
+
+    def __init__(self, rows: np.ndarray, cols: np.ndarray, values: np.ndarray, size: int, dim: int):
+        order = np.argsort(rows, kind='stable')
+        self.cols = cols[order]
+        self.values = values[order]
+        self.indptr = np.searchsorted(rows[order], np.arange(size + 1))
+        self.dim = dim
+
+    def dense(self, card_ids: np.ndarray) -> np.ndarray:
+        starts = self.indptr[card_ids]
+        lengths = self.indptr[card_ids + 1] - starts
+        local_rows = np.repeat(np.arange(len(card_ids)), lengths)
+        # 각 행의 시작 위치 + 행 안에서의 순번
+        positions = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(lengths.sum())
+        matrix = np.zeros((len(card_ids), self.dim), dtype=np.float32)
+        matrix[local_rows, self.cols[positions]] = self.values[positions]
+        return matrix
+
+def factorize(values: List[str]) -> np.ndarray:
+    """문자열 목록을 정수 코드로 바꿉니다 (빈 문자열은 -1)."""
+    codes: Dict[str, int] = {'': -1}
+    return np.fromiter((codes.setdefault(value, len(codes) - 1) for value in values),
+                       dtype=np.int64, count=len(values))
+
+class DistractorIndex:
+    """카드별 오답 후보 카드 ID (가까운 순, 모자라면 -1)"""
+
+    def __init__(self, neighbours: np.ndarray):
+        self.neighbours = neighbours
+
+    @classmethod
+    def build(cls, columns: Dict[str, List[str]], size: int, k: int = NEIGHBOURS) -> "DistractorIndex":
+        neighbours = np.full((size, k), -1, dtype=np.int32)
+        if size < 2:
+            return cls(neighbours)
+
+        word_part = hashed_tfidf(columns['german_word'], word_features, FEATURE_DIM, WORD_WEIGHT)
+        meaning_part = hashed_tfidf(columns['korean_meaning'], meaning_features, FEATURE_DIM, 1.0 - WORD_WEIGHT)
+        features = FeatureMatrix(
+            np.concatenate([word_part[0], meaning_part[0]]),
+            np.concatenate([word_part[1], meaning_part[1] + FEATURE_DIM]),
+            np.concatenate([word_part[2], meaning_part[2]]),
+            size, 2 * FEATURE_DIM
+        )
+        meanings = factorize(columns['korean_meaning'])
+        words = factorize([LEADING_ARTICLE_PATTERN.sub('', fold_text(word).strip()) for word in columns['german_word']])
+        themes = factorize(columns['theme'])
+
+        for block in candidate_blocks(columns['pos'], size):
+            if len(block) < 2:
+                continue
+            matrix = features.dense(block)
+            scores = matrix @ matrix.T
+            block_themes = themes[block]
+            scores += THEME_BONUS * ((block_themes[:, None] == block_themes[None, :]) & (block_themes[:, None] >= 0))
+            # 자기 자신, 뜻이 같은 카드(빈 뜻 포함), 같은 단어의 다른 뜻은 보기로 쓸 수 없음
+            block_meanings = meanings[block]
+            block_words = words[block]
+            scores[(block_meanings[:, None] == block_meanings[None, :]) | (block_meanings[None, :] < 0)
+                   | ((block_words[:, None] == block_words[None, :]) & (block_words[:, None] >= 0))] = -np.inf
+            np.fill_diagonal(scores, -np.inf)
+
+            width = min(k, len(block) - 1)
+            top = np.argpartition(-scores, width - 1, axis=1)[:, :width]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            ranked = np.argsort(-top_scores, axis=1, kind='stable')
+            top = np.take_along_axis(top, ranked, axis=1)
+            valid = np.isfinite(np.take_along_axis(top_scores, ranked, axis=1))
+            neighbours[block, :width] = np.where(valid, block[top], -1)
+        return cls(neighbours)
+
+    def options(self, card_id: int, meanings: List[str], count: int = 4,
+                rng: Optional[random.Random] = None) -> List[int]:
+        """정답 카드를 포함한 보기 카드 ID count개 (섞인 순서, 뜻이 서로 다름)"""
+        rng = rng or random
+        candidates = [int(other) for other in self.neighbours[card_id] if other >= 0]
+        rng.shuffle(candidates)
+        chosen = [card_id]
+        seen = {meanings[card_id]}
+        for other in candidates:
+            if len(chosen) == count:
+                break
+            if meanings[other] not in seen:
+                chosen.append(other)
+                seen.add(meanings[other])
+        # 가까운 카드가 모자라면 임의의 카드로 채움 (시도 횟수 제한)
+        size = len(meanings)
+        for _ in range(20 * count):
+            if len(chosen) == count or size <= 1:
+                break
+            other = rng.randrange(size)
+            if meanings[other] and meanings[other] not in seen:
+                chosen.append(other)
+                seen.add(meanings[other])
+        rng.shuffle(chosen)
+        return chosen
+
+def candidate_blocks(pos_values: List[str], size: int, block_size: int = BLOCK_SIZE) -> List[np.ndarray]:
+    """품사별 카드 ID 그룹 (작은 그룹은 합치고, 큰 그룹은 고정 시드로 섞어 block_size씩 나눔)"""
+    codes = factorize(pos_values)
+    order = np.argsort(codes, kind='stable')
+    boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+    groups = np.split(order, boundaries)
+    small = [group for group in groups if len(group) < MIN_GROUP_SIZE]
+    groups = [group for group in groups if len(group) >= MIN_GROUP_SIZE]
+    if small:
+        groups.append(np.sort(np.concatenate(small)))
+
+    rng = np.random.default_rng(0)
+    blocks = []
+    for group in groups:
+        if len(group) <= block_size:
+            blocks.append(group)
+            continue
+        shuffled = rng.permutation(group)
+        parts = -(-len(shuffled) // block_size)
+        blocks.extend(np.array_split(shuffled, parts))
+    return blocks
@@ -0,0 +1,150 @@
+# 카드 내보내기 (Anki TSV / CSV / JSON Lines)
+# - 카드 ID 배열을 BATCH_ROWS개씩 문자열로 만들어 내보내는 제너레이터 (전체 출력을 메모리에 만들지 않음)
+# - 학습 진행 상황(상태/복습 일정)과 문법 주석 컬럼은 선택
+# - 파일로 쓸 때는 임시 파일에 청크 단위로 쓰고 끝나면 이름을 바꿈
+# - Streamlit에 의존하지 않으므로 단독으로 테스트할 수 있습니다.
+
+import csv
+import html
+import io
+import json
+import os
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from progress_store import STATUS_DIFFICULT, STATUS_MASTERED, STATUS_NONE
+
+# 형식 -> (확장자, MIME)
+EXPORT_FORMATS = {
+    'anki': ('tsv', 'text/tab-separated-values'),
+    'csv': ('csv', 'text/csv'),
+    'jsonl': ('jsonl', 'application/jsonl'),
+}
+BATCH_ROWS = 1000       # 청크 하나에 담는 카드 수
+STATUS_LABELS = {STATUS_NONE: '', STATUS_DIFFICULT: 'difficult', STATUS_MASTERED: 'mastered'}
+PROGRESS_COLUMNS = ('status', 'ease', 'interval', 'reps', 'lapses', 'due')
+GRAMMAR_COLUMN = 'grammar_notes'
+
+# 카드 ID -> 추가 컬럼 (진행 상황이 없는 카드는 None)
+ProgressLookup = Callable[[int], Optional[Dict[str, object]]]
+GrammarLookup = Callable[[int], str]
+
+def export_columns(fields: Sequence[str], progress: Optional[ProgressLookup] = None,
+                   grammar: Optional[GrammarLookup] = None) -> List[str]:
+    """출력 컬럼 순서"""
+    columns = list(fields)
+    if progress is not None:
+        columns.extend(PROGRESS_COLUMNS)
+    if grammar is not None:
+        columns.append(GRAMMAR_COLUMN)
+    return columns
+
+def format_due(due: Optional[float]) -> Optional[str]:
+    """복습 예정 시각 (UTC ISO 8601, 예정 없으면 None)"""
+    if due is None or due == float('inf'):
+        return None
+    return datetime.fromtimestamp(due, tz=timezone.utc).isoformat(timespec='seconds')
+
+def iter_records(columns: Dict[str, List[str]], card_ids: Iterable[int], fields: Sequence[str],
+                 progress: Optional[ProgressLookup] = None,
+                 grammar: Optional[GrammarLookup] = None) -> Iterator[Dict[str, object]]:
+    """카드 한 장씩 출력 레코드(dict)를 만듭니다."""
+    for card_id in card_ids:
+        card_id = int(card_id)
+        record: Dict[str, object] = {field: columns[field][card_id] for field in fields}
+        if progress is not None:
+            state = progress(card_id) or {}
+            record['status'] = STATUS_LABELS.get(state.get('status', STATUS_NONE), '')
+            for column in ('ease', 'interval', 'reps', 'lapses'):
+                record[column] = state.get(column)
+            record['due'] = format_due(state.get('due'))
+        if grammar is not None:
+            record[GRAMMAR_COLUMN] = grammar(card_id)
+        yield record
+
+def batched(records: Iterator[Dict[str, object]], batch_rows: int) -> Iterator[List[Dict[str, object]]]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_rows:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def iter_csv(records: Iterator[Dict[str, object]], columns: List[str],
+             batch_rows: int = BATCH_ROWS) -> Iterator[str]:
+    """CSV (Excel에서 한글이 깨지지 않도록 BOM으로 시작)"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, lineterminator='\n')
+    buffer.write('\ufeff')
+    writer.writeheader()
+    for batch in batched(records, batch_rows):
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def iter_jsonl(records: Iterator[Dict[str, object]], batch_rows: int = BATCH_ROWS) -> Iterator[str]:
+    """JSON Lines (카드 한 장 = 한 줄)"""
+    for batch in batched(records, batch_rows):
+        yield ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in batch)
+
+def anki_field(text: object) -> str:
+    """Anki 가져오기 필드 (HTML 모드이므로 이스케이프, 탭/줄바꿈은 구분자와 겹치지 않게 바꿈)"""
+    return html.escape(str(text)).replace('\t', ' ').replace('\r\n', '<br>').replace('\n', '<br>')
+
+def anki_tag(text: object) -> str:
+    """Anki 태그는 공백으로 구분하므로 공백을 밑줄로"""
+    return '_'.join(str(text).split())
+
+def iter_anki(records: Iterator[Dict[str, object]], batch_rows: int = BATCH_ROWS) -> Iterator[str]:
+    """Anki 가져오기용 TSV (앞면: 독일어, 뒷면: 뜻/예문/문법, 태그: 품사/테마/학습 상태)"""
+    yield '#separator:tab\n#html:true\n#columns:Front\tBack\tTags\n#tags column:3\n'
+    for batch in batched(records, batch_rows):
+        lines = []
+        for record in batch:
+            back = [f"<b>{anki_field(record.get('korean_meaning', ''))}</b>"]
+            if record.get('german_example'):
+                back.append(f"<i>{anki_field(record['german_example'])}</i>")
+            if record.get('ko_example_translation'):
+                back.append(anki_field(record['ko_example_translation']))
+            if record.get(GRAMMAR_COLUMN):
+                back.append(f"<small>{anki_field(record[GRAMMAR_COLUMN])}</small>")
+            tags = [anki_tag(record[column]) for column in ('pos', 'theme', 'status') if record.get(column)]
+            lines.append(f"{anki_field(record.get('german_word', ''))}\t{'<br>'.join(back)}\t{' '.join(tags)}\n")
+        yield ''.join(lines)
+
+def iter_export(fmt: str, columns: Dict[str, List[str]], card_ids: Iterable[int], fields: Sequence[str],
+                progress: Optional[ProgressLookup] = None, grammar: Optional[GrammarLookup] = None,
+                batch_rows: int = BATCH_ROWS) -> Iterator[str]:
+    """선택한 형식의 출력 청크를 차례로 만듭니다."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"unknown export format: {fmt}")
+    records = iter_records(columns, card_ids, fields, progress, grammar)
+    if fmt == 'anki':
+        return iter_anki(records, batch_rows)
+    if fmt == 'csv':
+        return iter_csv(records, export_columns(fields, progress, grammar), batch_rows)
+    return iter_jsonl(records, batch_rows)
+
+def write_export(chunks: Iterable[str], path: str) -> int:
+    """청크를 파일에 차례로 쓰고 (임시 파일 -> 이름 변경) 쓴 바이트 수를 반환합니다."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    written = 0
+    try:
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                data = chunk.encode('utf-8')
+                f.write(data)
+                written += len(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return written
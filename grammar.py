@@ -0,0 +1,266 @@
+# 문법 주석 (덱 적재 시 한 번 계산)
+# - complement_structure / verb_case / verb_prep / reflexive / adj_prep / adj_case 를
+#   작은 토크나이저 + 파서로 해석해 카드별 정수 필드(격 비트마스크, 전치사 코드, 플래그)로 보관
+# - 렌더링은 이 필드만 읽습니다 (부분 문자열 검사 없음: 'gegen'이 2격으로 잡히는 등의 오류 방지).
+# - Streamlit에 의존하지 않으므로 단독으로 테스트할 수 있습니다.
+
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# 격 비트마스크
+CASE_NOM = 1
+CASE_GEN = 2
+CASE_DAT = 4
+CASE_AKK = 8
+CASE_ORDER = (CASE_NOM, CASE_AKK, CASE_DAT, CASE_GEN)   # 설명 표시 순서
+
+CASE_WORDS = {
+    'nom': CASE_NOM, 'nominativ': CASE_NOM,
+    'gen': CASE_GEN, 'genitiv': CASE_GEN, 'jds': CASE_GEN, 'jemandes': CASE_GEN,
+    'dat': CASE_DAT, 'dativ': CASE_DAT, 'jdm': CASE_DAT, 'jemandem': CASE_DAT,
+    'akk': CASE_AKK, 'akkusativ': CASE_AKK, 'jdn': CASE_AKK, 'jemanden': CASE_AKK,
+}
+
+CASE_LABELS = {CASE_NOM: '1격', CASE_GEN: '2격', CASE_DAT: '3격', CASE_AKK: '4격'}
+
+CASE_EXPLANATIONS = {
+    CASE_NOM: "**1격 (Nominativ)**: 주어 역할 - 누가/무엇이",
+    CASE_AKK: "**4격 (Akkusativ)**: 직접목적어 - 무엇을/누구를",
+    CASE_DAT: "**3격 (Dativ)**: 간접목적어 - 누구에게/무엇에게",
+    CASE_GEN: "**2격 (Genitiv)**: 소유격 - ~의",
+}
+
+PREP_EXPLANATIONS = {
+    'an': "접촉/위치 (3격: ~에서/~에게, 4격: ~로/~를 향해)",
+    'auf': "표면 위 (3격: ~위에서, 4격: ~위로)",
+    'aus': "~에서/~로부터 (3격만: ~밖으로/~출신의)",
+    'bei': "근처/옆 (3격만: ~근처에서/~와 함께)",
+    'durch': "통과/수단 (4격만: ~을 통해/~에 의해)",
+    'für': "위해/~동안 (4격만: ~을/를 위해)",
+    'gegen': "반대/~쪽으로 (4격만: ~에 반대하여/~쪽으로)",
+    'gegenüber': "~에 대해/맞은편 (3격만: ~에 대하여/~맞은편에)",
+    'in': "안/속 (3격: ~안에서, 4격: ~안으로)",
+    'mit': "함께/수단 (3격만: ~와 함께/~로써)",
+    'nach': "방향/시간 후 (3격만: ~후에/~로)",
+    'über': "위/관하여 (3격: ~위에서, 4격: ~위로/~에 관하여)",
+    'um': "주위/시간 (4격만: ~주위에/~시에)",
+    'unter': "아래/사이 (3격: ~아래에서, 4격: ~아래로)",
+    'von': "~로부터/~에 의해 (3격만: ~로부터/~의)",
+    'vor': "앞/시간 전 (3격: ~앞에서/~전에, 4격: ~앞으로)",
+    'zu': "~에게/~로 (3격만: ~에게/~로)",
+}
+PREPOSITIONS = frozenset(PREP_EXPLANATIONS) | {'ohne', 'hinter', 'neben', 'zwischen', 'bis', 'seit', 'wegen', 'trotz', 'statt'}
+
+REFLEXIVE_TRUE_VALUES = ('ja', 'yes', 'true', '1')
+
+# 카드 플래그
+FLAG_VERB = 1           # 품사에 'verb' 포함 (명사-동사 결합 포함)
+FLAG_ADJECTIVE = 2
+FLAG_REFLEXIVE = 4      # reflexive 컬럼이 참
+FLAG_SICH = 8           # 문장 구조에 sich 포함
+
+# 구조 문자열 토큰: 연결 기호, 괄호, 그 밖의 공백 없는 단어
+STRUCTURE_TOKEN = re.compile(r'[+()]|[^\s+()]+')
+
+class Structure(NamedTuple):
+    """문장 구조 한 개의 해석 결과"""
+    object_cases: int                       # 전치사 없이 요구되는 격 (비트마스크)
+    prep_cases: Tuple[Tuple[str, int], ...]  # (전치사, 격) 쌍
+    has_sich: bool
+
+EMPTY_STRUCTURE = Structure(0, (), False)
+
+def split_prepositions(word: str) -> Optional[Tuple[str, ...]]:
+    """'für/gegen' 같은 전치사 (대안 포함) 이면 전치사 튜플, 아니면 None"""
+    parts = tuple(part for part in word.split('/') if part)
+    if parts and all(part in PREPOSITIONS for part in parts):
+        return parts
+    return None
+
+def parse_structure(text: str) -> Structure:
+    """'sich + auf + Akk', 'jdm (Dat) danken', 'Gen' 같은 구조 표기를 해석합니다.
+
+    전치사 뒤에 오는 격은 그 전치사의 격으로, 그 밖의 격은 동사가 직접 요구하는 격으로 봅니다.
+    전치사 뒤에 격이 아닌 단어가 오면 ('in Betracht ziehen') 관용구의 일부로 보고 버립니다.
+    """
+    if not text:
+        return EMPTY_STRUCTURE
+    object_cases = 0
+    prep_cases: List[Tuple[str, int]] = []
+    has_sich = False
+    pending: Tuple[str, ...] = ()
+    for token in STRUCTURE_TOKEN.findall(text.lower()):
+        if token in '+()':
+            continue
+        word = token.strip('.,;:')
+        if word == 'sich':
+            has_sich = True
+            continue
+        case = CASE_WORDS.get(word)
+        if case:
+            if pending:
+                prep_cases.extend((prep, case) for prep in pending)
+                pending = ()
+            else:
+                object_cases |= case
+            continue
+        pending = split_prepositions(word) or ()
+    return Structure(object_cases, tuple(dict.fromkeys(prep_cases)), has_sich)
+
+def parse_cases(text: str) -> int:
+    """격 표기('Dat', 'Akk/Dat')를 비트마스크로 바꿉니다."""
+    mask = 0
+    for word in re.split(r'[\s/,+()]+', text.lower()):
+        mask |= CASE_WORDS.get(word.strip('.'), 0)
+    return mask
+
+def case_explanation(mask: int) -> str:
+    """격 비트마스크에 대한 설명 ('|'로 구분)"""
+    return " | ".join(CASE_EXPLANATIONS[case] for case in CASE_ORDER if mask & case)
+
+def prep_explanation(prep_info: str) -> str:
+    """전치사(대안 포함)에 대한 설명. 모르는 전치사는 원문을 그대로 보여 줍니다."""
+    preps = split_prepositions(prep_info.lower().strip())
+    if preps:
+        known = [prep for prep in preps if prep in PREP_EXPLANATIONS]
+        if len(known) == 1 and len(preps) == 1:
+            return PREP_EXPLANATIONS[known[0]]
+        if known:
+            return " / ".join(f"{prep}: {PREP_EXPLANATIONS[prep]}" for prep in known)
+    return f"전치사: {prep_info}"
+
+def narrow_codes(codes: np.ndarray, table_size: int) -> np.ndarray:
+    """코드 배열을 표 크기에 맞는 가장 작은 정수형으로 줄입니다 (-1 = 없음)."""
+    if table_size <= np.iinfo(np.int8).max + 1:
+        return codes.astype(np.int8)
+    if table_size <= np.iinfo(np.int16).max + 1:
+        return codes.astype(np.int16)
+    return codes
+
+class CardGrammar(NamedTuple):
+    """카드 한 장의 문법 주석 (렌더링용 읽기 전용 뷰)"""
+    is_verb: bool
+    is_adjective: bool
+    reflexive: bool
+    object_cases: int
+    prep_cases: Tuple[Tuple[str, int], ...]
+    verb_cases: int
+    verb_prep_explanation: str
+    adj_cases: int
+    adj_prep_explanation: str
+
+class GrammarAnnotations:
+    """카드별 문법 주석을 정수 배열로 보관합니다 (같은 원문은 한 번만 해석)."""
+    __slots__ = ('flags', 'object_cases', 'prep_case_codes', 'prep_case_table',
+                 'verb_cases', 'adj_cases', 'verb_prep_codes', 'adj_prep_codes', 'prep_table')
+
+    def __init__(self, flags: np.ndarray, object_cases: np.ndarray, prep_case_codes: np.ndarray,
+                 prep_case_table: List[Tuple[Tuple[str, int], ...]], verb_cases: np.ndarray,
+                 adj_cases: np.ndarray, verb_prep_codes: np.ndarray, adj_prep_codes: np.ndarray,
+                 prep_table: List[str]):
+        self.flags = flags
+        self.object_cases = object_cases
+        self.prep_case_codes = prep_case_codes      # -1 = 없음
+        self.prep_case_table = prep_case_table
+        self.verb_cases = verb_cases
+        self.adj_cases = adj_cases
+        self.verb_prep_codes = verb_prep_codes      # -1 = 없음, 그 밖에는 prep_table 인덱스
+        self.adj_prep_codes = adj_prep_codes
+        self.prep_table = prep_table                # 전치사 설명 문자열
+
+    @classmethod
+    def build(cls, columns: Dict[str, List[str]], size: int) -> "GrammarAnnotations":
+        """카드 저장소의 필드 배열로부터 주석을 계산합니다."""
+        def column(field: str) -> Iterable[str]:
+            return columns.get(field) or [''] * size
+
+        structures: Dict[str, Structure] = {}
+        case_masks: Dict[str, int] = {}
+        prep_codes: Dict[str, int] = {}
+        prep_table: List[str] = []
+        prep_case_codes: Dict[Tuple[Tuple[str, int], ...], int] = {}
+        prep_case_table: List[Tuple[Tuple[str, int], ...]] = []
+
+        def structure_of(text: str) -> Structure:
+            structure = structures.get(text)
+            if structure is None:
+                structure = structures[text] = parse_structure(text)
+            return structure
+
+        def cases_of(text: str) -> int:
+            mask = case_masks.get(text)
+            if mask is None:
+                mask = case_masks[text] = parse_cases(text)
+            return mask
+
+        def prep_code(text: str) -> int:
+            if not text:
+                return -1
+            code = prep_codes.get(text)
+            if code is None:
+                code = prep_codes[text] = len(prep_table)
+                prep_table.append(prep_explanation(text))
+            return code
+
+        flags = np.zeros(size, dtype=np.uint8)
+        object_cases = np.zeros(size, dtype=np.uint8)
+        # 코드 배열은 int32로 채운 뒤 표 크기가 정해지면 narrow_codes로 줄입니다.
+        pattern_codes = np.full(size, -1, dtype=np.int32)
+        verb_cases = np.zeros(size, dtype=np.uint8)
+        adj_cases = np.zeros(size, dtype=np.uint8)
+        verb_prep_codes = np.full(size, -1, dtype=np.int32)
+        adj_prep_codes = np.full(size, -1, dtype=np.int32)
+
+        rows = zip(column('pos'), column('reflexive'), column('complement_structure'), column('verb_case'),
+                   column('verb_prep'), column('adj_case'), column('adj_prep'))
+        for card_id, (pos, reflexive, structure_text, verb_case, verb_prep, adj_case, adj_prep) in enumerate(rows):
+            pos_lower = pos.lower()
+            structure = structure_of(structure_text)
+            flag = 0
+            if 'verb' in pos_lower:
+                flag |= FLAG_VERB
+            elif 'adj' in pos_lower:
+                flag |= FLAG_ADJECTIVE
+            if reflexive.lower() in REFLEXIVE_TRUE_VALUES:
+                flag |= FLAG_REFLEXIVE
+            if structure.has_sich:
+                flag |= FLAG_SICH
+            flags[card_id] = flag
+            object_cases[card_id] = structure.object_cases
+            if structure.prep_cases:
+                code = prep_case_codes.get(structure.prep_cases)
+                if code is None:
+                    code = prep_case_codes[structure.prep_cases] = len(prep_case_table)
+                    prep_case_table.append(structure.prep_cases)
+                pattern_codes[card_id] = code
+            if verb_case:
+                verb_cases[card_id] = cases_of(verb_case)
+            if adj_case:
+                adj_cases[card_id] = cases_of(adj_case)
+            verb_prep_codes[card_id] = prep_code(verb_prep)
+            adj_prep_codes[card_id] = prep_code(adj_prep)
+
+        pattern_codes = narrow_codes(pattern_codes, len(prep_case_table))
+        verb_prep_codes = narrow_codes(verb_prep_codes, len(prep_table))
+        adj_prep_codes = narrow_codes(adj_prep_codes, len(prep_table))
+        return cls(flags, object_cases, pattern_codes, prep_case_table, verb_cases, adj_cases,
+                   verb_prep_codes, adj_prep_codes, prep_table)
+
+    def get(self, card_id: int) -> CardGrammar:
+        flags = int(self.flags[card_id])
+        pattern = int(self.prep_case_codes[card_id])
+        verb_prep = int(self.verb_prep_codes[card_id])
+        adj_prep = int(self.adj_prep_codes[card_id])
+        return CardGrammar(
+            is_verb=bool(flags & FLAG_VERB),
+            is_adjective=bool(flags & FLAG_ADJECTIVE),
+            reflexive=bool(flags & FLAG_REFLEXIVE),
+            object_cases=int(self.object_cases[card_id]),
+            prep_cases=self.prep_case_table[pattern] if pattern >= 0 else (),
+            verb_cases=int(self.verb_cases[card_id]),
+            verb_prep_explanation=self.prep_table[verb_prep] if verb_prep >= 0 else '',
+            adj_cases=int(self.adj_cases[card_id]),
+            adj_prep_explanation=self.prep_table[adj_prep] if adj_prep >= 0 else '',
+        )
@@ -0,0 +1,143 @@
+# 학습 진행 상황 영구 저장소 (SQLite WAL)
+# - (사용자, 카드 키) 단위로 상태/스케줄을 저장
+# - 쓰기는 메모리 버퍼에 모았다가 주기적으로 또는 일정 개수마다 일괄 반영 (write-behind)
+# - 세션 시작 시 사용자 한 명의 상태를 인덱스 조회 한 번으로 읽어옵니다.
+
+import atexit
+import sqlite3
+import threading
+import time
+from typing import Dict, Tuple
+
+STATUS_NONE = 0
+STATUS_DIFFICULT = 1
+STATUS_MASTERED = 2
+
+PROGRESS_FIELDS = ('status', 'ease', 'interval', 'reps', 'lapses', 'due')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS card_progress (
+    user_id    TEXT    NOT NULL,
+    card_key   TEXT    NOT NULL,
+    status     INTEGER NOT NULL DEFAULT 0,
+    ease       REAL,
+    interval   REAL,
+    reps       INTEGER,
+    lapses     INTEGER,
+    due        REAL,
+    updated_at REAL    NOT NULL,
+    PRIMARY KEY (user_id, card_key)
+) WITHOUT ROWID;
+"""
+
+UPSERT_SQL = """
+INSERT INTO card_progress (user_id, card_key, status, ease, interval, reps, lapses, due, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (user_id, card_key) DO UPDATE SET
+    status = excluded.status,
+    ease = excluded.ease,
+    interval = excluded.interval,
+    reps = excluded.reps,
+    lapses = excluded.lapses,
+    due = excluded.due,
+    updated_at = excluded.updated_at
+"""
+
+class ProgressStore:
+    """버퍼링된 일괄 쓰기를 사용하는 SQLite 진행 상황 저장소"""
+
+    def __init__(self, db_path: str, flush_interval: float = 2.0, batch_size: int = 200):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+        self._flusher = threading.Thread(target=self._flush_loop, name="progress-flusher", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def record(self, user_id: str, card_key: str, progress: Dict[str, float]) -> None:
+        """카드 상태 변경을 버퍼에 기록합니다 (디스크 I/O 없음)."""
+        with self._lock:
+            self._pending[(user_id, card_key)] = dict(progress, updated_at=time.time())
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.set()
+
+    def load_user(self, user_id: str) -> Dict[str, Dict[str, float]]:
+        """사용자의 전체 카드 상태를 {카드 키: 상태} 로 반환합니다 (미반영 버퍼 포함)."""
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT card_key, status, ease, interval, reps, lapses, due "
+                "FROM card_progress WHERE user_id = ?",
+                (user_id,)
+            ).fetchall()
+            progress = {row[0]: dict(zip(PROGRESS_FIELDS, row[1:])) for row in rows}
+
+            with self._lock:
+                for (pending_user, card_key), values in self._pending.items():
+                    if pending_user == user_id:
+                        progress[card_key] = {field: values.get(field) for field in PROGRESS_FIELDS}
+        return progress
+
+    def flush(self) -> int:
+        """버퍼에 쌓인 변경을 한 트랜잭션으로 반영하고 반영한 행 수를 반환합니다."""
+        # 잠금 순서: _db_lock -> _lock (load_user가 반영 중인 변경을 놓치지 않도록)
+        with self._db_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                pending, self._pending = self._pending, {}
+
+            rows = [
+                (user_id, card_key) + tuple(values.get(field) for field in PROGRESS_FIELDS) + (values['updated_at'],)
+                for (user_id, card_key), values in pending.items()
+            ]
+            try:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(UPSERT_SQL, rows)
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                # 실패한 변경은 더 새로운 변경이 없을 때만 버퍼로 되돌립니다.
+                with self._lock:
+                    for key, values in pending.items():
+                        self._pending.setdefault(key, values)
+                raise
+        return len(rows)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def close(self) -> None:
+        """남은 변경을 반영하고 연결을 닫습니다."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._flusher.join(timeout=self.flush_interval + 1)
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+    def _flush_loop(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._closed:
+                break
+            try:
+                self.flush()
+            except sqlite3.Error:
+                # 다음 주기에 다시 시도
+                pass
@@ -0,0 +1,160 @@
+# 직접 입력(뜻을 보고 독일어 쓰기) 채점
+# - 카드마다 허용 답안의 정규화 형태를 적재 시 한 번 계산 (움라우트/ß 폴딩, 관사·sich·말줄임표 제거,
+#   괄호 안 내용은 선택, 'für/gegen'·'Mitarbeiter/in' 같은 빗금 대안 전개)
+# - 입력은 같은 규칙으로 정규화한 뒤 정확히 일치하면 바로 정답, 아니면 공통 접두/접미사를 떼고
+#   길이에 비례한 한도 안에서만 비트 병렬 편집 거리를 계산 (한도를 넘으면 조기 종료)
+# - Streamlit에 의존하지 않으므로 단독으로 테스트할 수 있습니다.
+
+import re
+from itertools import product
+from typing import Dict, List, NamedTuple, Tuple
+
+from search_index import fold_text
+
+# 앞에서 떼어 내는 관사/재귀대명사 (여러 개 연속 가능: "sich die ...")
+LEADING_WORDS_PATTERN = re.compile(r'^(?:(?:der|die|das|den|dem|des|ein|eine|einen|einem|einer|sich) )+')
+ELLIPSIS_PATTERN = re.compile(r'…|\.{3}')
+PARENS_PATTERN = re.compile(r'\(([^()]*)\)')
+# 문장부호는 공백으로 (빗금은 대안 표시이므로 남김)
+PUNCTUATION_PATTERN = re.compile(r'[^\w/ ]+')
+SUFFIX_MAX_LENGTH = 3           # 'Mitarbeiter/in'처럼 빗금 뒤가 이보다 짧으면 어미로 보고 붙인 형태도 허용
+MAX_FORMS = 32                  # 카드당 허용 답안 형태 상한
+
+def normalize_answer(text: str) -> str:
+    """입력/정답 공통 정규화: 폴딩, 말줄임표·문장부호 제거, 앞의 관사/sich 제거, 공백 정리"""
+    text = fold_text(ELLIPSIS_PATTERN.sub(' ', text))
+    text = ' '.join(PUNCTUATION_PATTERN.sub(' ', text).split())
+    return LEADING_WORDS_PATTERN.sub('', text)
+
+def slash_alternatives(token: str) -> List[str]:
+    """빗금으로 묶인 토큰의 대안 ('fur/gegen' -> fur, gegen / 'mitarbeiter/in' -> mitarbeiter, mitarbeiterin)"""
+    parts = [part for part in token.split('/') if part]
+    if len(parts) < 2:
+        return [token.replace('/', '')]
+    if len(parts) == 2 and len(parts[1]) <= SUFFIX_MAX_LENGTH:
+        return [parts[0], parts[0] + parts[1]]
+    return parts
+
+def answer_forms(german_word: str) -> Tuple[str, ...]:
+    """카드 단어의 허용 답안 정규화 형태 (중복 제거, 최대 MAX_FORMS개)"""
+    forms: Dict[str, None] = {}
+    # 'das Protein / das Eiweiß'처럼 띄어 쓴 빗금은 통째로 다른 답
+    for variant in re.split(r'\s+/\s+', german_word):
+        # 괄호 안 내용은 있어도 되고 없어도 됨: "(sich) weiterentwickeln", "die Daten (Pl.)"
+        for text in (PARENS_PATTERN.sub(' ', variant), PARENS_PATTERN.sub(r' \1 ', variant)):
+            tokens = normalize_answer(text).split()
+            if not tokens:
+                continue
+            # 관사 쌍 'der/die'는 앞에서 떼어 냄
+            while tokens and '/' in tokens[0] and all(
+                    LEADING_WORDS_PATTERN.match(part + ' ') for part in tokens[0].split('/') if part):
+                tokens = tokens[1:]
+            for combination in product(*(slash_alternatives(token) for token in tokens)):
+                form = normalize_answer(' '.join(combination))
+                if form:
+                    forms[form] = None
+                if len(forms) >= MAX_FORMS:
+                    return tuple(forms)
+    return tuple(forms)
+
+def typo_limit(length: int) -> int:
+    """정답 길이별 허용 오타 수"""
+    if length <= 3:
+        return 0
+    if length <= 8:
+        return 1
+    if length <= 16:
+        return 2
+    return 3
+
+def bit_parallel_distance(a: str, b: str, limit: int) -> int:
+    """Myers/Hyyrö 비트 병렬 편집 거리 - a의 열 전체를 정수 하나의 비트로 계산합니다.
+
+    b를 한 글자 처리할 때마다 남은 글자 수로 최종 거리의 하한을 확인해 limit을 넘으면 바로 끝냅니다.
+    limit 이하이면 편집 거리를, 넘으면 limit + 1을 반환합니다.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if not a or not b:
+        return max(len(a), len(b))
+    peq: Dict[str, int] = {}
+    for i, ch in enumerate(a):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+    mask = (1 << len(a)) - 1
+    high = 1 << (len(a) - 1)
+    pv, mv, score = mask, 0, len(a)
+    remaining = len(b)
+    for ch in b:
+        eq = peq.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        remaining -= 1
+        if score - remaining > limit:
+            return limit + 1
+        ph = (ph << 1) | 1
+        mh <<= 1
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv
+    return min(score, limit + 1)
+
+def edit_distance_within(a: str, b: str, limit: int) -> int:
+    """공통 접두/접미사를 뗀 나머지의 편집 거리 (limit 초과면 limit + 1)"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    start = 0
+    end_a, end_b = len(a), len(b)
+    while start < end_a and start < end_b and a[start] == b[start]:
+        start += 1
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    return bit_parallel_distance(a[start:end_a], b[start:end_b], limit)
+
+class Grade(NamedTuple):
+    correct: bool       # 허용 범위 안이면 True (오타 포함)
+    distance: int       # 가장 가까운 허용 형태까지의 편집 거리 (틀리면 -1)
+    form: str           # 가장 가까운 허용 형태 (틀리면 '')
+
+class RecallIndex:
+    """카드별 허용 답안 정규화 형태 (뜻이 같은 카드의 답도 함께 허용)"""
+
+    def __init__(self, forms: List[Tuple[str, ...]]):
+        self.forms = forms
+
+    @classmethod
+    def build(cls, columns: Dict[str, List[str]], size: int) -> "RecallIndex":
+        card_forms = [answer_forms(word) for word in columns['german_word']]
+        # 같은 뜻을 보고 다른 카드의 단어를 써도 정답
+        groups: Dict[str, List[int]] = {}
+        for card_id, meaning in enumerate(columns['korean_meaning']):
+            if meaning:
+                groups.setdefault(meaning, []).append(card_id)
+        forms = list(card_forms)
+        for card_ids in groups.values():
+            if len(card_ids) > 1:
+                merged = tuple(dict.fromkeys(form for card_id in card_ids for form in card_forms[card_id]))
+                for card_id in card_ids:
+                    forms[card_id] = merged
+        return cls(forms)
+
+    def grade(self, card_id: int, answer: str) -> Grade:
+        """입력을 채점합니다 (정확히 일치하면 편집 거리 계산 없이 바로 반환)."""
+        forms = self.forms[card_id]
+        typed = normalize_answer(answer)
+        if typed in forms:
+            return Grade(True, 0, typed)
+        best = Grade(False, -1, '')
+        for form in forms:
+            limit = typo_limit(len(form))
+            distance = edit_distance_within(typed, form, limit)
+            if distance <= limit and (not best.correct or distance < best.distance):
+                best = Grade(True, distance, form)
+                if distance == 1:
+                    break
+        return best
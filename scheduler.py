@@ -0,0 +1,195 @@
+# 간격 반복(SM-2) 스케줄러
+# - 카드별 ease/interval/due 상태를 numpy 배열로 보관하되, 채점된 카드에만 행을 배정 (세션 메모리가 덱 크기와 무관)
+# - 다음 카드는 (due, card_id) 힙에서 O(log n)으로 선택 (지연 삭제 방식)
+# - Streamlit에 의존하지 않으므로 단독으로 테스트할 수 있습니다.
+
+import heapq
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# SM-2 응답 품질 (0~5)
+GRADE_AGAIN = 0
+GRADE_HARD = 1      # "어려워요" - 실패로 보고 재학습
+GRADE_GOOD = 4      # "다음" - 기억함
+GRADE_EASY = 5      # "외웠어요"
+
+DAY_SECONDS = 86400.0
+RELEARN_SECONDS = 60.0          # 실패한 카드는 1분 뒤 다시 출제
+LEARN_AHEAD_SECONDS = 20 * 60.0  # 복습 시 20분 이내 예정 카드까지 미리 출제
+MIN_EASE = 1.3
+INITIAL_EASE = 2.5
+INT16_MAX = 32767
+INITIAL_ROWS = 64        # 처음 잡는 행 수 (모자라면 두 배로)
+
+class Scheduler:
+    """SM-2 방식의 카드별 복습 일정과 우선순위 큐
+
+    상태는 처음처럼 필드별 numpy 배열로 두되, 덱 크기가 아니라 채점된 카드 수만큼만 행을 씁니다.
+    덱 전체 크기의 배열(카드당 20바이트)을 세션마다 잡으면 큰 덱에서 세션 메모리가 덱 크기에
+    비례하므로, card_id -> 행 번호 사전으로 채점된 카드에만 행을 배정합니다.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._rows: Dict[int, int] = {}     # card_id -> 행 번호 (채점된 카드만)
+        self.ease = np.empty(INITIAL_ROWS, dtype=np.float32)
+        self.interval = np.empty(INITIAL_ROWS, dtype=np.float32)   # 일 단위
+        self.reps = np.empty(INITIAL_ROWS, dtype=np.int16)
+        self.lapses = np.empty(INITIAL_ROWS, dtype=np.int16)
+        self.due = np.empty(INITIAL_ROWS, dtype=np.float64)
+        self._heap: List[Tuple[float, int]] = []
+        self._last_card_id: Optional[int] = None    # 마지막으로 채점한 카드
+
+    def _row(self, card_id: int) -> int:
+        if not 0 <= card_id < self.size:
+            raise IndexError(f"card_id out of range: {card_id}")
+        row = self._rows.get(card_id)
+        if row is None:
+            row = len(self._rows)
+            if row == len(self.due):
+                self._grow()
+            self.ease[row] = INITIAL_EASE
+            self.interval[row] = 0.0
+            self.reps[row] = 0
+            self.lapses[row] = 0
+            self.due[row] = np.inf
+            self._rows[card_id] = row
+        return row
+
+    def _grow(self) -> None:
+        # 행이 모자라면 두 배로 늘립니다.
+        for name in ('ease', 'interval', 'reps', 'lapses', 'due'):
+            old = getattr(self, name)
+            new = np.empty(len(old) * 2, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def review(self, card_id: int, grade: int, now: Optional[float] = None) -> float:
+        """응답 품질을 반영해 카드의 다음 복습 시각을 계산하고 반환합니다."""
+        now = time.time() if now is None else now
+        if not 0 <= grade <= 5:
+            raise ValueError(f"grade must be between 0 and 5: {grade}")
+        row = self._row(card_id)
+
+        if grade >= 3:
+            reps = int(self.reps[row])
+            if reps == 0:
+                interval = 1.0
+            elif reps == 1:
+                interval = 6.0
+            else:
+                interval = float(round(float(self.interval[row]) * float(self.ease[row])))
+            self.reps[row] = min(reps + 1, INT16_MAX)
+            self.interval[row] = interval
+            due = now + interval * DAY_SECONDS
+        else:
+            self.reps[row] = 0
+            self.lapses[row] = min(int(self.lapses[row]) + 1, INT16_MAX)
+            self.interval[row] = 0.0
+            due = now + RELEARN_SECONDS
+
+        quality_gap = 5 - grade
+        ease = float(self.ease[row]) + (0.1 - quality_gap * (0.08 + quality_gap * 0.02))
+        self.ease[row] = max(MIN_EASE, ease)
+
+        self.due[row] = due
+        heapq.heappush(self._heap, (due, card_id))
+        self._compact_if_needed()
+        self._last_card_id = card_id
+        return due
+
+    def restore(self, card_id: int, ease: float, interval: float, reps: int, lapses: int, due: float) -> None:
+        """저장된 스케줄 상태를 복원합니다."""
+        row = self._row(card_id)
+        self.ease[row] = ease
+        self.interval[row] = interval
+        self.reps[row] = min(int(reps), INT16_MAX)
+        self.lapses[row] = min(int(lapses), INT16_MAX)
+        self.due[row] = due
+        heapq.heappush(self._heap, (float(due), card_id))
+        self._compact_if_needed()
+
+    def _is_live(self, due: float, card_id: int) -> bool:
+        # 다시 채점되면 이전 힙 항목은 무효가 됩니다.
+        return self.due[self._rows[card_id]] == due
+
+    def peek(self, now: Optional[float] = None, ahead: float = LEARN_AHEAD_SECONDS) -> Optional[int]:
+        """(now + ahead) 이전에 예정된 카드 중 가장 급한 카드 ID를 반환합니다.
+
+        방금 틀린 카드(RELEARN_SECONDS 뒤로 잡힌 재학습 카드)는 미리 출제하지 않고 예정 시각이 되어야
+        나옵니다. 그렇지 않으면 '어려워요'를 누른 카드가 곧바로 다시 나와 같은 카드만 반복됩니다.
+        """
+        now = time.time() if now is None else now
+        heap = self._heap
+        while heap and not self._is_live(*heap[0]):
+            # 다시 채점되어 무효가 된 항목
+            heapq.heappop(heap)
+        if not heap or heap[0][0] > now + ahead:
+            return None
+        if heap[0][0] <= now:
+            return heap[0][1]
+        # 미리 출제할 수 있는 카드 중 가장 급한 카드
+        ahead_entries = [(due, card_id) for due, card_id in self._live_entries(now + ahead)
+                         if not self._just_failed(card_id)]
+        return min(ahead_entries)[1] if ahead_entries else None
+
+    def start_review(self) -> None:
+        """복습을 새로 시작합니다 (방금 틀린 카드도 미리 출제 대상)."""
+        self._last_card_id = None
+
+    def _just_failed(self, card_id: int) -> bool:
+        return card_id == self._last_card_id and self.interval[self._rows[card_id]] == 0
+
+    def due_count(self, now: Optional[float] = None, ahead: float = LEARN_AHEAD_SECONDS) -> int:
+        """(now + ahead) 이전에 예정된 카드 수를 반환합니다.
+
+        힙에서 limit 이하인 위쪽 부분만 훑으므로 비용은 예정된 카드 수에 비례합니다.
+        """
+        limit = (time.time() if now is None else now) + ahead
+        return sum(1 for _ in self._live_entries(limit))
+
+    def _live_entries(self, limit: float) -> Iterator[Tuple[float, int]]:
+        # due <= limit 인 살아 있는 힙 항목 (카드당 한 번)
+        heap = self._heap
+        seen = set()     # 같은 due로 두 번 들어간 항목은 한 번만
+        stack = [0] if heap else []
+        while stack:
+            i = stack.pop()
+            due, card_id = heap[i]
+            if due > limit:
+                # 자식 항목은 모두 due 이상이므로 이 아래는 볼 필요가 없습니다.
+                continue
+            if card_id not in seen and self._is_live(due, card_id):
+                seen.add(card_id)
+                yield due, card_id
+            child = 2 * i + 1
+            stack.extend(range(child, min(child + 2, len(heap))))
+
+    def is_scheduled(self, card_id: int) -> bool:
+        """한 번 이상 채점된 카드인지 확인합니다."""
+        return card_id in self._rows
+
+    def card_state(self, card_id: int) -> Dict[str, float]:
+        """카드 한 장의 스케줄 상태를 반환합니다."""
+        row = self._rows.get(card_id)
+        if row is None:
+            return {'ease': INITIAL_EASE, 'interval': 0.0, 'reps': 0, 'lapses': 0, 'due': float('inf')}
+        return {
+            'ease': float(self.ease[row]),
+            'interval': float(self.interval[row]),
+            'reps': int(self.reps[row]),
+            'lapses': int(self.lapses[row]),
+            'due': float(self.due[row]),
+        }
+
+    def scheduled_count(self) -> int:
+        return len(self._rows)
+
+    def _compact_if_needed(self) -> None:
+        # 무효 항목이 살아 있는 항목보다 많이 쌓이면 힙을 다시 만듭니다.
+        if len(self._heap) <= 2 * len(self._rows) + 64:
+            return
+        self._heap = [(float(self.due[row]), card_id) for card_id, row in self._rows.items()]
+        heapq.heapify(self._heap)
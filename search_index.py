@@ -0,0 +1,274 @@
+# 단어/의미/예문 전문 검색 인덱스
+# - 토큰 -> 카드 ID 배열(정렬) 역색인
+# - 접두사 검색은 정렬된 어휘 배열에 이진 탐색 (평탄화한 접두사 트리)
+# - 독일어 움라우트/ß 폴딩, 한글 음절 토큰 + 조사 제거 (두 음절 이상이고 어휘에 단독으로 있는 어간만)
+# - Streamlit에 의존하지 않으므로 단독으로 테스트할 수 있습니다.
+
+import re
+import unicodedata
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Container, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+SEARCH_FIELDS = ('german_word', 'korean_meaning', 'german_example', 'ko_example_translation')
+
+# 움라우트/ß 폴딩 ("Maßnahmen" == "Massnahmen", "für" == "fur")
+# 그 밖의 라틴 확장 문자는 결합 기호를 뗀 기본 문자로 바꿉니다 (é -> e).
+FOLD_TABLE = {ord(ch): ''.join(c for c in unicodedata.normalize('NFD', ch) if not unicodedata.combining(c))
+              for ch in map(chr, range(0x00c0, 0x0250))}
+FOLD_TABLE.update(str.maketrans({'ä': 'a', 'ö': 'o', 'ü': 'u', 'ß': 'ss'}))
+
+# 라틴 문자(확장 포함)/숫자 연속 또는 한글 음절 연속
+TOKEN_PATTERN = re.compile(r'[0-9a-z\u00c0-\u024f]+|[\uac00-\ud7a3]+')
+
+# 한글 토큰 끝에서 떼어 내는 조사
+KOREAN_PARTICLES = (
+    '에서는', '에게서', '으로서', '으로써', '이라고',
+    '에서', '에게', '으로', '까지', '부터', '처럼', '보다', '라고', '이나', '하고',
+    '은', '는', '이', '가', '을', '를', '에', '의', '도', '만', '로', '와', '과', '랑', '나',
+)
+# 긴 조사부터 시도 ('에서는'을 '는'보다 먼저)
+PARTICLES_BY_LENGTH = tuple(sorted(KOREAN_PARTICLES, key=len, reverse=True))
+# 한 음절 어간은 떼지 않음 ('나이' -> '나', '사과' -> '사'처럼 다른 단어와 겹침)
+MIN_STEM_SYLLABLES = 2
+
+# 접두사가 이보다 많은 어휘로 확장되면 정렬 병합 대신 카드 수 크기의 마스크로 합집합을 구함
+MASK_UNION_TERMS = 512
+
+def fold_text(text: str) -> str:
+    """소문자화, 움라우트/ß 폴딩, 기타 발음 구별 기호 제거"""
+    return unicodedata.normalize('NFC', text).lower().translate(FOLD_TABLE)
+
+def normalize_query(query: str) -> str:
+    """같은 의미의 검색어가 같은 문자열이 되도록 정규화합니다 (캐시 키용)."""
+    return ' '.join(TOKEN_PATTERN.findall(fold_text(query)))
+
+@lru_cache(maxsize=65536)
+def particle_stems(token: str) -> Tuple[str, ...]:
+    """한글 토큰 끝의 조사를 떼어 낸 어간 후보 (긴 조사부터, MIN_STEM_SYLLABLES음절 이상)"""
+    if token[0] < '\uac00':
+        return ()
+    return tuple(token[:-len(particle)] for particle in PARTICLES_BY_LENGTH
+                 if token.endswith(particle) and len(token) - len(particle) >= MIN_STEM_SYLLABLES)
+
+def strip_particle(token: str, vocabulary: Container[str]) -> Optional[str]:
+    """조사를 뗀 어간 중 어휘에 단독으로 등장하는 것을 반환합니다 (없으면 None)."""
+    for stem in particle_stems(token):
+        if stem in vocabulary:
+            return stem
+    return None
+
+def tokenize(text: str) -> List[str]:
+    """검색용 토큰 목록 (조사를 뗀 어간은 어휘를 모은 뒤 SearchIndex.build에서 추가)"""
+    return TOKEN_PATTERN.findall(fold_text(text))
+
+class SearchIndex:
+    """역색인 + 접두사 어휘 배열 기반 카드 검색"""
+
+    def __init__(self, terms: List[str], postings: List[np.ndarray], size: int):
+        self.terms = terms          # 정렬된 어휘
+        self.postings = postings    # terms[i] 가 등장하는 카드 ID (정렬, 중복 없음)
+        self.size = size
+
+    @classmethod
+    def build(cls, columns: Dict[str, List[str]], size: int,
+              fields: Iterable[str] = SEARCH_FIELDS) -> "SearchIndex":
+        """필드별 값 배열로부터 인덱스를 만듭니다."""
+        # 1) 필드 값의 토큰과 전체 어휘를 모은 뒤
+        card_tokens: List[Tuple[int, Set[str]]] = []
+        vocabulary: Set[str] = set()
+        for field in fields:
+            for card_id, text in enumerate(columns[field]):
+                if not text:
+                    continue
+                tokens = set(tokenize(text))
+                vocabulary.update(tokens)
+                card_tokens.append((card_id, tokens))
+
+        # 2) 한글 토큰은 어휘에 단독으로 있는 어간도 함께 색인 ('스트레스가' -> '스트레스')
+        term_ids: Dict[str, int] = {}
+        pair_terms = []
+        pair_cards = []
+        for card_id, tokens in card_tokens:
+            stems = {strip_particle(token, vocabulary) for token in tokens}
+            stems.discard(None)
+            for token in tokens | stems:
+                pair_terms.append(term_ids.setdefault(token, len(term_ids)))
+                pair_cards.append(card_id)
+
+        # 어휘를 정렬한 순번으로 바꾼 뒤 (어휘, 카드) 쌍을 정렬/중복 제거해 한 번에 분할
+        terms = sorted(term_ids)
+        position = {term: i for i, term in enumerate(terms)}
+        # term_ids 는 삽입 순서 = 값(0, 1, 2, ...) 순서
+        rank = np.fromiter((position[term] for term in term_ids), dtype=np.int32, count=len(term_ids))
+        pair_terms = rank[np.array(pair_terms, dtype=np.int32)] if pair_terms else np.empty(0, dtype=np.int32)
+        pair_cards = np.array(pair_cards, dtype=np.int32)
+
+        order = np.lexsort((pair_cards, pair_terms))
+        pair_terms = pair_terms[order]
+        pair_cards = pair_cards[order]
+        keep = np.ones(len(order), dtype=bool)
+        keep[1:] = (pair_terms[1:] != pair_terms[:-1]) | (pair_cards[1:] != pair_cards[:-1])
+        pair_terms = pair_terms[keep]
+        pair_cards = pair_cards[keep]
+
+        boundaries = np.flatnonzero(np.diff(pair_terms)) + 1
+        postings = np.split(pair_cards, boundaries) if len(pair_cards) else []
+        return cls(terms, postings, size)
+
+    def term_range(self, prefix: str) -> range:
+        """접두사로 시작하는 어휘의 인덱스 범위"""
+        lo = bisect_left(self.terms, prefix)
+        hi = bisect_left(self.terms, prefix + '\uffff', lo)
+        return range(lo, hi)
+
+    def lookup(self, token: str) -> np.ndarray:
+        """토큰(접두사 포함)에 해당하는 카드 ID 배열"""
+        term_ids = self.term_range(token)
+        if not term_ids:
+            return np.empty(0, dtype=np.int32)
+        if len(term_ids) == 1:
+            return self.postings[term_ids[0]]
+        postings = np.concatenate([self.postings[i] for i in term_ids])
+        if len(term_ids) > MASK_UNION_TERMS:
+            # 짧은 접두사도 결과를 자르지 않고, 비용은 카드 수 + 일치 항목 수에 비례
+            mask = np.zeros(self.size, dtype=bool)
+            mask[postings] = True
+            return np.flatnonzero(mask).astype(np.int32)
+        return np.unique(postings)
+
+    def __contains__(self, term: str) -> bool:
+        """어휘에 있는 토큰인지 확인합니다."""
+        i = bisect_left(self.terms, term)
+        return i < len(self.terms) and self.terms[i] == term
+
+    def exact(self, term: str) -> np.ndarray:
+        """어휘와 정확히 일치하는 카드 ID 배열"""
+        i = bisect_left(self.terms, term)
+        if i < len(self.terms) and self.terms[i] == term:
+            return self.postings[i]
+        return np.empty(0, dtype=np.int32)
+
+    def lookup_query_token(self, token: str) -> np.ndarray:
+        """질의 토큰 하나에 해당하는 카드 ID 배열 (한글 토큰은 색인할 때처럼 조사를 뗀 어간도 일치)"""
+        result = self.lookup(token)
+        stem = strip_particle(token, self)
+        if stem:
+            # 색인할 때 조사가 붙은 모든 형태의 어간을 함께 넣었으므로 어간은 정확히 일치로 충분합니다.
+            result = np.union1d(result, self.exact(stem))
+        return result
+
+    def search(self, query: str) -> Optional[np.ndarray]:
+        """모든 질의 토큰(접두사 일치)을 포함하는 카드 ID 배열. 토큰이 없으면 None."""
+        tokens = TOKEN_PATTERN.findall(fold_text(query))
+        if not tokens:
+            return None
+        matches = sorted((self.lookup_query_token(token) for token in dict.fromkeys(tokens)), key=len)
+        result = matches[0]
+        for other in matches[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, other, assume_unique=True)
+        return result
+
+    def search_mask(self, query: str) -> Optional[np.ndarray]:
+        """검색 결과를 필터 마스크와 교집합할 수 있는 불리언 마스크로 반환합니다."""
+        card_ids = self.search(query)
+        if card_ids is None:
+            return None
+        mask = np.zeros(self.size, dtype=bool)
+        mask[card_ids] = True
+        return mask
+
+# --- 오타 허용 검색 (문자 3-gram 인덱스 + 제한 편집 거리) ---
+LEADING_ARTICLE_PATTERN = re.compile(r'^(?:der|die|das|sich) ')
+
+def trigrams(text: str) -> List[str]:
+    """앞뒤 공백을 덧붙인 문자 3-gram 목록 (중복 제거)"""
+    padded = f"  {text} "
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+def bounded_edit_distance(a: str, b: str, limit: int) -> int:
+    """limit 이하이면 편집 거리를, 넘으면 limit + 1을 반환합니다 (대각선 띠만 계산, 조기 종료)."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) > len(b):
+        a, b = b, a
+    over = limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        lo = max(1, i - limit)
+        hi = min(len(b), i + limit)
+        current = [over] * (len(b) + 1)
+        if lo == 1:
+            current[0] = i
+        row_min = current[0]
+        for j in range(lo, hi + 1):
+            cost = 0 if ca == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return over
+        previous = current
+    return min(previous[len(b)], over)
+
+class FuzzyIndex:
+    """독일어 단어의 3-gram 역색인으로 오타가 있는 입력과 가까운 카드를 찾습니다."""
+
+    def __init__(self, words: List[str], postings: Dict[str, np.ndarray], size: int):
+        self.words = words          # 폴딩된 비교용 단어 (관사/sich 제거)
+        self.postings = postings    # 3-gram -> 카드 ID 배열
+        self.size = size
+
+    @classmethod
+    def build(cls, german_words: List[str]) -> "FuzzyIndex":
+        words = [LEADING_ARTICLE_PATTERN.sub('', fold_text(word).strip()) for word in german_words]
+        gram_cards: Dict[str, List[int]] = {}
+        for card_id, word in enumerate(words):
+            if not word:
+                continue
+            for gram in trigrams(word):
+                gram_cards.setdefault(gram, []).append(card_id)
+        postings = {gram: np.array(cards, dtype=np.int32) for gram, cards in gram_cards.items()}
+        return cls(words, postings, len(words))
+
+    def lookup(self, query: str, k: int = 5, max_distance: Optional[int] = None,
+               max_candidates: int = 200) -> List[Tuple[int, int]]:
+        """(카드 ID, 편집 거리) 를 거리순으로 최대 k개 반환합니다."""
+        query = LEADING_ARTICLE_PATTERN.sub('', fold_text(query).strip())
+        if not query:
+            return []
+        if max_distance is None:
+            max_distance = min(3, max(1, len(query) // 4))
+
+        grams = [gram for gram in trigrams(query) if gram in self.postings]
+        if not grams:
+            return []
+        # 편집 1회는 3-gram을 최대 3개 깨뜨리므로 공유 3-gram 수로 후보를 먼저 거릅니다.
+        overlap = np.bincount(np.concatenate([self.postings[gram] for gram in grams]), minlength=self.size)
+        required = max(1, len(trigrams(query)) - 3 * max_distance)
+        candidates = np.flatnonzero(overlap >= required)
+        if len(candidates) > max_candidates:
+            top = np.argpartition(overlap[candidates], -max_candidates)[-max_candidates:]
+            candidates = candidates[top]
+        candidates = candidates[np.argsort(-overlap[candidates], kind='stable')]
+
+        results = []
+        limit = max_distance
+        for card_id in candidates:
+            distance = bounded_edit_distance(query, self.words[card_id], limit)
+            if distance <= limit:
+                results.append((int(card_id), distance))
+                if len(results) >= k:
+                    # k개를 채우면 더 가까운 후보만 찾도록 한도를 줄입니다.
+                    results.sort(key=lambda item: item[1])
+                    results = results[:k]
+                    limit = results[-1][1]
+                    if limit == 0:
+                        break
+        results.sort(key=lambda item: item[1])
+        return results[:k]
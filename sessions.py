@@ -0,0 +1,227 @@
+# 세션 상태 압축 / 유휴 세션 정리
+# - 카드 ID 집합은 카드당 1비트 배열(BitSet)로 보관
+# - 일정 시간 요청이 없는 세션의 학습 상태는 디스크로 내보내고 메모리에서 비웠다가,
+#   세션이 돌아오면 다음 rerun에서 복원합니다.
+# - 세션별 메모리 사용량 보고
+# - Streamlit에 의존하지 않으므로 단독으로 테스트할 수 있습니다.
+
+import os
+import pickle
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+OFFLOADED_KEY = '__offloaded__'
+
+class BitSet:
+    """0 ~ size-1 정수의 집합을 비트 배열로 보관합니다."""
+    __slots__ = ('size', 'bits', 'count')
+
+    def __init__(self, size: int):
+        self.size = size
+        self.bits = np.zeros((size + 7) // 8, dtype=np.uint8)
+        self.count = 0
+
+    def add(self, value: int) -> None:
+        byte, mask = value >> 3, 1 << (value & 7)
+        if not self.bits[byte] & mask:
+            self.bits[byte] |= mask
+            self.count += 1
+
+    def discard(self, value: int) -> None:
+        byte, mask = value >> 3, 1 << (value & 7)
+        if self.bits[byte] & mask:
+            self.bits[byte] &= ~mask & 0xFF
+            self.count -= 1
+
+    def __contains__(self, value: int) -> bool:
+        return 0 <= value < self.size and bool(self.bits[value >> 3] & (1 << (value & 7)))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.to_array().tolist())
+
+    def to_array(self) -> np.ndarray:
+        """집합에 속한 값의 배열 (오름차순)"""
+        return np.flatnonzero(np.unpackbits(self.bits, bitorder='little')[:self.size])
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+
+def estimate_size(value: Any, _seen: Optional[set] = None) -> int:
+    """객체가 차지하는 대략적인 메모리(바이트). numpy 배열과 __slots__ 객체를 따라갑니다."""
+    seen = set() if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, np.ndarray):
+        # 자기 버퍼를 가진 배열은 getsizeof에 데이터 크기가 이미 포함됨 (뷰는 헤더만)
+        return sys.getsizeof(value)
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k, seen) + estimate_size(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, seen) for item in value)
+    elif hasattr(value, '__dict__'):
+        size += estimate_size(vars(value), seen)
+    elif hasattr(value, '__slots__'):
+        size += sum(estimate_size(getattr(value, slot), seen)
+                    for slot in value.__slots__ if hasattr(value, slot))
+    return size
+
+def state_breakdown(state: Dict[str, Any]) -> Dict[str, int]:
+    """상태 dict의 항목별 메모리(바이트)"""
+    return {str(key): estimate_size(value) for key, value in state.items()}
+
+class SessionEntry:
+    __slots__ = ('session_key', 'state', 'last_seen', 'active', 'offloaded_bytes')
+
+    def __init__(self, session_key: str, state: Dict[str, Any]):
+        self.session_key = session_key
+        self.state = state          # 세션의 학습 상태 dict (세션 상태와 같은 객체)
+        self.last_seen = time.monotonic()
+        self.active = 0             # 진행 중인 rerun 수
+        self.offloaded_bytes = 0
+
+class SessionRegistry:
+    """세션별 학습 상태를 추적하고 유휴 세션을 디스크로 내보냅니다."""
+
+    def __init__(self, offload_dir: str, idle_seconds: float = 1800.0, expire_seconds: float = 7 * 86400.0,
+                 check_interval: float = 60.0):
+        self.offload_dir = offload_dir
+        self.idle_seconds = idle_seconds
+        self.expire_seconds = expire_seconds   # 내보낸 뒤 이 시간 동안 돌아오지 않으면 파일까지 삭제
+        self.check_interval = check_interval
+        self._entries: Dict[str, SessionEntry] = {}
+        self._lock = threading.Lock()
+        self._reaper = threading.Thread(target=self._reap_loop, name="session-reaper", daemon=True)
+        self._reaper.start()
+
+    def _path(self, session_key: str) -> str:
+        return os.path.join(self.offload_dir, f"{session_key}.pkl")
+
+    def enter(self, session_key: str, state: Dict[str, Any]) -> None:
+        """rerun 시작: 세션을 사용 중으로 표시하고, 내보낸 상태가 있으면 복원합니다."""
+        with self._lock:
+            entry = self._entries.get(session_key)
+            if entry is None or entry.state is not state:
+                entry = self._entries[session_key] = SessionEntry(session_key, state)
+            entry.active += 1
+            entry.last_seen = time.monotonic()
+            if OFFLOADED_KEY in state:
+                self._restore(entry)
+
+    def leave(self, session_key: str) -> None:
+        """rerun 종료"""
+        with self._lock:
+            entry = self._entries.get(session_key)
+            if entry is not None:
+                entry.active = max(0, entry.active - 1)
+                entry.last_seen = time.monotonic()
+
+    def reap(self, now: Optional[float] = None) -> int:
+        """유휴 세션을 디스크로 내보내고 내보낸 세션 수를 반환합니다."""
+        now = time.monotonic() if now is None else now
+        offloaded = 0
+        expired: List[str] = []
+        with self._lock:
+            for entry in list(self._entries.values()):
+                idle = now - entry.last_seen
+                if entry.active or idle < self.idle_seconds:
+                    continue
+                if OFFLOADED_KEY not in entry.state:
+                    if self._offload(entry):
+                        offloaded += 1
+                elif idle >= self.idle_seconds + self.expire_seconds:
+                    # 브라우저 세션이 끝난 것으로 보고 추적 중단 (진행 상황은 진행 저장소에 남아 있음)
+                    expired.append(entry.session_key)
+        for session_key in expired:
+            self.forget(session_key)
+        return offloaded
+
+    def forget(self, session_key: str) -> None:
+        """세션 추적을 끝내고 내보낸 파일을 지웁니다."""
+        with self._lock:
+            self._entries.pop(session_key, None)
+        try:
+            os.remove(self._path(session_key))
+        except OSError:
+            pass
+
+    def summary(self) -> Dict[str, int]:
+        """추적 중인 세션 수 / 내보낸 세션 수 / 메모리에 있는 상태의 총 바이트"""
+        with self._lock:
+            entries = list(self._entries.values())
+            offloaded = [entry for entry in entries if OFFLOADED_KEY in entry.state]
+            resident_bytes = sum(estimate_size(entry.state) for entry in entries if OFFLOADED_KEY not in entry.state)
+        return {
+            'sessions': len(entries),
+            'offloaded': len(offloaded),
+            'resident_bytes': resident_bytes,
+            'offloaded_bytes': sum(entry.offloaded_bytes for entry in offloaded),
+        }
+
+    def memory_report(self) -> List[Dict[str, Any]]:
+        """세션별 메모리 사용량 (큰 순서)"""
+        now = time.monotonic()
+        with self._lock:
+            report = [{
+                'session': entry.session_key,
+                'bytes': estimate_size(entry.state),
+                'offloaded': OFFLOADED_KEY in entry.state,
+                'offloaded_bytes': entry.offloaded_bytes,
+                'idle_seconds': round(now - entry.last_seen, 1),
+            } for entry in self._entries.values()]
+        return sorted(report, key=lambda item: item['bytes'], reverse=True)
+
+    def _offload(self, entry: SessionEntry) -> bool:
+        # _lock을 잡은 상태에서 호출
+        path = self._path(entry.session_key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.offload_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(dict(entry.state), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except (OSError, pickle.PicklingError):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+        entry.offloaded_bytes = os.path.getsize(path)
+        entry.state.clear()
+        entry.state[OFFLOADED_KEY] = path
+        return True
+
+    def _restore(self, entry: SessionEntry) -> None:
+        # _lock을 잡은 상태에서 호출
+        path = entry.state[OFFLOADED_KEY]
+        try:
+            with open(path, 'rb') as f:
+                restored = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            # 파일이 없으면 빈 상태로 두고 호출 측에서 새로 초기화
+            restored = {}
+        entry.state.clear()
+        entry.state.update(restored)
+        entry.offloaded_bytes = 0
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _reap_loop(self) -> None:
+        while True:
+            time.sleep(self.check_interval)
+            try:
+                self.reap()
+            except Exception:
+                # 정리 실패는 다음 주기에 다시 시도
+                pass
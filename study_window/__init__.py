@@ -0,0 +1,29 @@
+# 브라우저 측 학습 창 컴포넌트
+# - 미리 렌더링한 카드 N장(앞/뒷면)을 한 번에 보내고, 뒤집기/이전/다음은 브라우저에서 처리
+# - 뒤집기/본 카드/어려워요/외웠어요 이벤트는 모아 두었다가 일괄 전송합니다.
+#   (일정 개수가 쌓이거나, 일정 시간이 지나거나, 창 밖으로 이동하거나, 탭이 숨겨질 때)
+
+import os
+from typing import Dict, List, Optional
+
+import streamlit.components.v1 as components
+
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'frontend')
+
+_component_func = components.declare_component("study_window", path=FRONTEND_DIR)
+
+EVENT_TYPES = ('flip', 'seen', 'difficult', 'mastered')
+
+def study_window(cards: List[Dict[str, object]], window_id: str, deck_version: str, start: int,
+                 position: int, total: int, css: str, batch_size: int = 20, flush_ms: int = 15000,
+                 height: int = 480, key: Optional[str] = None) -> Optional[Dict[str, object]]:
+    """학습 창을 그리고 마지막으로 받은 이벤트 묶음을 반환합니다 (아직 없으면 None).
+
+    cards: [{'card_id', 'front', 'back'}] - 전체 순서에서 start 위치부터의 카드
+    반환값: {'batch_id', 'window_id', 'deck_version', 'position', 'need_window', 'events'}
+    """
+    return _component_func(
+        cards=cards, window_id=window_id, deck_version=deck_version, start=start,
+        position=position, total=total, css=css, batch_size=batch_size, flush_ms=flush_ms,
+        height=height, key=key, default=None
+    )
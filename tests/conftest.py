@@ -0,0 +1,5 @@
+# 저장소 루트의 모듈(deck_store, scheduler 등)을 테스트에서 바로 불러올 수 있도록 경로에 추가
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
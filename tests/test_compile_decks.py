@@ -0,0 +1,42 @@
+import deck_store
+from compile_decks import compile_all, compile_deck
+
+CSV_TEXT = (
+    "German,Bedeutung,Beispiel,Wortart,Thema\n"
+    "leiden an,…로 고통받다,Viele leiden an Stress.,verb,Gesundheit\n"
+    "die Maßnahme,조치,,noun,Politik\n"
+)
+
+def write_csv(tmp_path, name="deck.csv", text=CSV_TEXT):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+def test_compile_writes_snapshot(tmp_path):
+    path = write_csv(tmp_path)
+    result = compile_deck(path)
+    assert result['ok'], result['errors']
+    assert result['rows'] == 2
+    assert deck_store.read_snapshot(path).version == result['version']
+
+def test_index_failure_is_reported_per_file(tmp_path, monkeypatch):
+    good = write_csv(tmp_path, "good.csv")
+    bad = write_csv(tmp_path, "bad.csv", CSV_TEXT.replace("Politik", "Boom"))
+    build_indexes = deck_store.build_indexes
+
+    def failing_build(store, search=False):
+        if 'Boom' in store.columns['theme']:
+            raise ValueError("boom")
+        return build_indexes(store, search)
+
+    monkeypatch.setattr(deck_store, 'build_indexes', failing_build)
+    results = list(compile_all([bad, good], jobs=1))
+    assert [result['ok'] for result in results] == [False, True]
+    assert results[0]['errors'] == ["인덱스를 만드는 중 오류가 발생했습니다: boom"]
+    assert 'indexes' in results[0]['timings']
+    assert not (tmp_path / "bad.deck.pkl").exists()
+
+def test_missing_file_is_reported(tmp_path):
+    result = compile_deck(str(tmp_path / "missing.csv"))
+    assert not result['ok']
+    assert result['errors']
@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+import deck_store
+from deck_store import (DeckFormatError, build_indexes, ingest_csv, load_or_build, read_snapshot,
+                        snapshot_path)
+
+CSV_TEXT = (
+    "German,Bedeutung,Beispiel,Wortart,Thema\n"
+    "leiden an,…로 고통받다,Viele leiden an Stress.,verb,Gesundheit\n"
+    ",,,,\n"
+    "die Maßnahme,조치,,noun,Politik\n"
+    "  Umwelt  ,환경,,noun,Umwelt\n"
+)
+
+def write_csv(tmp_path, text=CSV_TEXT, name="deck.csv"):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8-sig')
+    return str(path)
+
+def test_ingest_maps_columns_drops_empty_rows_and_strips(tmp_path):
+    store = ingest_csv(write_csv(tmp_path), chunk_rows=2)
+    assert len(store) == 3
+    assert store.columns['german_word'] == ['leiden an', 'die Maßnahme', 'Umwelt']
+    assert store.columns['pos'] == ['verb', 'noun', 'noun']
+    # 매핑되지 않은 필드는 빈 문자열, 덱 버전에는 매핑 여부가 반영됨
+    assert 'verb_case' not in store.fields
+    assert store.columns['verb_case'] == ['', '', '']
+
+def test_ingest_reports_progress(tmp_path):
+    calls = []
+    ingest_csv(write_csv(tmp_path), chunk_rows=1, on_progress=lambda fraction, rows: calls.append((fraction, rows)))
+    assert [rows for _, rows in calls] == [1, 1, 2, 3]
+    assert calls[-1][0] == pytest.approx(1.0)
+
+def test_ingest_rejects_missing_required_column(tmp_path):
+    with pytest.raises(DeckFormatError):
+        ingest_csv(write_csv(tmp_path, "German,Wortart\nHaus,noun\n"))
+    with pytest.raises(DeckFormatError):
+        ingest_csv(write_csv(tmp_path, ""))
+
+def test_filter_index_masks(tmp_path):
+    store = ingest_csv(write_csv(tmp_path))
+    build_indexes(store)
+    index = store.indexes['filter']
+    assert index.values('pos') == ['noun', 'verb']
+    assert index.union('pos', ['noun']).tolist() == [False, True, True]
+    assert index.union('pos', ['전체']) is None
+    assert index.flag_masks['with_examples'].tolist() == [True, False, False]
+    assert index.counts('theme') == {'Gesundheit': 1, 'Politik': 1, 'Umwelt': 1}
+
+def test_snapshot_round_trip_and_invalidation(tmp_path):
+    path = write_csv(tmp_path)
+    store = load_or_build(path, search=True)
+    assert os.path.exists(snapshot_path(path))
+
+    restored = read_snapshot(path)
+    assert restored is not None
+    assert restored.version == store.version
+    assert restored.keys == store.keys
+    assert set(restored.indexes) == {'filter', 'distractors', 'recall', 'search', 'fuzzy'}
+
+    # 내용이 바뀌면 스냅샷을 쓰지 않음
+    write_csv(tmp_path, CSV_TEXT + "das Haus,집,,noun,Wohnen\n")
+    assert read_snapshot(path) is None
+    assert len(load_or_build(path)) == 4
+
+def test_snapshot_restore_does_not_recompute_keys(tmp_path, monkeypatch):
+    path = write_csv(tmp_path)
+    store = load_or_build(path)
+
+    def fail(*args):
+        raise AssertionError("recomputed on snapshot load")
+
+    for name in ('compute_card_keys', 'compute_key_hashes', 'compute_deck_version'):
+        monkeypatch.setattr(deck_store, name, fail)
+    monkeypatch.setattr(deck_store.GrammarAnnotations, 'build', fail)
+    restored = read_snapshot(path)
+    assert restored.key_index == store.key_index == {key: card_id for card_id, key in enumerate(store.keys)}
+    assert restored.key_hashes.tolist() == store.key_hashes.tolist()
+
+def test_search_indexes_added_on_load_are_written_back(tmp_path, monkeypatch):
+    path = write_csv(tmp_path)
+    load_or_build(path)
+    assert 'search' not in read_snapshot(path).indexes
+
+    store = load_or_build(path, search=True)
+    assert {'search', 'fuzzy'} <= set(store.indexes)
+    # 다음 적재는 스냅샷의 검색 인덱스를 그대로 씀
+    monkeypatch.setattr(deck_store, 'build_indexes', lambda *args, **kwargs: pytest.fail("indexes rebuilt"))
+    restored = load_or_build(path, search=True)
+    assert restored.indexes['search'].terms == store.indexes['search'].terms
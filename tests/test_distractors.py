@@ -0,0 +1,52 @@
+import random
+
+import numpy as np
+
+from distractors import DistractorIndex, FeatureMatrix, candidate_blocks, factorize
+
+COLUMNS = {
+    'german_word': ['die Maßnahme', 'die Massnahme', 'die Maßnahmen', 'der Apfel', 'die Birne', 'laufen', 'gehen'],
+    'korean_meaning': ['조치', '대책', '조치', '사과', '배', '달리다', '가다'],
+    'theme': ['Politik', 'Politik', 'Politik', 'Essen', 'Essen', '', ''],
+    'pos': ['noun', 'noun', 'noun', 'noun', 'noun', 'verb', 'verb'],
+}
+
+def build(k=4):
+    return DistractorIndex.build(COLUMNS, len(COLUMNS['german_word']), k=k)
+
+def test_factorize_keeps_empty_as_minus_one():
+    assert factorize(['a', '', 'b', 'a']).tolist() == [0, -1, 1, 0]
+
+def test_feature_matrix_dense_rows():
+    rows = np.array([0, 0, 2])
+    matrix = FeatureMatrix(rows, np.array([1, 3, 0]), np.array([0.5, 0.25, 1.0], dtype=np.float32), 3, 4)
+    assert matrix.dense(np.array([2, 0, 1])).tolist() == [[1, 0, 0, 0], [0, 0.5, 0, 0.25], [0, 0, 0, 0]]
+
+def test_neighbours_exclude_self_same_meaning_and_same_word():
+    neighbours = build().neighbours
+    assert neighbours.shape == (7, 4)
+    first = [int(card) for card in neighbours[0] if card >= 0]
+    assert 0 not in first
+    assert 2 not in first           # 뜻이 같은 카드
+    assert 1 not in first           # 폴딩하면 같은 단어
+    # 같은 테마는 가산점을 받아 가장 가까운 후보가 됨
+    assert neighbours[3][0] == 4
+    # 작은 품사 그룹은 합쳐서 비교하므로 동사도 후보가 있음
+    assert (neighbours[5] >= 0).any()
+
+def test_options_include_answer_with_distinct_meanings():
+    index = build()
+    meanings = COLUMNS['korean_meaning']
+    for card_id in range(7):
+        options = index.options(card_id, meanings, 4, rng=random.Random(card_id))
+        assert card_id in options
+        assert len(options) == 4
+        assert len({meanings[option] for option in options}) == 4
+
+def test_candidate_blocks_split_large_groups():
+    pos = ['noun'] * 100 + ['verb'] * 40 + ['adj'] * 3 + ['adv'] * 2
+    blocks = candidate_blocks(pos, len(pos), block_size=30)
+    sizes = sorted(len(block) for block in blocks)
+    assert sum(sizes) == len(pos)
+    assert max(sizes) <= 30
+    assert sorted(np.concatenate(blocks).tolist()) == list(range(len(pos)))
@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+import os
+
+import pytest
+
+from exporter import export_columns, format_due, iter_export, write_export
+from progress_store import STATUS_DIFFICULT, STATUS_MASTERED
+
+FIELDS = ('german_word', 'korean_meaning', 'german_example', 'ko_example_translation', 'pos', 'theme')
+COLUMNS = {
+    'german_word': ['die Maßnahme', 'leiden <an>', 'der Apfel'],
+    'korean_meaning': ['조치', '…로 고통받다', '사과'],
+    'german_example': ['Maßnahmen\tergreifen', '', ''],
+    'ko_example_translation': ['조치를 취하다\n(관용)', '', ''],
+    'pos': ['noun', 'verb', 'noun'],
+    'theme': ['Politik und Gesellschaft', '', 'Essen'],
+}
+PROGRESS = {
+    0: {'status': STATUS_DIFFICULT, 'ease': 2.2, 'interval': 0.0, 'reps': 0, 'lapses': 1, 'due': 0.0},
+    1: {'status': STATUS_MASTERED},
+}
+
+def progress(card_id):
+    return PROGRESS.get(card_id)
+
+def grammar(card_id):
+    return '4격 지배' if card_id == 1 else ''
+
+def export(fmt, **kwargs):
+    return ''.join(iter_export(fmt, COLUMNS, [0, 1, 2], FIELDS, batch_rows=2, **kwargs))
+
+def test_columns_and_due_format():
+    assert export_columns(FIELDS)[-1] == 'theme'
+    assert export_columns(FIELDS, progress, grammar)[-7:] == ['status', 'ease', 'interval', 'reps', 'lapses',
+                                                              'due', 'grammar_notes']
+    assert format_due(0.0) == '1970-01-01T00:00:00+00:00'
+    assert format_due(float('inf')) is None
+    assert format_due(None) is None
+
+def test_csv_export_round_trips():
+    text = export('csv', progress=progress, grammar=grammar)
+    assert text.startswith('\ufeff')
+    rows = list(csv.DictReader(io.StringIO(text[1:])))
+    assert [row['german_word'] for row in rows] == COLUMNS['german_word']
+    assert rows[0]['ko_example_translation'] == '조치를 취하다\n(관용)'
+    assert (rows[0]['status'], rows[0]['lapses'], rows[0]['due']) == ('difficult', '1', '1970-01-01T00:00:00+00:00')
+    assert (rows[1]['status'], rows[1]['ease'], rows[1]['grammar_notes']) == ('mastered', '', '4격 지배')
+    assert rows[2]['status'] == ''
+
+def test_jsonl_export_one_card_per_line():
+    lines = export('jsonl', progress=progress).splitlines()
+    records = [json.loads(line) for line in lines]
+    assert len(records) == 3
+    assert records[1]['korean_meaning'] == '…로 고통받다'
+    assert records[1]['ease'] is None and records[1]['due'] is None
+    assert 'grammar_notes' not in records[0]
+
+def test_anki_export_escapes_and_tags():
+    text = export('anki', progress=progress, grammar=grammar)
+    lines = text.splitlines()
+    assert lines[:4] == ['#separator:tab', '#html:true', '#columns:Front\tBack\tTags', '#tags column:3']
+    lines = lines[4:]
+    assert len(lines) == 3
+    front, back, tags = lines[0].split('\t')
+    assert front == 'die Maßnahme'
+    assert '<i>Maßnahmen ergreifen</i>' in back
+    assert '조치를 취하다<br>(관용)' in back
+    assert tags == 'noun Politik_und_Gesellschaft difficult'
+    front, back, tags = lines[1].split('\t')
+    assert front == 'leiden &lt;an&gt;'
+    assert back.endswith('<small>4격 지배</small>')
+    assert tags == 'verb mastered'
+
+def test_unknown_format_and_file_write(tmp_path):
+    with pytest.raises(ValueError):
+        iter_export('xlsx', COLUMNS, [0], FIELDS)
+    path = str(tmp_path / 'deck.jsonl')
+    written = write_export(iter_export('jsonl', COLUMNS, [0, 2], FIELDS), path)
+    assert written == os.path.getsize(path)
+    assert os.listdir(tmp_path) == ['deck.jsonl']
+
+def test_failed_write_leaves_no_files(tmp_path):
+    def chunks():
+        yield 'partial'
+        raise RuntimeError('boom')
+    with pytest.raises(RuntimeError):
+        write_export(chunks(), str(tmp_path / 'deck.csv'))
+    assert os.listdir(tmp_path) == []
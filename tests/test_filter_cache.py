@@ -0,0 +1,65 @@
+from woca import LRUCache, normalize_filter_key
+
+def filters(**overrides):
+    values = {'query': '', 'pos': ['전체'], 'themes': ['전체'], 'reflexive_only': False,
+              'with_examples': False, 'with_grammar': False, 'with_translation': False}
+    values.update(overrides)
+    return values
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put(('a',), 1)
+    cache.put(('b',), 2)
+    assert cache.get(('a',)) == 1        # a가 가장 최근 사용
+    cache.put(('c',), 3)                 # b 축출
+    assert cache.get(('b',)) is None
+    assert cache.get(('a',)) == 1
+    assert cache.get(('c',)) == 3
+    cache.put(('a',), 10)                # 덮어쓰기도 최근 사용으로 갱신
+    cache.put(('d',), 4)                 # c 축출
+    assert cache.get(('c',)) is None
+    assert cache.get(('a',)) == 10
+    assert cache.stats() == {'size': 2, 'maxsize': 2, 'hits': 4, 'misses': 2, 'evictions': 2}
+
+def test_none_value_counts_as_miss():
+    cache = LRUCache(maxsize=4)
+    cache.put(('none',), None)
+    assert cache.get(('none',)) is None
+    assert cache.get(('missing',)) is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (0, 2)
+    # 거짓 값이라도 None이 아니면 적중
+    cache.put(('zero',), 0)
+    assert cache.get(('zero',)) == 0
+    assert cache.stats()['hits'] == 1
+
+def test_equivalent_selections_share_one_key():
+    base = normalize_filter_key(filters())
+    # '전체'가 들어 있거나 아무것도 고르지 않으면 필터 없음
+    assert normalize_filter_key(filters(pos=[], themes=['전체', 'Politik'])) == base
+    # 순서와 중복은 무시
+    assert (normalize_filter_key(filters(pos=['verb', 'noun', 'verb']))
+            == normalize_filter_key(filters(pos=['noun', 'verb'])))
+    # 검색어는 폴딩/공백 정리 후 비교
+    assert (normalize_filter_key(filters(query='  Maßnahmen  ERGREIFEN '))
+            == normalize_filter_key(filters(query='massnahmen ergreifen')))
+    # 참/거짓으로 해석되는 값은 같은 키
+    assert normalize_filter_key(filters(with_examples=1)) == normalize_filter_key(filters(with_examples=True))
+
+def test_different_selections_get_different_keys():
+    keys = {
+        normalize_filter_key(filters()),
+        normalize_filter_key(filters(pos=['noun'])),
+        normalize_filter_key(filters(themes=['noun'])),
+        normalize_filter_key(filters(query='haus')),
+        normalize_filter_key(filters(reflexive_only=True)),
+        normalize_filter_key(filters(with_grammar=True)),
+        normalize_filter_key(filters(with_translation=True)),
+    }
+    assert len(keys) == 7
+
+def test_shared_cache_hits_for_equivalent_filters():
+    cache = LRUCache(maxsize=8)
+    cache.put(('v1',) + normalize_filter_key(filters(pos=['verb', 'noun'])), 'result')
+    assert cache.get(('v1',) + normalize_filter_key(filters(pos=['noun', 'verb', 'noun']))) == 'result'
+    assert cache.get(('v2',) + normalize_filter_key(filters(pos=['noun', 'verb']))) is None
@@ -0,0 +1,63 @@
+import numpy as np
+
+from grammar import (CASE_AKK, CASE_DAT, CASE_GEN, EMPTY_STRUCTURE, GrammarAnnotations, case_explanation,
+                     narrow_codes, parse_cases, parse_structure, prep_explanation)
+
+def test_parse_structure_separates_object_and_prepositional_cases():
+    assert parse_structure('') == EMPTY_STRUCTURE
+    structure = parse_structure('jdm (Dat) etw. (Akk) geben')
+    assert structure.object_cases == CASE_DAT | CASE_AKK
+    assert structure.prep_cases == ()
+    structure = parse_structure('sich + auf + Akk')
+    assert structure.has_sich
+    assert structure.object_cases == 0
+    assert structure.prep_cases == (('auf', CASE_AKK),)
+
+def test_parse_structure_prepositions():
+    # 'gegen'에 들어 있는 'gen'을 2격으로 잡지 않음
+    assert parse_structure('gegen + Akk').prep_cases == (('gegen', CASE_AKK),)
+    assert parse_structure('für/gegen + Akk').prep_cases == (('für', CASE_AKK), ('gegen', CASE_AKK))
+    assert parse_structure('wegen + Gen').object_cases == 0
+    # 전치사 뒤에 격이 아닌 단어가 오면 관용구로 보고 버림
+    assert parse_structure('etw. in Betracht ziehen') == EMPTY_STRUCTURE
+
+def test_parse_cases_and_explanations():
+    assert parse_cases('Akk/Dat') == CASE_AKK | CASE_DAT
+    assert parse_cases('Genitiv.') == CASE_GEN
+    assert parse_cases('ohne') == 0
+    assert case_explanation(CASE_AKK | CASE_DAT).startswith('**4격')
+    assert prep_explanation('mit') == "함께/수단 (3격만: ~와 함께/~로써)"
+    assert prep_explanation('für/ohne').startswith('für: ')
+    assert prep_explanation('entlang') == '전치사: entlang'
+
+def test_annotations_build_and_get():
+    columns = {
+        'pos': ['Verb', 'Adjektiv', 'Nomen'],
+        'reflexive': ['ja', '', ''],
+        'complement_structure': ['sich + über + Akk', '', ''],
+        'verb_case': ['Akk', '', ''],
+        'verb_prep': ['über', '', ''],
+        'adj_case': ['', 'Dat', ''],
+        'adj_prep': ['', 'stolz auf', ''],
+    }
+    annotations = GrammarAnnotations.build(columns, 3)
+    verb = annotations.get(0)
+    assert verb.is_verb and verb.reflexive and not verb.is_adjective
+    assert verb.prep_cases == (('über', CASE_AKK),)
+    assert verb.verb_cases == CASE_AKK
+    assert verb.verb_prep_explanation.startswith('위/관하여')
+    adjective = annotations.get(1)
+    assert adjective.is_adjective and adjective.adj_cases == CASE_DAT
+    assert adjective.adj_prep_explanation == '전치사: stolz auf'
+    noun = annotations.get(2)
+    assert noun.prep_cases == () and noun.verb_prep_explanation == '' and noun.adj_prep_explanation == ''
+
+def test_code_arrays_fit_the_table_size():
+    codes = np.array([-1, 0, 5], dtype=np.int32)
+    assert narrow_codes(codes, 6).dtype == np.int8
+    assert narrow_codes(codes, 200).dtype == np.int16
+    assert narrow_codes(codes, 40000).dtype == np.int32
+    size = 40000
+    columns = {'pos': ['Adjektiv'] * size, 'adj_prep': [f'p{i}' for i in range(size)]}
+    annotations = GrammarAnnotations.build(columns, size)
+    assert annotations.get(size - 1).adj_prep_explanation == f'전치사: p{size - 1}'
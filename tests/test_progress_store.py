@@ -0,0 +1,120 @@
+import sqlite3
+import time
+
+import pytest
+
+from progress_store import STATUS_DIFFICULT, STATUS_MASTERED, ProgressStore
+
+def progress(status=STATUS_DIFFICULT, due=1000.0):
+    return {'status': status, 'ease': 2.5, 'interval': 0.0, 'reps': 0, 'lapses': 1, 'due': due}
+
+def stored_rows(db_path):
+    """저장소와 별개의 연결로 디스크에 반영된 행을 읽습니다."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT user_id, card_key, status, due FROM card_progress ORDER BY card_key").fetchall()
+    finally:
+        conn.close()
+
+def wait_until(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'progress.sqlite3')
+
+def test_record_is_buffered_until_flush(db_path):
+    store = ProgressStore(db_path, flush_interval=3600, batch_size=100)
+    try:
+        store.record('u1', 'k1', progress())
+        store.record('u1', 'k1', progress(STATUS_MASTERED))    # 같은 카드는 마지막 상태만
+        assert store.pending_count() == 1
+        assert stored_rows(db_path) == []
+        assert store.flush() == 1
+        assert store.pending_count() == 0
+        assert stored_rows(db_path) == [('u1', 'k1', STATUS_MASTERED, 1000.0)]
+        assert store.flush() == 0
+    finally:
+        store.close()
+
+def test_flushes_when_batch_size_is_reached(db_path):
+    store = ProgressStore(db_path, flush_interval=3600, batch_size=3)
+    try:
+        store.record('u1', 'k1', progress())
+        store.record('u1', 'k2', progress())
+        time.sleep(0.05)
+        assert stored_rows(db_path) == []
+        store.record('u1', 'k3', progress())
+        assert wait_until(lambda: len(stored_rows(db_path)) == 3)
+    finally:
+        store.close()
+
+def test_flushes_after_interval(db_path):
+    store = ProgressStore(db_path, flush_interval=0.05, batch_size=100)
+    try:
+        store.record('u1', 'k1', progress())
+        assert wait_until(lambda: len(stored_rows(db_path)) == 1)
+        assert store.pending_count() == 0
+    finally:
+        store.close()
+
+def test_failed_transaction_requeues_changes(db_path):
+    store = ProgressStore(db_path, flush_interval=3600, batch_size=100)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("CREATE TRIGGER reject BEFORE INSERT ON card_progress "
+                     "BEGIN SELECT RAISE(ABORT, 'rejected'); END")
+        conn.commit()
+        store.record('u1', 'k1', progress())
+        store.record('u1', 'k2', progress())
+        with pytest.raises(sqlite3.Error):
+            store.flush()
+        # 트랜잭션 전체가 취소되고 변경은 버퍼로 돌아옴
+        assert store.pending_count() == 2
+        assert stored_rows(db_path) == []
+        assert set(store.load_user('u1')) == {'k1', 'k2'}
+
+        conn.execute("DROP TRIGGER reject")
+        conn.commit()
+        assert store.flush() == 2
+        assert [row[1] for row in stored_rows(db_path)] == ['k1', 'k2']
+    finally:
+        conn.close()
+        store.close()
+
+def test_load_user_merges_pending_rows(db_path):
+    store = ProgressStore(db_path, flush_interval=3600, batch_size=100)
+    try:
+        store.record('u1', 'k1', progress(due=1.0))
+        store.record('u1', 'k2', progress(due=2.0))
+        store.record('u2', 'k1', progress(due=3.0))
+        store.flush()
+        # 아직 반영하지 않은 변경이 디스크의 값보다 우선
+        store.record('u1', 'k2', progress(STATUS_MASTERED, due=20.0))
+        store.record('u1', 'k3', progress(due=30.0))
+        loaded = store.load_user('u1')
+        assert sorted(loaded) == ['k1', 'k2', 'k3']
+        assert loaded['k1']['due'] == 1.0
+        assert (loaded['k2']['status'], loaded['k2']['due']) == (STATUS_MASTERED, 20.0)
+        assert loaded['k3'] == progress(due=30.0)
+        assert store.load_user('nobody') == {}
+    finally:
+        store.close()
+
+def test_close_flushes_pending_rows(db_path):
+    store = ProgressStore(db_path, flush_interval=3600, batch_size=100)
+    store.record('u1', 'k1', progress())
+    store.close()
+    store.close()
+    assert stored_rows(db_path) == [('u1', 'k1', STATUS_DIFFICULT, 1000.0)]
+
+    reopened = ProgressStore(db_path, flush_interval=3600, batch_size=100)
+    try:
+        assert reopened.load_user('u1')['k1']['status'] == STATUS_DIFFICULT
+    finally:
+        reopened.close()
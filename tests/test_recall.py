@@ -0,0 +1,59 @@
+import random
+
+from recall import (RecallIndex, answer_forms, bit_parallel_distance, edit_distance_within, normalize_answer,
+                    typo_limit)
+
+def levenshtein(a, b):
+    """기준 구현 (전체 DP 표)"""
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+def test_bit_parallel_distance_matches_reference():
+    rng = random.Random(11)
+    for _ in range(3000):
+        a = ''.join(rng.choice('abcü') for _ in range(rng.randint(0, 12)))
+        b = ''.join(rng.choice('abcü') for _ in range(rng.randint(0, 12)))
+        limit = rng.randint(0, 5)
+        expected = levenshtein(a, b)
+        capped = expected if expected <= limit else limit + 1
+        assert bit_parallel_distance(a, b, limit) == capped, (a, b, limit)
+        assert edit_distance_within(a, b, limit) == capped, (a, b, limit)
+
+def test_bit_parallel_distance_long_words():
+    # 64글자를 넘는 단어도 파이썬 정수 하나로 처리
+    a = 'donaudampfschifffahrtsgesellschaftskapitaen' * 2
+    b = a[:40] + 'x' + a[41:] + 'y'
+    assert bit_parallel_distance(a, b, 5) == levenshtein(a, b) == 2
+
+def test_normalize_and_answer_forms():
+    assert normalize_answer('  Die  Maßnahme!') == 'massnahme'
+    assert normalize_answer('sich die Zähne putzen') == 'zahne putzen'
+    assert set(answer_forms('(sich) weiterentwickeln')) == {'weiterentwickeln'}
+    assert set(answer_forms('der/die Mitarbeiter/in')) == {'mitarbeiter', 'mitarbeiterin'}
+    assert set(answer_forms('kämpfen für/gegen')) == {'kampfen fur', 'kampfen gegen'}
+    assert set(answer_forms('das Protein / das Eiweiß')) == {'protein', 'eiweiss'}
+    assert set(answer_forms('die Daten (Pl.)')) == {'daten', 'daten pl'}
+
+def test_typo_limit_grows_with_length():
+    assert [typo_limit(n) for n in (3, 4, 8, 9, 16, 17)] == [0, 1, 1, 2, 2, 3]
+
+def test_grading():
+    columns = {
+        'german_word': ['die Maßnahme', 'das Auto', 'der Wagen', 'Ei'],
+        'korean_meaning': ['조치', '자동차', '자동차', '달걀'],
+    }
+    index = RecallIndex.build(columns, 4)
+    assert index.grade(0, 'Massnahme') == (True, 0, 'massnahme')
+    assert index.grade(0, 'die Masnahme') == (True, 1, 'massnahme')
+    assert index.grade(0, 'Maßnhame') == (True, 2, 'massnahme')
+    assert index.grade(0, 'Mnahme') == (False, -1, '')
+    # 뜻이 같은 카드의 단어도 정답
+    assert index.grade(1, 'Wagen').correct
+    assert index.grade(2, 'auto').correct
+    # 짧은 단어는 오타를 허용하지 않음
+    assert not index.grade(3, 'Eo').correct
@@ -0,0 +1,107 @@
+import pytest
+
+from scheduler import (DAY_SECONDS, GRADE_EASY, GRADE_GOOD, GRADE_HARD, INITIAL_EASE,
+                       MIN_EASE, RELEARN_SECONDS, Scheduler)
+
+NOW = 1_000_000.0
+
+def test_sm2_intervals_grow_with_ease():
+    scheduler = Scheduler(10)
+    assert scheduler.review(3, GRADE_GOOD, NOW) == NOW + 1 * DAY_SECONDS
+    assert scheduler.review(3, GRADE_GOOD, NOW) == NOW + 6 * DAY_SECONDS
+    # GOOD(4)는 ease를 바꾸지 않으므로 세 번째 간격은 round(6 * 2.5) = 15일
+    assert scheduler.review(3, GRADE_GOOD, NOW) == NOW + 15 * DAY_SECONDS
+    state = scheduler.card_state(3)
+    assert state['reps'] == 3
+    assert state['interval'] == 15.0
+    assert state['ease'] == pytest.approx(INITIAL_EASE)
+
+def test_failed_card_relearns_and_loses_ease():
+    scheduler = Scheduler(10)
+    scheduler.review(1, GRADE_GOOD, NOW)
+    scheduler.review(1, GRADE_GOOD, NOW)
+    assert scheduler.review(1, GRADE_HARD, NOW) == NOW + RELEARN_SECONDS
+    state = scheduler.card_state(1)
+    assert (state['reps'], state['lapses'], state['interval']) == (0, 1, 0.0)
+    assert state['ease'] == pytest.approx(INITIAL_EASE - 0.54)
+    # 다시 맞히면 간격은 1일부터
+    assert scheduler.review(1, GRADE_GOOD, NOW) == NOW + DAY_SECONDS
+
+def test_ease_has_a_floor_and_easy_raises_it():
+    scheduler = Scheduler(10)
+    for _ in range(10):
+        scheduler.review(0, GRADE_HARD, NOW)
+    assert scheduler.card_state(0)['ease'] == pytest.approx(MIN_EASE)
+    scheduler.review(2, GRADE_EASY, NOW)
+    assert scheduler.card_state(2)['ease'] == pytest.approx(INITIAL_EASE + 0.1)
+
+def test_rejects_bad_grade_and_card_id():
+    scheduler = Scheduler(3)
+    with pytest.raises(ValueError):
+        scheduler.review(0, 6, NOW)
+    with pytest.raises(IndexError):
+        scheduler.review(3, GRADE_GOOD, NOW)
+
+def test_unscheduled_card_state_defaults():
+    scheduler = Scheduler(5)
+    assert not scheduler.is_scheduled(4)
+    assert scheduler.card_state(4) == {'ease': INITIAL_EASE, 'interval': 0.0, 'reps': 0, 'lapses': 0,
+                                       'due': float('inf')}
+    assert scheduler.scheduled_count() == 0
+
+def test_peek_returns_most_urgent_live_card():
+    scheduler = Scheduler(10)
+    scheduler.review(5, GRADE_HARD, NOW)           # NOW + 60초
+    scheduler.review(6, GRADE_GOOD, NOW)           # NOW + 1일
+    scheduler.review(7, GRADE_HARD, NOW - 30)      # NOW + 30초
+    assert scheduler.peek(NOW, ahead=0) is None
+    assert scheduler.peek(NOW + 30, ahead=0) == 7
+    # 다시 채점된 카드의 예전 힙 항목은 무시됨
+    scheduler.review(7, GRADE_GOOD, NOW)
+    assert scheduler.peek(NOW + 60, ahead=0) == 5
+
+def test_just_failed_card_is_not_served_again_through_learn_ahead():
+    scheduler = Scheduler(10)
+    scheduler.restore(1, INITIAL_EASE, 6.0, 2, 0, NOW)
+    # 하나뿐인 예정 카드를 '어려워요'로 채점하면 1분 뒤로 잡히지만 바로 다시 나오지는 않음
+    assert scheduler.peek(NOW) == 1
+    scheduler.review(1, GRADE_HARD, NOW)
+    assert scheduler.peek(NOW) is None
+    assert scheduler.peek(NOW + RELEARN_SECONDS) == 1
+    assert scheduler.due_count(NOW) == 1
+    # 미리 출제할 수 있는 다른 카드가 있으면 그 카드가 먼저
+    scheduler.restore(2, INITIAL_EASE, 1.0, 1, 0, NOW + 600)
+    assert scheduler.peek(NOW) == 2
+    assert scheduler.peek(NOW, ahead=0) is None
+
+def test_earlier_failed_cards_are_still_learned_ahead():
+    scheduler = Scheduler(10)
+    scheduler.review(3, GRADE_HARD, NOW)
+    scheduler.review(4, GRADE_HARD, NOW + 1)
+    # 4는 방금 틀렸으므로 제외, 먼저 틀린 3은 미리 출제
+    assert scheduler.peek(NOW + 1) == 3
+    # 복습을 새로 시작하면 방금 틀린 카드도 출제
+    scheduler.review(3, GRADE_GOOD, NOW + 2)
+    scheduler.review(4, GRADE_HARD, NOW + 2)
+    assert scheduler.peek(NOW + 2) is None
+    scheduler.start_review()
+    assert scheduler.peek(NOW + 2) == 4
+
+def test_due_count_skips_stale_entries():
+    scheduler = Scheduler(100)
+    for card_id in range(50):
+        scheduler.review(card_id, GRADE_HARD, NOW)
+    for card_id in range(0, 50, 2):
+        scheduler.review(card_id, GRADE_GOOD, NOW)
+    assert scheduler.due_count(NOW + RELEARN_SECONDS, ahead=0) == 25
+    assert scheduler.due_count(NOW + DAY_SECONDS, ahead=0) == 50
+    assert scheduler.due_count(NOW, ahead=0) == 0
+
+def test_restore_and_growth_beyond_initial_rows():
+    scheduler = Scheduler(1000)
+    for card_id in range(300):
+        scheduler.restore(card_id, 2.0, 3.0, 2, 1, NOW + card_id)
+    assert scheduler.scheduled_count() == 300
+    assert scheduler.card_state(299) == {'ease': 2.0, 'interval': 3.0, 'reps': 2, 'lapses': 1, 'due': NOW + 299}
+    assert scheduler.peek(NOW, ahead=0) == 0
+    assert scheduler.due_count(NOW + 99, ahead=0) == 100
@@ -0,0 +1,103 @@
+import random
+
+import numpy as np
+
+import search_index
+from search_index import (FuzzyIndex, SearchIndex, bounded_edit_distance, fold_text, normalize_query,
+                          particle_stems, strip_particle, tokenize)
+
+COLUMNS = {
+    'german_word': ['die Maßnahme', 'der Stress', 'für', 'die Last', 'der Apfel'],
+    'korean_meaning': ['조치', '스트레스', '~을 위해', '스트레스가 많은 짐', '사과'],
+    'german_example': ['Maßnahmen ergreifen', '', 'Das ist für dich.', '', ''],
+    'ko_example_translation': ['조치를 취하다', '', '너를 위한 것이다.', '', ''],
+}
+
+def build():
+    return SearchIndex.build(COLUMNS, len(COLUMNS['german_word']))
+
+def test_folding_and_tokenizing():
+    assert fold_text('Maßnahme Für') == 'massnahme fur'
+    assert normalize_query('  Maßnahmen,  ERGREIFEN ') == 'massnahmen ergreifen'
+    assert tokenize('조치를 취하다') == ['조치를', '취하다']
+
+def test_particle_stems_need_two_syllables_and_a_known_stem():
+    assert particle_stems('스트레스에서는') == ('스트레스', '스트레스에서')
+    assert particle_stems('나이') == ()
+    assert particle_stems('stress') == ()
+    assert strip_particle('스트레스를', {'스트레스'}) == '스트레스'
+    assert strip_particle('스트레스를', set()) is None
+    assert strip_particle('스트레스', {'스트레스'}) is None
+
+def test_prefix_search_intersects_tokens():
+    index = build()
+    assert index.search('mass').tolist() == [0]
+    assert index.search('massnahmen ergreifen').tolist() == [0]
+    assert index.search('Fur').tolist() == [2]
+    assert index.search('der').tolist() == [1, 4]
+    assert len(index.search('xyz')) == 0
+    assert index.search('  !! ') is None
+
+def test_query_particles_are_stripped_like_the_index():
+    index = build()
+    assert index.search('스트레스를').tolist() == [1, 3]
+    assert index.search('스트레스가').tolist() == [1, 3]
+    assert index.search('조치를').tolist() == [0]
+
+def test_one_syllable_stems_do_not_cause_false_positives():
+    columns = {'korean_meaning': ['나이', '나는 간다', '나의 집', '사과', '사랑', '변비가 사라지다', '음료', '음료가 아니다']}
+    index = SearchIndex.build(columns, len(columns['korean_meaning']), fields=('korean_meaning',))
+    assert index.search('나이').tolist() == [0]
+    assert index.search('나이가').tolist() == [0]
+    assert index.search('사과').tolist() == [3]
+    # 어휘에 단독으로 없는 어간은 쓰지 않음 ('사라지다'의 '사라'는 색인하지 않음)
+    assert '사라' not in index
+    assert index.search('음료가').tolist() == [6, 7]
+
+def test_short_prefix_is_not_truncated(monkeypatch):
+    words = [f'ab{i:04d}' for i in range(1500)] + ['xyz']
+    index = SearchIndex.build({'german_word': words}, len(words), fields=('german_word',))
+    assert len(index.term_range('ab')) > search_index.MASK_UNION_TERMS
+    assert index.search('ab').tolist() == list(range(1500))
+    assert index.search('ab00').tolist() == list(range(100))
+    # 마스크 합집합과 정렬 병합의 결과가 같음
+    monkeypatch.setattr(search_index, 'MASK_UNION_TERMS', 10)
+    assert index.search('ab00').tolist() == list(range(100))
+    assert index.search('a').tolist() == list(range(1500))
+
+def test_search_mask():
+    mask = build().search_mask('apfel')
+    assert mask.dtype == np.bool_
+    assert mask.tolist() == [False, False, False, False, True]
+
+# --- 오타 허용 검색 ---
+
+def levenshtein(a, b):
+    """기준 구현 (전체 DP 표)"""
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+def test_bounded_edit_distance_matches_reference():
+    rng = random.Random(7)
+    for _ in range(2000):
+        a = ''.join(rng.choice('abcd') for _ in range(rng.randint(0, 9)))
+        b = ''.join(rng.choice('abcd') for _ in range(rng.randint(0, 9)))
+        limit = rng.randint(0, 4)
+        expected = levenshtein(a, b)
+        assert bounded_edit_distance(a, b, limit) == (expected if expected <= limit else limit + 1), (a, b, limit)
+
+def test_fuzzy_lookup_ranks_by_distance():
+    index = FuzzyIndex.build(['die Maßnahme', 'Maßnahmen ergreifen', 'der Apfel', 'sich erholen', ''])
+    assert index.words[0] == 'massnahme'
+    assert index.lookup('Masnahme')[0] == (0, 1)
+    assert index.lookup('Masnahmen ergrefen', k=1) == [(1, 2)]
+    assert index.lookup('erholn') == [(3, 1)]
+    # 7글자 입력은 거리 1까지만 허용 (자리 바꿈은 거리 2)
+    assert index.lookup('erholne') == []
+    assert index.lookup('zzzz') == []
+    assert index.lookup('  ') == []
@@ -0,0 +1,64 @@
+import os
+import time
+
+import numpy as np
+
+from scheduler import GRADE_GOOD, Scheduler
+from sessions import OFFLOADED_KEY, BitSet, SessionRegistry, estimate_size
+
+def test_bitset_add_discard_and_iterate():
+    bits = BitSet(20)
+    for value in (0, 7, 8, 19, 7):
+        bits.add(value)
+    assert len(bits) == 4
+    assert 7 in bits and 6 not in bits and 25 not in bits and -1 not in bits
+    bits.discard(7)
+    bits.discard(7)
+    assert len(bits) == 3
+    assert list(bits) == [0, 8, 19]
+    assert bits.to_array().tolist() == [0, 8, 19]
+    assert bits.nbytes == 3
+
+def test_estimate_size_follows_arrays_and_slots():
+    bits = BitSet(80000)
+    assert estimate_size(bits) >= 10000
+    array = np.zeros(1000, dtype=np.float64)
+    assert estimate_size({'a': array, 'b': array}) < 2 * array.nbytes
+
+def make_registry(tmp_path):
+    return SessionRegistry(str(tmp_path), idle_seconds=10, expire_seconds=100, check_interval=3600)
+
+def test_idle_session_is_offloaded_and_restored(tmp_path):
+    registry = make_registry(tmp_path)
+    scheduler = Scheduler(100)
+    scheduler.review(42, GRADE_GOOD, 1000.0)
+    bits = BitSet(100)
+    bits.add(42)
+    state = {'difficult_cards': bits, 'scheduler': scheduler, 'total_cards_seen': 3}
+    registry.enter('s1', state)
+    registry.leave('s1')
+
+    # 사용 중이거나 아직 유휴 시간이 안 된 세션은 그대로
+    assert registry.reap(now=time.monotonic()) == 0
+    assert registry.reap(now=time.monotonic() + 60) == 1
+    assert list(state) == [OFFLOADED_KEY]
+    assert os.path.exists(state[OFFLOADED_KEY])
+    assert registry.summary()['offloaded'] == 1
+
+    registry.enter('s1', state)
+    assert 42 in state['difficult_cards']
+    assert state['scheduler'].card_state(42)['reps'] == 1
+    assert state['total_cards_seen'] == 3
+    assert not os.listdir(tmp_path)
+    registry.leave('s1')
+
+def test_active_session_is_not_offloaded_and_expired_is_forgotten(tmp_path):
+    registry = make_registry(tmp_path)
+    state = {'total_cards_seen': 1}
+    registry.enter('busy', state)
+    assert registry.reap(now=time.monotonic() + 60) == 0
+    registry.leave('busy')
+    assert registry.reap(now=time.monotonic() + 60) == 1
+    registry.reap(now=time.monotonic() + 1000)
+    assert registry.summary()['sessions'] == 0
+    assert not os.listdir(tmp_path)
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from timing import BUCKET_BOUNDS, PhaseTimer, RollingHistogram
+
+def test_rolling_histogram_percentiles_use_recent_window():
+    histogram = RollingHistogram(window=100)
+    for ms in range(1, 101):
+        histogram.observe(ms / 1000.0)
+    summary = histogram.summary()
+    assert summary['count'] == 100
+    assert summary['total_seconds'] == pytest.approx(5.05)
+    assert summary['last_ms'] == 100.0
+    assert summary['p50_ms'] == pytest.approx(50.5)
+    assert summary['p95_ms'] == pytest.approx(95.05)
+    assert summary['max_ms'] == 100.0
+
+    # 창이 가득 차면 오래된 값부터 밀려나지만 누적 횟수/합계는 유지
+    for _ in range(100):
+        histogram.observe(0.001)
+    summary = histogram.summary()
+    assert summary['count'] == 200
+    assert summary['p99_ms'] == summary['max_ms'] == 1.0
+    assert summary['total_seconds'] == pytest.approx(5.15)
+
+def test_empty_histogram_summary():
+    assert RollingHistogram().summary() == {'count': 0, 'total_seconds': 0.0}
+
+def test_disabled_timer_records_nothing():
+    timer = PhaseTimer(enabled=False)
+
+    @timer.timed()
+    def work():
+        return 42
+
+    with timer.phase('block'):
+        pass
+    assert work() == 42
+    assert timer.snapshot() == {}
+
+def test_enabled_timer_records_phases_and_exceptions():
+    timer = PhaseTimer(enabled=True)
+
+    @timer.timed('named')
+    def fail():
+        raise ValueError
+
+    with timer.phase('block'):
+        pass
+    with pytest.raises(ValueError):
+        fail()
+    snapshot = timer.snapshot()
+    assert list(snapshot) == ['block', 'named']
+    assert snapshot['named']['count'] == 1
+    timer.reset()
+    assert timer.snapshot() == {}
+
+def test_prometheus_buckets_are_cumulative():
+    timer = PhaseTimer(enabled=True)
+    for seconds in (0.0004, 0.003, 0.003, 20.0):
+        timer.observe('load', seconds)
+    lines = timer.to_prometheus().splitlines()
+    assert lines[:2] == ['# HELP woca_phase_seconds Time spent in each app phase.',
+                         '# TYPE woca_phase_seconds histogram']
+    buckets = [line for line in lines if line.startswith('woca_phase_seconds_bucket')]
+    assert len(buckets) == len(BUCKET_BOUNDS) + 1
+    assert buckets[0] == 'woca_phase_seconds_bucket{phase="load",le="0.0005"} 1'
+    assert 'woca_phase_seconds_bucket{phase="load",le="0.005"} 3' in buckets
+    assert buckets[-2] == 'woca_phase_seconds_bucket{phase="load",le="10.0"} 3'
+    assert buckets[-1] == 'woca_phase_seconds_bucket{phase="load",le="+Inf"} 4'
+    assert 'woca_phase_seconds_count{phase="load"} 4' in lines
+    assert float(lines[-2].split()[-1]) == pytest.approx(20.0064)
+
+def test_jsonl_and_file_export(tmp_path):
+    timer = PhaseTimer(enabled=True)
+    timer.observe('a', 0.01)
+    timer.observe('b', 0.02)
+    records = [json.loads(line) for line in timer.to_jsonl().splitlines()]
+    assert [record['phase'] for record in records] == ['a', 'b']
+    assert records[1]['p50_ms'] == 20.0
+    assert 'timestamp' in records[0]
+
+    jsonl_path = str(tmp_path / 'timings.jsonl')
+    timer.export(jsonl_path)
+    timer.export(jsonl_path)
+    assert len(open(jsonl_path, encoding='utf-8').read().splitlines()) == 4
+
+    prom_path = str(tmp_path / 'timings.prom')
+    timer.export(prom_path)
+    timer.export(prom_path)
+    assert open(prom_path, encoding='utf-8').read() == timer.to_prometheus()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['timings.jsonl', 'timings.prom']
+
+def test_export_if_due_respects_interval(tmp_path):
+    timer = PhaseTimer(enabled=True)
+    timer.observe('a', 0.01)
+    path = str(tmp_path / 'timings.jsonl')
+    assert timer.export_if_due(path, interval=3600.0)
+    assert not timer.export_if_due(path, interval=3600.0)
+    assert len(open(path, encoding='utf-8').read().splitlines()) == 1
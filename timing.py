@@ -0,0 +1,170 @@
+# 단계별 실행 시간 측정
+# - 단계(phase)마다 최근 측정값 창(rolling window)과 누적 히스토그램을 보관
+# - 꺼져 있을 때는 플래그 확인 한 번만 하므로 오버헤드가 거의 없습니다.
+# - JSON lines / Prometheus 텍스트 형식으로 내보내기
+# - Streamlit에 의존하지 않으므로 단독으로 테스트할 수 있습니다.
+
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+# 히스토그램 버킷 상한 (초). 마지막 +Inf 버킷은 암묵적으로 포함됩니다.
+BUCKET_BOUNDS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+WINDOW_SIZE = 1024
+
+_DISABLED = nullcontext()
+
+class RollingHistogram:
+    """최근 WINDOW_SIZE개 측정값과 전체 누적 버킷 카운트"""
+
+    def __init__(self, window: int = WINDOW_SIZE):
+        self.window = np.zeros(window, dtype=np.float64)
+        self.filled = 0
+        self.cursor = 0
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+
+    def observe(self, seconds: float) -> None:
+        self.window[self.cursor] = seconds
+        self.cursor = (self.cursor + 1) % len(self.window)
+        self.filled = min(self.filled + 1, len(self.window))
+        self.count += 1
+        self.total += seconds
+        self.buckets[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+
+    def summary(self) -> Dict[str, float]:
+        """최근 창의 백분위수(ms)와 누적 횟수/합계"""
+        recent = self.window[:self.filled] * 1000.0
+        if not len(recent):
+            return {'count': self.count, 'total_seconds': self.total}
+        p50, p95, p99 = np.percentile(recent, (50, 95, 99))
+        return {
+            'count': self.count,
+            'total_seconds': round(self.total, 6),
+            'last_ms': round(float(self.window[self.cursor - 1]) * 1000.0, 3),
+            'p50_ms': round(float(p50), 3),
+            'p95_ms': round(float(p95), 3),
+            'p99_ms': round(float(p99), 3),
+            'max_ms': round(float(recent.max()), 3),
+        }
+
+class PhaseTimer:
+    """단계별 실행 시간 기록기 (프로세스 전체에서 공유)"""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._histograms: Dict[str, RollingHistogram] = {}
+        self._lock = threading.Lock()
+        self._last_export = float('-inf')   # 첫 호출은 바로 내보냄 (monotonic 기준점은 임의)
+
+    def observe(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get(phase)
+            if histogram is None:
+                histogram = self._histograms[phase] = RollingHistogram()
+            histogram.observe(seconds)
+
+    def phase(self, name: str):
+        """with 블록의 실행 시간을 기록하는 컨텍스트 매니저 (꺼져 있으면 아무것도 하지 않음)"""
+        if not self.enabled:
+            return _DISABLED
+        return _PhaseContext(self, name)
+
+    def timed(self, name: Optional[str] = None) -> Callable:
+        """함수 실행 시간을 기록하는 데코레이터"""
+        def decorator(func: Callable) -> Callable:
+            phase_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(phase_name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """단계별 요약 통계"""
+        with self._lock:
+            return {phase: histogram.summary() for phase, histogram in sorted(self._histograms.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def to_jsonl(self) -> str:
+        """단계마다 한 줄씩 JSON lines 형식으로 반환합니다."""
+        timestamp = time.time()
+        return ''.join(
+            json.dumps(dict(stats, phase=phase, timestamp=timestamp)) + '\n'
+            for phase, stats in self.snapshot().items()
+        )
+
+    def to_prometheus(self, metric: str = 'woca_phase_seconds') -> str:
+        """Prometheus 텍스트 노출 형식의 히스토그램으로 반환합니다."""
+        lines: List[str] = [
+            f'# HELP {metric} Time spent in each app phase.',
+            f'# TYPE {metric} histogram',
+        ]
+        with self._lock:
+            for phase, histogram in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, count in zip(BUCKET_BOUNDS + (float('inf'),), histogram.buckets):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{metric}_bucket{{phase="{phase}",le="{le}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{phase="{phase}"}} {histogram.total!r}')
+                lines.append(f'{metric}_count{{phase="{phase}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path: str) -> None:
+        """확장자가 .prom이면 Prometheus 텍스트 파일로 교체 저장, 그 밖에는 JSON lines로 덧붙입니다."""
+        if path.endswith('.prom'):
+            # textfile collector가 쓰다 만 파일을 읽지 않도록 원자적으로 교체
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp_path, path)
+        else:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(self.to_jsonl())
+
+    def export_if_due(self, path: str, interval: float = 10.0) -> bool:
+        """마지막 내보내기 후 interval초가 지났으면 내보냅니다."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_export < interval:
+                return False
+            self._last_export = now
+        self.export(path)
+        return True
+
+class _PhaseContext:
+    __slots__ = ('timer', 'name', 'start')
+
+    def __init__(self, timer: PhaseTimer, name: str):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timer.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+# 프로세스 공용 측정기 (앱과 적재 모듈 deck_store가 같은 인스턴스에 기록)
+phase_timer = PhaseTimer(enabled=os.environ.get('WOCA_TIMING') == '1')
@@ -3,10 +3,44 @@
 # - 카테고리/테마별 학습 기능 추가
 # - UI/UX 개선 및 성능 최적화
 
+from __future__ import annotations
+
+import time
+SCRIPT_START = time.perf_counter()
+
 import streamlit as st
-import pandas as pd
+from streamlit.errors import StreamlitAPIException
+import numpy as np
+import os
+import sys
+import json
 import random
-from typing import Dict, List, Optional, Tuple
+import logging
+import textwrap
+import uuid
+import hashlib
+import html
+import shutil
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from deck_store import Card, CardStore, DeckFormatError, FilterIndex, load_or_build
+from scheduler import Scheduler, GRADE_HARD, GRADE_GOOD, GRADE_EASY
+from search_index import SearchIndex, FuzzyIndex, normalize_query
+from distractors import DistractorIndex
+from recall import RecallIndex
+from exporter import EXPORT_FORMATS, iter_export, write_export
+from progress_store import ProgressStore, STATUS_NONE, STATUS_DIFFICULT, STATUS_MASTERED
+from timing import phase_timer
+from sessions import BitSet, SessionRegistry, state_breakdown
+from study_window import study_window
+from grammar import CardGrammar, CASE_DAT, CASE_AKK, CASE_GEN, CASE_LABELS, case_explanation
+
+IMPORT_SECONDS = time.perf_counter() - SCRIPT_START
+logger = logging.getLogger(__name__)
 
 # --- 1) 페이지 설정 & 개선된 스타일 ---
 st.set_page_config(
@@ -16,9 +50,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# 개선된 CSS 스타일
-st.markdown("""
-<style>
+# 개선된 CSS 스타일 (카드 클릭 오버레이 포함)
+APP_CSS = """
     /* 메인 컨테이너 스타일링 */
     .main-container {
         max-width: 800px;
@@ -233,156 +266,308 @@ st.markdown("""
         margin: 10px 0;
         box-shadow: 0 2px 8px rgba(0,0,0,0.1);
     }
-</style>
-""", unsafe_allow_html=True)
+    
+    /* 카드 클릭 오버레이 버튼 */
+    .card-click-btn {
+        position: relative;
+        margin-top: -360px;   /* 카드 높이만큼 위로 올림 */
+        height: 350px;
+        width: 100%;
+        z-index: 10;
+        margin-bottom: -350px; /* 아래 공간 회수 */
+    }
+    .card-click-btn .stButton > button {
+        width: 100% !important;
+        height: 350px !important;
+        background: transparent !important;
+        border: none !important;
+        border-radius: 20px !important;
+        cursor: pointer !important;
+        opacity: 0 !important;   /* 완전 투명 */
+        margin: 0 !important;
+        padding: 0 !important;
+        box-shadow: none !important;
+    }
+    .card-click-btn .stButton > button:hover {
+        background: rgba(0, 123, 255, 0.05) !important;
+        border: 2px solid rgba(0, 123, 255, 0.3) !important;
+        opacity: 1 !important;   /* 호버 시 살짝 보이게 */
+    }
+    .card-click-btn .stButton > button:focus {
+        outline: none !important;
+        box-shadow: none !important;
+    }
+    
+    /* 사이드바 분포 막대 (HTML로 그려 차트 데이터 변환을 거치지 않음) */
+    .bar-chart {
+        margin: 5px 0 15px;
+        font-size: 0.85em;
+    }
+    .bar-row {
+        display: grid;
+        grid-template-columns: minmax(0, 2fr) minmax(0, 3fr) auto;
+        align-items: center;
+        gap: 8px;
+        margin: 4px 0;
+    }
+    .bar-label {
+        overflow: hidden;
+        text-overflow: ellipsis;
+        white-space: nowrap;
+    }
+    .bar-track {
+        background: #e9ecef;
+        border-radius: 4px;
+        height: 12px;
+    }
+    .bar-fill {
+        display: block;
+        background: linear-gradient(135deg, #007bff, #0056b3);
+        border-radius: 4px;
+        height: 100%;
+    }
+    .bar-count {
+        color: #666;
+        font-variant-numeric: tabular-nums;
+    }
+"""
 
-# --- 2) 데이터 처리 함수들 (최적화) ---
-@st.cache_data
-def load_data(file_path: str) -> Optional[pd.DataFrame]:
-    """CSV 파일을 로드하고 기본 전처리를 수행합니다."""
+def inject_stylesheet(css: str) -> None:
+    """스타일시트를 세션당 한 번만 페이지 <head>에 주입합니다 (내용 해시로 식별).
+    
+    head에 추가된 <style>은 rerun 사이에도 유지되므로 매 rerun마다 CSS를 다시 보내지 않습니다.
+    """
+    css_hash = hashlib.blake2b(css.encode('utf-8'), digest_size=8).hexdigest()
+    if st.session_state.get('injected_css') == css_hash:
+        return
+    script = f"""
+    <script>
+        const doc = window.parent.document;
+        const styleId = "woca-css-{css_hash}";
+        if (!doc.getElementById(styleId)) {{
+            doc.querySelectorAll('style[id^="woca-css-"]').forEach((el) => el.remove());
+            const style = doc.createElement("style");
+            style.id = styleId;
+            style.textContent = {json.dumps(css)};
+            doc.head.appendChild(style);
+        }}
+    </script>
+    """
     try:
-        df = pd.read_csv(file_path, encoding='utf-8-sig', engine='python')
-        df.columns = df.columns.str.strip()
-        
-        # 빈 행 제거
-        df = df.dropna(how='all')
-        
-        # 기본 데이터 정리
-        for col in df.columns:
-            if df[col].dtype == 'object':
-                df[col] = df[col].astype(str).str.strip()
-                df[col] = df[col].replace('nan', '')
-        
-        return df
+        # iframe 없이 실행 (window.parent === window)
+        st.html(script, unsafe_allow_javascript=True)
+    except TypeError:
+        # 구버전 Streamlit: 높이 0의 컴포넌트 iframe에서 부모 문서에 주입
+        import streamlit.components.v1 as components
+        components.html(script, height=0)
+    st.session_state.injected_css = css_hash
+
+inject_stylesheet(APP_CSS)
+
+# --- 1-1) 단계별 시간 측정 (서버를 WOCA_TIMING=1로 시작하면 켜짐, ?debug=1 패널에서 조회) ---
+# 측정기(timing.phase_timer)는 프로세스 공용이며 deck_store의 적재 단계도 같은 측정기에 기록합니다.
+# 한 세션이 모든 세션의 측정을 바꾸지 않도록 켜고 끄는 것은 서버 설정으로만 합니다.
+TIMING_EXPORT_PATH = os.environ.get('WOCA_TIMING_EXPORT')   # .prom 이면 Prometheus, 그 밖에는 JSON lines
+
+# --- 2) 데이터 처리 함수들 (적재/인덱스/스냅샷은 deck_store 모듈) ---
+@phase_timer.timed()
+def load_card_store(file_path: str, on_progress=None) -> Optional[CardStore]:
+    """스냅샷이 유효하면 재사용하고, 아니면 CSV를 스트리밍 적재합니다 (오류는 화면에 표시)."""
+    try:
+        return load_or_build(file_path, on_progress=on_progress)
     except FileNotFoundError:
         st.error(f"❌ 데이터 파일 '{file_path}'을(를) 찾을 수 없습니다.")
-        return None
+    except DeckFormatError as e:
+        st.error(f"❌ {e}")
     except Exception as e:
         st.error(f"❌ CSV 파일을 읽는 중 오류가 발생했습니다: {e}")
+    return None
+
+# --- 2-4) 공용 LRU 캐시 ---
+class LRUCache:
+    """스레드 안전한 크기 제한 LRU 캐시 (적중/미스/축출 카운터 포함)"""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Tuple) -> Optional[any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Tuple, value: any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+# --- 2-5) 프로세스 공용 덱 (모든 세션이 같은 읽기 전용 객체를 참조) ---
+class Deck:
+    """카드 저장소와 파생 인덱스를 묶은 읽기 전용 덱"""
+    __slots__ = ('path', 'store', 'filter_index', 'version')
+
+    def __init__(self, path: str, store: CardStore):
+        self.path = path
+        self.store = store
+        self.filter_index = store.indexes.get('filter')
+        if self.filter_index is None:
+            self.filter_index = FilterIndex.from_store(store)
+        self.version = store.version
+        # 세션 간에 공유되므로 마스크를 쓰기 금지로 고정합니다.
+        for masks in self.filter_index.value_masks.values():
+            for mask in masks.values():
+                mask.setflags(write=False)
+        for mask in self.filter_index.flag_masks.values():
+            if mask is not None:
+                mask.setflags(write=False)
+
+# 원본 CSV 변경 확인 주기 (초, 0이면 감시하지 않음)
+DECK_WATCH_SECONDS = float(os.environ.get('WOCA_DECK_WATCH_SECONDS', '5'))
+
+def stat_signature(path: str) -> Optional[Tuple[int, int]]:
+    """파일의 (크기, 수정시각) - 없으면 None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
         return None
+    return stat.st_size, stat.st_mtime_ns
 
-def standardize_columns(df: pd.DataFrame) -> Tuple[Optional[pd.DataFrame], Dict[str, str]]:
-    """컬럼명을 표준화하고 매핑을 생성합니다."""
-    cols_lower = [str(c).lower().strip() for c in df.columns]
-    
-    # 컬럼 매핑 후보들
-    column_candidates = {
-        'german_word': ['german_word', 'german', 'word', 'item', 'deutsch', 'wort'],
-        'korean_meaning': ['korean_meaning', 'korean', 'meaning', 'bedeutung', '의미', '뜻'],
-        'german_example': ['german_example_de', 'german_example', 'example', 'beispiel', '예문', '예시'],
-        'ko_example_translation': ['ko_example_translation', 'example_ko', '예문_번역', '예문해석', 'korean_example'],
-        'pos': ['pos', 'part of speech', 'wortart', '품사'],
-        'verb_case': ['verb_case', 'kasus (verb)', 'case'],
-        'verb_prep': ['verb_prep', 'präposition (verb)', 'preposition'],
-        'reflexive': ['reflexive', 'reflexiv', '재귀'],
-        'complement_structure': ['complement_structure', 'struktur', '문장 구조', 'structure'],
-        'theme': ['theme', 'type', 'category', 'thema', 'kategorie', '테마', '유형'],
-    }
-    
-    mapping = {}
-    for standard_name, candidates in column_candidates.items():
-        for candidate in candidates:
-            if candidate in cols_lower:
-                original_col = df.columns[cols_lower.index(candidate)]
-                mapping[standard_name] = original_col
-                break
-    
-    # 필수 컬럼 확인
-    required_columns = ['german_word', 'korean_meaning']
-    for required in required_columns:
-        if required not in mapping:
-            st.error(f"❌ 필수 컬럼이 없습니다: {required}")
-            return None, {}
-    
-    return df, mapping
-
-def safe_get(row: pd.Series, key: str, mapping: Dict[str, str], default: str = "") -> str:
-    """안전하게 행에서 값을 가져옵니다."""
-    if key in mapping and mapping[key] in row:
-        value = row[mapping[key]]
-        if pd.isna(value) or str(value).strip() in ['', 'nan', 'None']:
-            return default
-        return str(value).strip()
-    return default
-
-def get_unique_values(df: pd.DataFrame, mapping: Dict[str, str], key: str) -> List[str]:
-    """특정 컬럼의 고유값들을 반환합니다."""
-    if key not in mapping:
-        return []
-    
-    values = df[mapping[key]].dropna().astype(str).str.strip()
-    values = values[values != ''].unique().tolist()
-    return sorted([v for v in values if v not in ['nan', 'None', '']])
-
-# --- 3) 문법 설명 함수들 (개선) ---
-def get_case_explanation(case_info: str) -> str:
-    """격 정보에 대한 설명을 반환합니다."""
-    if not case_info:
-        return ""
-    
-    case_lower = case_info.lower()
-    explanations = []
-    
-    case_map = {
-        'nom': "**1격 (Nominativ)**: 주어 역할 - 누가/무엇이",
-        'akk': "**4격 (Akkusativ)**: 직접목적어 - 무엇을/누구를", 
-        'dat': "**3격 (Dativ)**: 간접목적어 - 누구에게/무엇에게",
-        'gen': "**2격 (Genitiv)**: 소유격 - ~의"
-    }
-    
-    for case_key, explanation in case_map.items():
-        if case_key in case_lower:
-            explanations.append(explanation)
-    
-    return " | ".join(explanations)
-
-def get_prep_explanation(prep_info: str) -> str:
-    """전치사에 대한 상세 설명을 반환합니다."""
-    if not prep_info:
-        return ""
-    
-    prep_map = {
-        'an': "접촉/위치 (3격: ~에서/~에게, 4격: ~로/~를 향해)",
-        'auf': "표면 위 (3격: ~위에서, 4격: ~위로)",
-        'bei': "근처/옆 (3격만: ~근처에서/~와 함께)", 
-        'für': "위해/~동안 (4격만: ~을/를 위해)",
-        'gegen': "반대/~쪽으로 (4격만: ~에 반대하여/~쪽으로)",
-        'in': "안/속 (3격: ~안에서, 4격: ~안으로)",
-        'mit': "함께/수단 (3격만: ~와 함께/~로써)",
-        'nach': "방향/시간 후 (3격만: ~후에/~로)",
-        'über': "위/관하여 (3격: ~위에서, 4격: ~위로/~에 관하여)",
-        'um': "주위/시간 (4격만: ~주위에/~시에)",
-        'unter': "아래/사이 (3격: ~아래에서, 4격: ~아래로)",
-        'von': "~로부터/~에 의해 (3격만: ~로부터/~의)",
-        'vor': "앞/시간 전 (3격: ~앞에서/~전에, 4격: ~앞으로)",
-        'zu': "~에게/~로 (3격만: ~에게/~로)"
-    }
-    
-    prep_clean = prep_info.lower().strip()
-    return prep_map.get(prep_clean, f"전치사: {prep_info}")
+class DeckRegistry:
+    """덱 경로별 현재 덱 (처음 요청한 세션 하나만 적재하고 나머지는 기다렸다가 공유)
+
+    원본 CSV가 바뀌면 감시 스레드가 요청 처리와 별도로 다시 적재하고 인덱스까지 만든 뒤
+    새 덱으로 한 번에 교체합니다. 실행 중인 rerun은 시작할 때 받은 덱을 끝까지 사용합니다.
+    """
+
+    def __init__(self, watch_interval: float = DECK_WATCH_SECONDS):
+        self._decks: Dict[str, Deck] = {}
+        self._lock = threading.Lock()
+        self._watch_interval = watch_interval
+        self._watchers: Dict[str, threading.Thread] = {}
+
+    def current(self, path: str) -> Optional[Deck]:
+        return self._decks.get(path)
+
+    def load(self, path: str, on_progress=None) -> Optional[Deck]:
+        deck = self._decks.get(path)
+        if deck is not None:
+            return deck
+        with self._lock:
+            deck = self._decks.get(path)
+            if deck is None:
+                store = load_card_store(path, on_progress=on_progress)
+                if store is None:
+                    return None
+                deck = Deck(path, store)
+                self._decks[path] = deck
+                prewarm_card_html(store)
+                self._start_watcher(path)
+        return deck
+
+    def reload(self, path: str) -> bool:
+        """원본을 다시 적재해 내용이 바뀌었으면 새 덱으로 교체합니다.
+        
+        감시 스레드에는 화면이 없으므로 오류는 로그로만 남기고 현재 덱을 유지합니다.
+        검색/유사 철자 인덱스도 여기서 만들어 교체 후 첫 요청이 기다리지 않게 합니다.
+        """
+        try:
+            store = load_or_build(path, search=True)
+        except (OSError, DeckFormatError) as e:
+            logger.warning("deck reload failed, keeping current deck: %s: %s", path, e)
+            return False
+        current = self._decks.get(path)
+        if current is not None and current.version == store.version:
+            return False
+        # 인덱스를 모두 만든 뒤 한 번의 대입으로 교체 (세션은 다음 rerun에서 새 덱을 받음)
+        deck = Deck(path, store)
+        prewarm_card_html(store)
+        with self._lock:
+            self._decks[path] = deck
+        logger.info("deck reloaded: %s %s -> %s (%d cards)", path,
+                    current.version if current is not None else None, deck.version, len(store))
+        return True
+
+    def _start_watcher(self, path: str) -> None:
+        # _lock을 잡은 상태에서 호출
+        if self._watch_interval <= 0 or path in self._watchers:
+            return
+        thread = threading.Thread(target=self._watch, args=(path,), name=f"deck-watcher-{path}", daemon=True)
+        self._watchers[path] = thread
+        thread.start()
+
+    def _watch(self, path: str) -> None:
+        last = stat_signature(path)
+        pending = None
+        while True:
+            time.sleep(self._watch_interval)
+            signature = stat_signature(path)
+            if signature is None or signature == last:
+                pending = None
+                continue
+            if signature != pending:
+                # 저장 중일 수 있으므로 한 주기 동안 그대로일 때 다시 적재
+                pending = signature
+                continue
+            try:
+                self.reload(path)
+            except Exception:
+                logger.exception("deck reload failed: %s", path)
+            last, pending = signature, None
+
+@st.cache_resource
+def get_deck_registry() -> DeckRegistry:
+    return DeckRegistry()
 
 # --- 4) 카드 렌더링 함수들 (개선) ---
-def render_question_card(row: pd.Series, mapping: Dict[str, str]) -> None:
-    """문제 카드를 렌더링합니다."""
-    german_word = safe_get(row, 'german_word', mapping, '단어 없음')
-    german_example = safe_get(row, 'german_example', mapping)
+# 각 면의 HTML 조각을 한 문자열로 조립해 st.markdown 한 번으로 출력합니다.
+# 조각 사이를 빈 줄로 구분해 기존처럼 각각 독립된 HTML 블록으로 해석됩니다.
+def join_html_blocks(blocks: List[str]) -> str:
+    """HTML 조각들을 각각 독립 블록으로 이어 붙입니다."""
+    return "\n\n".join(textwrap.dedent(block).strip() for block in blocks if block)
+
+def build_question_html(card: Card) -> str:
+    """문제 카드(앞면) HTML을 생성합니다."""
+    german_word = card.german_word or '단어 없음'
+    german_example = card.german_example
     
-    st.markdown(f"""
+    return join_html_blocks([f"""
     <div class="card-container">
         <div class="flashcard-front">
             <div class="german-word">{german_word}</div>
             {f'<div class="front-example">"{german_example}"</div>' if german_example else ''}
         </div>
     </div>
-    """, unsafe_allow_html=True)
+    """])
 
-def render_answer_card(row: pd.Series, mapping: Dict[str, str]) -> None:
-    """정답 카드를 렌더링합니다."""
-    german_word = safe_get(row, 'german_word', mapping, '단어 없음')
-    korean_meaning = safe_get(row, 'korean_meaning', mapping, '의미 없음')
-    pos = safe_get(row, 'pos', mapping, '품사 미상')
+def build_answer_html(card: Card) -> str:
+    """정답 카드(뒷면) HTML을 생성합니다."""
+    german_word = card.german_word or '단어 없음'
+    korean_meaning = card.korean_meaning or '의미 없음'
+    pos = card.pos or '품사 미상'
     
-    st.markdown(f"""
+    blocks = [f"""
     <div class="card-container">
         <div class="flashcard-back">
             <div class="german-word">{german_word}</div>
@@ -390,151 +575,217 @@ def render_answer_card(row: pd.Series, mapping: Dict[str, str]) -> None:
             <div class="pos-badge">{pos}</div>
         </div>
     </div>
-    """, unsafe_allow_html=True)
+    """]
     
     # 예문 표시
-    german_example = safe_get(row, 'german_example', mapping)
-    ko_example = safe_get(row, 'ko_example_translation', mapping)
+    german_example = card.german_example
+    ko_example = card.ko_example_translation
     
     if german_example:
         translation_html = ""
         if ko_example:
             translation_html = f'<div class="ko-example-translation">🔹 번역: {ko_example}</div>'
         
-        st.markdown(f"""
+        blocks.append(f"""
         <div class="example-box">
             <strong>🔸 예문:</strong> {german_example}
             {translation_html}
         </div>
-        """, unsafe_allow_html=True)
+        """)
     
-    # 문법 정보 렌더링
-    render_grammar_info(row, mapping, pos)
+    # 문법 정보
+    blocks.extend(build_grammar_blocks(card, pos))
+    return join_html_blocks(blocks)
+
+# 문장 구조의 격 지배 설명 (전치사 없이 요구되는 격 기준, 위에서부터 먼저 맞는 것)
+OBJECT_CASE_EXPLANATIONS = (
+    (CASE_DAT | CASE_AKK, "**3격 + 4격 지배**: 누구에게(3격) 무엇을(4격) 주는 동사"),
+    (CASE_DAT, "**3격 지배**: 간접목적어를 요구하는 동사"),
+    (CASE_AKK, "**4격 지배**: 직접목적어를 요구하는 동사"),
+    (CASE_GEN, "**2격 지배**: 소유관계나 특별한 의미관계를 나타내는 동사"),
+)
+
+def structure_explanations(grammar: CardGrammar) -> List[str]:
+    """문장 구조 주석으로부터 격 지배 설명 목록을 만듭니다."""
+    explanations = []
+    for cases, explanation in OBJECT_CASE_EXPLANATIONS:
+        if grammar.object_cases & cases == cases:
+            explanations.append(explanation)
+            break
+    for prep, case in grammar.prep_cases:
+        explanations.append(f"**{prep} + {CASE_LABELS[case]}**: 전치사 목적어를 요구하는 동사")
+    return explanations
+
+class GrammarNote(NamedTuple):
+    """카드 문법 정보 한 항목 (카드 뒷면 HTML과 내보내기 텍스트가 같은 항목을 사용)"""
+    kind: str           # 'reflexive' | 'structure' | 'prep' | 'case'
+    value: str          # 원문 (문장 구조, 전치사, 격 표기)
+    explanation: str    # 설명 (굵게 표시는 마크다운 **)
+
+def grammar_notes(card: Card) -> List[GrammarNote]:
+    """적재 시 계산한 문법 주석으로 카드의 문법 정보 항목을 만듭니다."""
+    grammar = card.grammar
+    notes = []
+    
+    # 동사: 재귀, 문장 구조(격 지배 설명), 전치사 또는 격 정보
+    if grammar.is_verb:
+        if grammar.reflexive:
+            notes.append(GrammarNote('reflexive', 'sich', ''))
+        complement_structure = card.complement_structure
+        if complement_structure:
+            notes.append(GrammarNote('structure', complement_structure, ' | '.join(structure_explanations(grammar))))
+        if card.verb_prep:
+            notes.append(GrammarNote('prep', card.verb_prep, grammar.verb_prep_explanation))
+        elif not complement_structure and card.verb_case and grammar.verb_cases:
+            # 격 정보만 있는 경우
+            notes.append(GrammarNote('case', card.verb_case, case_explanation(grammar.verb_cases)))
+    
+    # 형용사 + 전치사/격
+    elif grammar.is_adjective:
+        if card.adj_prep:
+            prep = f"{card.adj_prep}{f' + {card.adj_case}' if card.adj_case else ''}"
+            notes.append(GrammarNote('prep', prep, grammar.adj_prep_explanation))
+        elif grammar.adj_cases:
+            notes.append(GrammarNote('case', card.adj_case, case_explanation(grammar.adj_cases)))
+    return notes
+
+# 내보내기 텍스트의 항목 이름
+GRAMMAR_NOTE_LABELS = {'reflexive': "재귀동사", 'structure': "문장 구조", 'prep': "전치사", 'case': "격 지배"}
 
-def render_grammar_info(row: pd.Series, mapping: Dict[str, str], pos: str) -> None:
-    """문법 정보를 렌더링합니다."""
+def grammar_notes_text(card: Card) -> str:
+    """문법 정보 항목을 한 줄 텍스트로 만듭니다 (내보내기용)."""
+    parts = []
+    for note in grammar_notes(card):
+        parts.append(f"{GRAMMAR_NOTE_LABELS[note.kind]}: {note.value}")
+        if note.explanation:
+            parts.append(note.explanation)
+    return ' | '.join(parts).replace('**', '')
+
+def build_grammar_blocks(card: Card, pos: str) -> List[str]:
+    """문법 정보 HTML 조각들을 생성합니다 (적재 시 계산한 문법 주석만 읽음)."""
+    blocks = []
     grammar_sections = []
     
-    # 동사 관련 정보
-    if "verb" in pos.lower():
-        # 재귀동사 체크
-        reflexive = safe_get(row, 'reflexive', mapping)
-        if reflexive.lower() in ['ja', 'yes', 'true', '1']:
+    for note in grammar_notes(card):
+        if note.kind == 'reflexive':
             grammar_sections.append("🔄 **재귀동사 (Reflexives Verb)** - sich와 함께 사용")
-        
-        # 문장 구조
-        complement_structure = safe_get(row, 'complement_structure', mapping)
-        if complement_structure:
-            st.markdown(f"""
+        elif note.kind == 'structure':
+            blocks.append(f"""
             <div class="case-structure">
-                <strong>📝 문장 구조:</strong> <code>{complement_structure}</code>
+                <strong>📝 문장 구조:</strong> <code>{note.value}</code>
             </div>
-            """, unsafe_allow_html=True)
+            """)
             
             # 격 지배 설명
-            structure_lower = complement_structure.lower()
-            explanations = []
-            
-            if 'dat' in structure_lower and 'akk' in structure_lower:
-                explanations.append("**3격 + 4격 지배**: 누구에게(3격) 무엇을(4격) 주는 동사")
-            elif 'dat' in structure_lower:
-                explanations.append("**3격 지배**: 간접목적어를 요구하는 동사")
-            elif 'akk' in structure_lower:
-                explanations.append("**4격 지배**: 직접목적어를 요구하는 동사")
-            elif 'gen' in structure_lower:
-                explanations.append("**2격 지배**: 소유관계나 특별한 의미관계를 나타내는 동사")
-            
-            if explanations:
-                st.markdown(f"""
+            if note.explanation:
+                blocks.append(f"""
                 <div class="grammar-explanation">
-                    {' | '.join(explanations)}
+                    {note.explanation}
                 </div>
-                """, unsafe_allow_html=True)
-        
-        # 전치사 정보
-        prep = safe_get(row, 'verb_prep', mapping)
-        if prep:
-            prep_explanation = get_prep_explanation(prep)
-            st.markdown(f"""
+                """)
+        elif note.kind == 'prep':
+            blocks.append(f"""
             <div class="grammar-explanation">
-                <strong>🔗 전치사:</strong> <code>{prep}</code><br/>
-                {prep_explanation}
+                <strong>🔗 전치사:</strong> <code>{note.value}</code><br/>
+                {note.explanation}
             </div>
-            """, unsafe_allow_html=True)
-        elif not complement_structure:
-            # 격 정보만 있는 경우
-            case = safe_get(row, 'verb_case', mapping)
-            if case:
-                case_explanation = get_case_explanation(case)
-                if case_explanation:
-                    st.markdown(f"""
-                    <div class="grammar-explanation">
-                        <strong>📋 격 지배:</strong> {case}<br/>
-                        {case_explanation}
-                    </div>
-                    """, unsafe_allow_html=True)
-    
-    # 명사-동사 복합어
-    elif "nomen-verb" in pos.lower():
-        complement_structure = safe_get(row, 'complement_structure', mapping)
-        if complement_structure:
-            st.markdown(f"""
-            <div class="case-structure">
-                <strong>📝 명사-동사 구조:</strong> <code>{complement_structure}</code>
+            """)
+        else:
+            blocks.append(f"""
+            <div class="grammar-explanation">
+                <strong>📋 격 지배:</strong> {note.value}<br/>
+                {note.explanation}
             </div>
-            """, unsafe_allow_html=True)
+            """)
     
     # 테마 정보
-    theme = safe_get(row, 'theme', mapping)
+    theme = card.theme
     if theme:
         grammar_sections.append(f"🏷️ **테마**: {theme}")
     
     # 추가 정보 섹션
     if grammar_sections:
         sections_html = "".join([f"<li>{section}</li>" for section in grammar_sections])
-        st.markdown(f"""
+        blocks.append(f"""
         <div class="grammar-info">
             <div class="grammar-title">📚 추가 정보</div>
             <ul>{sections_html}</ul>
         </div>
-        """, unsafe_allow_html=True)
+        """)
+    
+    return blocks
+
+def build_meaning_html(card: Card) -> str:
+    """직접 입력 문제(뜻을 보고 독일어 쓰기) HTML을 생성합니다."""
+    korean_meaning = card.korean_meaning or '의미 없음'
+    ko_example = card.ko_example_translation
+    
+    return join_html_blocks([f"""
+    <div class="card-container">
+        <div class="flashcard-front">
+            <div class="korean-meaning">{korean_meaning}</div>
+            {f'<div class="pos-badge">{card.pos}</div>' if card.pos else ''}
+            {f'<div class="front-example">"{ko_example}"</div>' if ko_example else ''}
+        </div>
+    </div>
+    """])
+
+CARD_FACE_BUILDERS = {
+    'question': build_question_html,
+    'answer': build_answer_html,
+    'meaning': build_meaning_html,
+}
+# 덱 적재 시 미리 만들어 두는 면 (직접 입력 문제 면은 요청 시 생성)
+PREWARM_FACES = ('question', 'answer')
+
+# --- 4-1) 카드 HTML 캐시 (프로세스 공용) ---
+@st.cache_resource
+def get_card_html_cache() -> LRUCache:
+    """(덱 버전, 카드 ID, 면) -> 완성된 HTML 캐시"""
+    return LRUCache(maxsize=20000)
+
+def get_card_html(store: CardStore, card_id: int, face: str) -> str:
+    """캐시를 거쳐 카드 한 면의 완성된 HTML을 반환합니다."""
+    cache = get_card_html_cache()
+    key = (store.version, card_id, face)
+    html = cache.get(key)
+    if html is None:
+        html = CARD_FACE_BUILDERS[face](store.get(card_id))
+        cache.put(key, html)
+    return html
+
+@phase_timer.timed()
+def render_card(store: CardStore, card_id: int, face: str) -> None:
+    """카드 한 면을 st.markdown 한 번으로 렌더링합니다."""
+    st.markdown(get_card_html(store, card_id, face), unsafe_allow_html=True)
+
+@st.cache_resource
+def get_prewarm_registry() -> Dict[str, threading.Thread]:
+    """덱 버전별 HTML 사전 생성 스레드 목록"""
+    return {}
+
+def prewarm_card_html(store: CardStore) -> Optional[threading.Thread]:
+    """덱 전체의 카드 HTML을 백그라운드 스레드에서 미리 생성합니다 (덱 버전당 1회)."""
+    cache = get_card_html_cache()
+    if len(store) * len(PREWARM_FACES) > cache.maxsize:
+        # 캐시에 다 들어가지 않는 덱은 요청 시 생성만 사용
+        return None
+    
+    def worker():
+        for card_id in range(len(store)):
+            card = store.get(card_id)
+            for face in PREWARM_FACES:
+                cache.put((store.version, card_id, face), CARD_FACE_BUILDERS[face](card))
+    
+    thread = threading.Thread(target=worker, name=f"card-html-prewarm-{store.version}", daemon=True)
+    if get_prewarm_registry().setdefault(store.version, thread) is not thread:
+        return None
+    thread.start()
+    return thread
 
 # --- 5) 카드 전체를 덮는 투명 버튼 오버레이 (권장) ---
 def create_card_click_area() -> bool:
     """카드 클릭을 위한 투명 버튼 오버레이"""
-    st.markdown("""
-    <style>
-        .card-click-btn {
-            position: relative;
-            margin-top: -360px;   /* 카드 높이만큼 위로 올림 */
-            height: 350px;
-            width: 100%;
-            z-index: 10;
-            margin-bottom: -350px; /* 아래 공간 회수 */
-        }
-        .card-click-btn .stButton > button {
-            width: 100% !important;
-            height: 350px !important;
-            background: transparent !important;
-            border: none !important;
-            border-radius: 20px !important;
-            cursor: pointer !important;
-            opacity: 0 !important;   /* 완전 투명 */
-            margin: 0 !important;
-            padding: 0 !important;
-            box-shadow: none !important;
-        }
-        .card-click-btn .stButton > button:hover {
-            background: rgba(0, 123, 255, 0.05) !important;
-            border: 2px solid rgba(0, 123, 255, 0.3) !important;
-            opacity: 1 !important;   /* 호버 시 살짝 보이게 */
-        }
-        .card-click-btn .stButton > button:focus {
-            outline: none !important;
-            box-shadow: none !important;
-        }
-    </style>
-    """, unsafe_allow_html=True)
 
     st.markdown('<div class="card-click-btn">', unsafe_allow_html=True)
     # ✅ 고정 key를 써야 클릭 상태가 유지됩니다.
@@ -544,18 +795,26 @@ def create_card_click_area() -> bool:
 
 
 # --- 6) 필터링 기능 ---
-def create_filter_section(df: pd.DataFrame, mapping: Dict[str, str]) -> Dict[str, any]:
+def create_filter_section(index: FilterIndex) -> Dict[str, any]:
     """필터링 섹션을 생성하고 필터 값들을 반환합니다."""
     st.markdown("### 🔍 학습 필터")
     
     with st.container():
         st.markdown('<div class="filter-container">', unsafe_allow_html=True)
         
+        # 검색어
+        query = st.text_input(
+            "🔎 단어 검색",
+            key="search_query",
+            placeholder="예: Massnahmen, leiden an, 스트레스",
+            help="독일어 단어, 한국어 뜻, 예문에서 검색합니다 (움라우트/ß 없이 입력해도 됩니다)"
+        )
+        
         col1, col2 = st.columns(2)
         
         with col1:
             # 품사 필터
-            pos_options = get_unique_values(df, mapping, 'pos')
+            pos_options = index.values('pos')
             selected_pos = st.multiselect(
                 "품사 선택",
                 options=['전체'] + pos_options,
@@ -565,7 +824,7 @@ def create_filter_section(df: pd.DataFrame, mapping: Dict[str, str]) -> Dict[str
         
         with col2:
             # 테마 필터  
-            theme_options = get_unique_values(df, mapping, 'theme')
+            theme_options = index.values('theme')
             selected_themes = st.multiselect(
                 "테마 선택",
                 options=['전체'] + theme_options,
@@ -606,6 +865,7 @@ def create_filter_section(df: pd.DataFrame, mapping: Dict[str, str]) -> Dict[str
         st.markdown('</div>', unsafe_allow_html=True)
     
     return {
+        'query': query.strip(),
         'pos': selected_pos,
         'themes': selected_themes,
         'reflexive_only': reflexive_only,
@@ -614,82 +874,263 @@ def create_filter_section(df: pd.DataFrame, mapping: Dict[str, str]) -> Dict[str
         'with_translation': with_translation
     }
 
-def apply_filters(df: pd.DataFrame, mapping: Dict[str, str], filters: Dict[str, any]) -> pd.DataFrame:
-    """필터를 적용하여 데이터를 걸러냅니다."""
-    filtered_df = df.copy()
-    
-    # 품사 필터
-    if '전체' not in filters['pos'] and filters['pos']:
-        if 'pos' in mapping:
-            filtered_df = filtered_df[
-                filtered_df[mapping['pos']].isin(filters['pos'])
-            ]
-    
-    # 테마 필터
-    if '전체' not in filters['themes'] and filters['themes']:
-        if 'theme' in mapping:
-            filtered_df = filtered_df[
-                filtered_df[mapping['theme']].isin(filters['themes'])
-            ]
-    
-    # 재귀동사 필터
-    if filters['reflexive_only'] and 'reflexive' in mapping:
-        reflexive_col = mapping['reflexive']
-        filtered_df = filtered_df[
-            filtered_df[reflexive_col].str.lower().isin(['ja', 'yes', 'true', '1'])
-        ]
-    
-    # 예문 필터
-    if filters['with_examples'] and 'german_example' in mapping:
-        example_col = mapping['german_example']
-        filtered_df = filtered_df[
-            (filtered_df[example_col].notna()) & 
-            (filtered_df[example_col].str.strip() != '') &
-            (filtered_df[example_col] != 'nan')
-        ]
-    
-    # 문법 정보 필터
-    if filters['with_grammar']:
-        grammar_cols = []
-        for col_key in ['verb_case', 'verb_prep', 'complement_structure']:
-            if col_key in mapping:
-                grammar_cols.append(mapping[col_key])
-        
-        if grammar_cols:
-            grammar_condition = pd.Series([False] * len(filtered_df), index=filtered_df.index)
-            for col in grammar_cols:
-                grammar_condition |= (
-                    (filtered_df[col].notna()) & 
-                    (filtered_df[col].str.strip() != '') &
-                    (filtered_df[col] != 'nan')
-                )
-            filtered_df = filtered_df[grammar_condition]
+@phase_timer.timed()
+def apply_filters(index: FilterIndex, filters: Dict[str, any], search: Optional[SearchIndex] = None) -> np.ndarray:
+    """필터 마스크를 교집합하여 해당하는 카드 ID 배열을 반환합니다."""
+    mask = np.ones(index.size, dtype=bool)
+    
+    # 검색어 (역색인 결과 마스크)
+    if search is not None and filters.get('query'):
+        search_mask = search.search_mask(filters['query'])
+        if search_mask is not None:
+            mask &= search_mask
+    
+    # 품사/테마 필터 (선택 값들의 합집합)
+    for field, key in (('pos', 'pos'), ('theme', 'themes')):
+        selected = index.union(field, filters[key])
+        if selected is not None:
+            mask &= selected
+    
+    # 플래그 필터 (재귀동사/예문/문법 정보/번역)
+    for flag, key in (('reflexive', 'reflexive_only'), ('with_examples', 'with_examples'),
+                      ('with_grammar', 'with_grammar'), ('with_translation', 'with_translation')):
+        flag_mask = index.flag_masks[flag]
+        if filters[key] and flag_mask is not None:
+            mask &= flag_mask
+    
+    return np.flatnonzero(mask)
+
+# --- 6-1) 필터 결과 캐시 (프로세스 공용 LRU) ---
+def build_bar_chart_html(counts: Dict[str, int]) -> str:
+    """값별 개수(내림차순)로 가로 막대 HTML을 만듭니다.
+    
+    st.vega_lite_chart는 인라인 데이터를 pandas로 변환하므로 스냅샷으로 시작해도 pandas를 불러옵니다.
+    """
+    largest = max(counts.values())
+    rows = "".join(
+        f'<div class="bar-row" title="{html.escape(label)}: {count:,}">'
+        f'<span class="bar-label">{html.escape(label)}</span>'
+        f'<span class="bar-track"><span class="bar-fill" style="width: {100.0 * count / largest:.1f}%"></span></span>'
+        f'<span class="bar-count">{count:,}</span></div>'
+        for label, count in counts.items()
+    )
+    return f'<div class="bar-chart">{rows}</div>'
+
+class FilterResult:
+    """필터 결과: 카드 ID 배열, 품사/테마 분포와 막대 HTML (세션 간 공유, 읽기 전용)
     
-    # 번역 필터
-    if filters['with_translation'] and 'ko_example_translation' in mapping:
-        translation_col = mapping['ko_example_translation']
-        filtered_df = filtered_df[
-            (filtered_df[translation_col].notna()) & 
-            (filtered_df[translation_col].str.strip() != '') &
-            (filtered_df[translation_col] != 'nan')
-        ]
+    필터 상태마다 한 번만 집계하므로 뒤집기/다음 카드 rerun에서는 집계나 차트 변환이 없습니다.
+    """
+    __slots__ = ('card_ids', 'pos_counts', 'theme_counts', 'pos_chart', 'theme_chart')
+
+    def __init__(self, card_ids: np.ndarray, pos_counts: Dict[str, int], theme_counts: Dict[str, int]):
+        card_ids.setflags(write=False)
+        self.card_ids = card_ids
+        self.pos_counts = pos_counts
+        self.theme_counts = theme_counts
+        self.pos_chart = build_bar_chart_html(pos_counts) if pos_counts else None
+        self.theme_chart = build_bar_chart_html(theme_counts) if theme_counts else None
+
+def normalize_filter_key(filters: Dict[str, any]) -> Tuple:
+    """같은 의미의 필터 조합이 같은 키가 되도록 정규화합니다."""
+    def selection(values: List[str]) -> Tuple[str, ...]:
+        if not values or '전체' in values:
+            return ()
+        return tuple(sorted(set(values)))
+    
+    return (
+        normalize_query(filters.get('query', '')),
+        selection(filters['pos']),
+        selection(filters['themes']),
+        bool(filters['reflexive_only']),
+        bool(filters['with_examples']),
+        bool(filters['with_grammar']),
+        bool(filters['with_translation']),
+    )
+
+@st.cache_resource
+def get_filter_cache() -> LRUCache:
+    """프로세스 전체에서 공유하는 (덱 버전, 정규화된 필터 키) -> FilterResult 캐시"""
+    return LRUCache(maxsize=256)
+
+def get_filtered_cards(index: FilterIndex, deck_version: str, filters: Dict[str, any],
+                       search: Optional[SearchIndex] = None) -> FilterResult:
+    """캐시를 거쳐 필터 결과를 반환합니다 (미스일 때만 마스크 연산)."""
+    cache = get_filter_cache()
+    key = (deck_version,) + normalize_filter_key(filters)
+    result = cache.get(key)
+    if result is None:
+        card_ids = apply_filters(index, filters, search)
+        result = FilterResult(card_ids, index.counts('pos', card_ids), index.counts('theme', card_ids))
+        cache.put(key, result)
+    return result
+
+# --- 6-2) 전문 검색 인덱스 (덱 버전당 1회 생성) ---
+@st.cache_resource(max_entries=4)
+def get_search_index(_store: CardStore, deck_version: str) -> SearchIndex:
+    """단어/의미/예문 검색 인덱스를 덱 버전마다 한 번 생성해 공유합니다 (컴파일된 스냅샷에 있으면 그대로 사용)."""
+    index = _store.indexes.get('search')
+    return index if index is not None else SearchIndex.build(_store.columns, len(_store))
+
+@st.cache_resource(max_entries=4)
+def get_fuzzy_index(_store: CardStore, deck_version: str) -> FuzzyIndex:
+    """오타 허용 검색용 3-gram 인덱스를 덱 버전마다 한 번 생성해 공유합니다 (컴파일된 스냅샷에 있으면 그대로 사용)."""
+    index = _store.indexes.get('fuzzy')
+    return index if index is not None else FuzzyIndex.build(_store.columns['german_word'])
+
+def render_search_suggestions(store: CardStore, query: str, k: int = 5) -> None:
+    """검색 결과가 없을 때 철자가 가까운 단어를 제안합니다."""
+    matches = get_fuzzy_index(store, store.version).lookup(query, k=k)
+    suggestions = list(dict.fromkeys(store.value(card_id, 'german_word') for card_id, _ in matches))
+    if not suggestions:
+        return
     
-    return filtered_df
+    def use_suggestion(word: str):
+        st.session_state.search_query = word
+    
+    st.info("🤔 혹시 이 단어를 찾으셨나요?")
+    cols = st.columns(len(suggestions))
+    for col, word in zip(cols, suggestions):
+        with col:
+            st.button(word, key=f"suggest_{word}", on_click=use_suggestion, args=(word,))
+
+# --- 6-3) 학습 순서 (세션 시드 + 안정 카드 키) ---
+# 섞인 순서를 세션마다 목록으로 들고 있지 않고, 카드 키 해시를 시드로 뒤섞은 값의
+# 정렬 순서로 계산합니다. 필터나 덱 버전이 바뀌어도 같은 카드끼리의 상대 순서가 유지됩니다.
+def mix_key_hashes(key_hashes: np.ndarray, seed: int) -> np.ndarray:
+    """키 해시를 시드와 섞습니다 (splitmix64 마무리 함수)."""
+    with np.errstate(over='ignore'):
+        z = key_hashes ^ np.uint64(seed)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+@st.cache_resource
+def get_order_cache() -> LRUCache:
+    """(덱 버전, 필터, 시드) -> 학습 순서 카드 ID 배열"""
+    return LRUCache(maxsize=16)
+
+def get_study_order(store: CardStore, result: FilterResult, filters: Dict[str, any], seed: int) -> np.ndarray:
+    """필터된 카드를 세션 시드 순서로 정렬한 카드 ID 배열 (읽기 전용)"""
+    cache = get_order_cache()
+    key = (store.version,) + normalize_filter_key(filters) + (seed,)
+    order = cache.get(key)
+    if order is None:
+        card_ids = result.card_ids
+        order = card_ids[np.argsort(mix_key_hashes(store.key_hashes[card_ids], seed), kind='stable')]
+        order.setflags(write=False)
+        cache.put(key, order)
+    return order
+
+def locate_card(order: np.ndarray, card_id: Optional[int]) -> Optional[int]:
+    """학습 순서에서 카드의 위치 (없으면 None)"""
+    if card_id is None:
+        return None
+    positions = np.flatnonzero(order == card_id)
+    return int(positions[0]) if len(positions) else None
+
+# --- 6-4) 객관식 오답 보기 인덱스 (덱 적재/컴파일 시 계산해 스냅샷에 저장) ---
+@st.cache_resource(max_entries=4)
+def get_distractor_index(_store: CardStore, deck_version: str) -> DistractorIndex:
+    """카드별 오답 후보 인덱스 (스냅샷에 없으면 덱 버전마다 한 번 생성)"""
+    index = _store.indexes.get('distractors')
+    return index if index is not None else DistractorIndex.build(_store.columns, len(_store))
+
+# --- 6-5) 직접 입력 허용 답안 (덱 적재/컴파일 시 계산해 스냅샷에 저장) ---
+@st.cache_resource(max_entries=4)
+def get_recall_index(_store: CardStore, deck_version: str) -> RecallIndex:
+    """카드별 허용 답안 정규화 형태 (스냅샷에 없으면 덱 버전마다 한 번 생성)"""
+    index = _store.indexes.get('recall')
+    return index if index is not None else RecallIndex.build(_store.columns, len(_store))
 
 # --- 7) 학습 통계 및 진행률 관리 ---
+PROGRESS_DB_PATH = os.environ.get('WOCA_PROGRESS_DB', 'progress.sqlite3')
+
+@st.cache_resource
+def get_progress_store() -> ProgressStore:
+    """프로세스 전체에서 공유하는 진행 상황 저장소 (쓰기는 백그라운드 일괄 반영)"""
+    return ProgressStore(PROGRESS_DB_PATH)
+
+def get_user_id() -> str:
+    """학습자 ID를 반환합니다 (URL의 uid 파라미터, 없으면 새로 발급해 URL에 기록)."""
+    user_id = st.query_params.get('uid')
+    if not user_id:
+        user_id = uuid.uuid4().hex
+        st.query_params['uid'] = user_id
+    return user_id
+
 class LearningStats:
     """학습 통계를 관리하는 클래스"""
     
-    def __init__(self):
-        if 'learning_stats' not in st.session_state:
-            st.session_state.learning_stats = {
+    def __init__(self, card_store: Optional[CardStore] = None):
+        self.card_store = card_store
+        self.deck_size = len(card_store) if card_store is not None else 0
+        # 세션 정리기가 추적하는 dict를 그대로 쓰도록 제자리에서 채웁니다.
+        stats = st.session_state.setdefault('learning_stats', {})
+        if 'user_id' not in stats:
+            stats.update({
                 'total_cards_seen': 0,
                 'correct_answers': 0,
                 'cards_flipped': 0,
-                'session_start_time': pd.Timestamp.now(),
-                'difficult_cards': set(),
-                'mastered_cards': set()
-            }
+                'questions_answered': 0,
+                'session_start_time': datetime.now(),
+                'difficult_cards': BitSet(self.deck_size),
+                'mastered_cards': BitSet(self.deck_size),
+                'scheduler': None,
+                'user_id': get_user_id(),
+                'deck_version': card_store.version if card_store is not None else None,
+            })
+            if card_store is not None:
+                self.load_progress()
+        elif card_store is not None and stats.get('deck_version') != card_store.version:
+            # 덱이 바뀌면 행 번호가 달라지므로 카드 키로 저장된 진행 상황에서 다시 구성
+            stats['deck_version'] = card_store.version
+            stats['difficult_cards'] = BitSet(self.deck_size)
+            stats['mastered_cards'] = BitSet(self.deck_size)
+            stats['scheduler'] = None
+            self.load_progress()
+    
+    def load_progress(self):
+        """저장된 진행 상황을 한 번의 조회로 불러옵니다."""
+        stats = st.session_state.learning_stats
+        progress = get_progress_store().load_user(stats['user_id'])
+        scheduler = self.get_scheduler()
+        
+        for card_key, values in progress.items():
+            card_id = self.card_store.key_index.get(card_key)
+            if card_id is None:
+                # 덱에서 삭제된 카드
+                continue
+            if values['status'] == STATUS_DIFFICULT:
+                stats['difficult_cards'].add(card_id)
+            elif values['status'] == STATUS_MASTERED:
+                stats['mastered_cards'].add(card_id)
+            if values['due'] is not None:
+                scheduler.restore(card_id, values['ease'], values['interval'],
+                                  values['reps'], values['lapses'], values['due'])
+    
+    def card_progress(self, card_id: int) -> Dict[str, float]:
+        """카드 한 장의 학습 상태와 (채점된 카드면) 복습 일정"""
+        stats = st.session_state.learning_stats
+        if card_id in stats['mastered_cards']:
+            status = STATUS_MASTERED
+        elif card_id in stats['difficult_cards']:
+            status = STATUS_DIFFICULT
+        else:
+            status = STATUS_NONE
+        
+        progress = {'status': status}
+        scheduler = stats['scheduler']
+        if scheduler is not None and scheduler.is_scheduled(card_id):
+            progress.update(scheduler.card_state(card_id))
+        return progress
+    
+    def save_progress(self, card_id: int):
+        """카드 상태를 저장소 버퍼에 기록합니다 (디스크 쓰기는 백그라운드)."""
+        if self.card_store is None:
+            return
+        stats = st.session_state.learning_stats
+        get_progress_store().record(stats['user_id'], self.card_store.keys[card_id], self.card_progress(card_id))
     
     def increment_cards_seen(self):
         st.session_state.learning_stats['total_cards_seen'] += 1
@@ -697,16 +1138,63 @@ class LearningStats:
     def increment_flips(self):
         st.session_state.learning_stats['cards_flipped'] += 1
     
-    def mark_difficult(self, card_index):
-        st.session_state.learning_stats['difficult_cards'].add(card_index)
+    def mark_difficult(self, card_id):
+        """"어려워요" - 어려운 카드로 표시하고 곧 다시 출제합니다 (저장은 한 번)."""
+        st.session_state.learning_stats['difficult_cards'].add(card_id)
+        self.get_scheduler().review(card_id, GRADE_HARD)
+        self.save_progress(card_id)
+    
+    def mark_mastered(self, card_id):
+        """"외웠어요" - 학습 완료로 표시하고 복습 간격을 늘립니다 (저장은 한 번)."""
+        st.session_state.learning_stats['mastered_cards'].add(card_id)
+        st.session_state.learning_stats['difficult_cards'].discard(card_id)
+        self.get_scheduler().review(card_id, GRADE_EASY)
+        self.save_progress(card_id)
+    
+    def record_answer(self, card_id: int, correct: bool):
+        """퀴즈 답을 반영합니다 (틀리면 어려운 카드로 표시하고 곧 다시 출제)."""
+        stats = st.session_state.learning_stats
+        stats['questions_answered'] = stats.get('questions_answered', 0) + 1
+        if correct:
+            stats['correct_answers'] += 1
+            self.review_card(card_id, GRADE_GOOD)
+        else:
+            self.mark_difficult(card_id)
     
-    def mark_mastered(self, card_index):
-        st.session_state.learning_stats['mastered_cards'].add(card_index)
-        st.session_state.learning_stats['difficult_cards'].discard(card_index)
+    def get_scheduler(self) -> Scheduler:
+        """간격 반복 스케줄러 (덱 크기가 바뀌면 새로 생성)"""
+        stats = st.session_state.learning_stats
+        if stats.get('scheduler') is None or stats['scheduler'].size != self.deck_size:
+            stats['scheduler'] = Scheduler(self.deck_size)
+        return stats['scheduler']
+    
+    def review_card(self, card_id: int, grade: int):
+        """카드 응답을 스케줄러에 반영합니다."""
+        self.get_scheduler().review(card_id, grade)
+        self.save_progress(card_id)
+    
+    def apply_events(self, events: List[Dict[str, any]]):
+        """브라우저 학습 창에서 일괄 전송된 이벤트(뒤집기/본 카드/어려워요/외웠어요)를 반영합니다."""
+        for event in events:
+            try:
+                card_id = int(event['card_id'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if not 0 <= card_id < self.deck_size:
+                continue
+            kind = event.get('type')
+            if kind == 'flip':
+                self.increment_flips()
+            elif kind == 'seen':
+                self.increment_cards_seen()
+            elif kind == 'difficult':
+                self.mark_difficult(card_id)
+            elif kind == 'mastered':
+                self.mark_mastered(card_id)
     
     def get_session_duration(self):
         start_time = st.session_state.learning_stats['session_start_time']
-        return pd.Timestamp.now() - start_time
+        return datetime.now() - start_time
     
     def get_stats_summary(self):
         stats = st.session_state.learning_stats
@@ -718,9 +1206,12 @@ class LearningStats:
             'session_duration': duration,
             'difficult_count': len(stats['difficult_cards']),
             'mastered_count': len(stats['mastered_cards']),
+            'questions_answered': stats.get('questions_answered', 0),
+            'correct_answers': stats['correct_answers'],
             'avg_flips_per_card': stats['cards_flipped'] / max(1, stats['total_cards_seen'])
         }
 
+@phase_timer.timed()
 def render_progress_section(current_pos: int, total_cards: int, stats: LearningStats):
     """진행률 섹션을 렌더링합니다."""
     progress_percentage = (current_pos + 1) / total_cards
@@ -739,19 +1230,42 @@ def render_progress_section(current_pos: int, total_cards: int, stats: LearningS
     </div>
     """, unsafe_allow_html=True)
 
+# --- 7-1) 세션 상태 정리 (유휴 세션은 디스크로 내보냈다가 돌아오면 복원) ---
+SESSION_DIR = os.environ.get('WOCA_SESSION_DIR', '.sessions')
+SESSION_IDLE_SECONDS = float(os.environ.get('WOCA_SESSION_IDLE_SECONDS', '1800'))
+
+@st.cache_resource
+def get_session_registry() -> SessionRegistry:
+    """프로세스 전체에서 공유하는 세션 추적기 (백그라운드 스레드가 주기적으로 유휴 세션 정리)"""
+    return SessionRegistry(SESSION_DIR, idle_seconds=SESSION_IDLE_SECONDS)
+
+@contextmanager
+def session_activity():
+    """실행 중인 동안 세션을 정리 대상에서 빼고, 내보낸 학습 상태가 있으면 먼저 복원합니다."""
+    if 'session_key' not in st.session_state:
+        st.session_state.session_key = uuid.uuid4().hex
+    session_key = st.session_state.session_key
+    registry = get_session_registry()
+    registry.enter(session_key, st.session_state.setdefault('learning_stats', {}))
+    try:
+        yield
+    finally:
+        registry.leave(session_key)
+
 # --- 8) 향상된 네비게이션 ---
-def create_navigation_controls(current_pos: int, total_cards: int, stats: LearningStats):
-    """네비게이션 컨트롤을 생성합니다."""
+@phase_timer.timed()
+def create_navigation_controls(current_pos: int, total_cards: int, stats: LearningStats, review_mode: bool = False):
+    """네비게이션 컨트롤을 생성합니다. 복습 모드에서는 스케줄러 순서로만 이동합니다."""
     col1, col2, col3, col4, col5 = st.columns([1, 1, 1.5, 1, 1])
     
     navigation_actions = {}
     
     with col1:
-        if st.button("⏮️ 처음", help="첫 번째 카드로 이동"):
+        if st.button("⏮️ 처음", help="첫 번째 카드로 이동", disabled=review_mode):
             navigation_actions['action'] = 'first'
     
     with col2:
-        if st.button("⬅️ 이전", help="이전 카드로 이동", disabled=(current_pos <= 0)):
+        if st.button("⬅️ 이전", help="이전 카드로 이동", disabled=(review_mode or current_pos <= 0)):
             navigation_actions['action'] = 'previous'
     
     with col3:
@@ -759,11 +1273,11 @@ def create_navigation_controls(current_pos: int, total_cards: int, stats: Learni
             navigation_actions['action'] = 'flip'
     
     with col4:
-        if st.button("➡️ 다음", help="다음 카드로 이동", disabled=(current_pos >= total_cards - 1)):
+        if st.button("➡️ 다음", help="다음 카드로 이동", disabled=(not review_mode and current_pos >= total_cards - 1)):
             navigation_actions['action'] = 'next'
     
     with col5:
-        if st.button("⏭️ 마지막", help="마지막 카드로 이동"):
+        if st.button("⏭️ 마지막", help="마지막 카드로 이동", disabled=review_mode):
             navigation_actions['action'] = 'last'
     
     # 두 번째 행 - 학습 관리 버튼들
@@ -771,29 +1285,161 @@ def create_navigation_controls(current_pos: int, total_cards: int, stats: Learni
     col6, col7, col8, col9 = st.columns(4)
     
     with col6:
-        if st.button("🔀 카드 섞기", help="카드 순서를 무작위로 섞습니다"):
+        if st.button("🔀 카드 섞기", help="카드 순서를 무작위로 섞습니다", disabled=review_mode):
             navigation_actions['action'] = 'shuffle'
     
     with col7:
         if st.button("😅 어려워요", help="이 카드를 어려운 카드로 표시"):
-            current_idx = st.session_state.get('current_card_index', 0)
-            stats.mark_difficult(current_idx)
+            card_id = st.session_state.current_card_id
+            stats.mark_difficult(card_id)
             st.success("어려운 카드로 표시했습니다!")
+            if review_mode:
+                navigation_actions['action'] = 'graded'
     
     with col8:
         if st.button("✅ 외웠어요", help="이 카드를 외운 카드로 표시"):
-            current_idx = st.session_state.get('current_card_index', 0)
-            stats.mark_mastered(current_idx)
+            card_id = st.session_state.current_card_id
+            stats.mark_mastered(card_id)
             st.success("외운 카드로 표시했습니다!")
+            if review_mode:
+                navigation_actions['action'] = 'graded'
     
     with col9:
-        if st.button("🎯 어려운 카드만", help="어려운 카드들만 다시 학습"):
+        if review_mode:
+            if st.button("📚 전체 카드로", help="복습 모드를 끝내고 필터된 카드로 돌아갑니다"):
+                navigation_actions['action'] = 'exit_review'
+        elif st.button("🎯 어려운 카드만", help="어려운 카드들을 복습 일정(간격 반복) 순서로 다시 학습"):
             navigation_actions['action'] = 'difficult_only'
     
     return navigation_actions
 
+# --- 8-1) 객관식 퀴즈 (오답 보기는 미리 계산한 가까운 카드에서 조회) ---
+STUDY_MODE_FLIP = "🃏 카드 뒤집기"
+STUDY_MODE_QUIZ = "📝 객관식"
+STUDY_MODE_RECALL = "⌨️ 직접 입력"
+STUDY_MODES = (STUDY_MODE_FLIP, STUDY_MODE_QUIZ, STUDY_MODE_RECALL)
+# 학습 방식별 문제 상태의 세션 키
+QUESTION_STATE_KEYS = {STUDY_MODE_QUIZ: 'quiz', STUDY_MODE_RECALL: 'recall'}
+QUIZ_OPTION_COUNT = 4
+
+def get_question_state(card_store: CardStore, card_id: int, state_key: str,
+                       make_fields: Optional[Callable[[], Dict[str, any]]] = None) -> Dict[str, any]:
+    """현재 카드의 문제 상태 (카드나 덱이 바뀔 때만 make_fields()로 추가 항목을 만듦)"""
+    state = st.session_state.get(state_key)
+    if state is None or state['card_id'] != card_id or state['deck_version'] != card_store.version:
+        state = {'deck_version': card_store.version, 'card_id': card_id, 'answered': None}
+        if make_fields is not None:
+            state.update(make_fields())
+        st.session_state[state_key] = state
+    return state
+
+def pinned_question_card(card_store: CardStore, state_key: str) -> Optional[int]:
+    """답한 뒤 '다음 문제' 전까지 보여 줄 카드 (복습 모드에서 채점으로 큐가 바뀌어도 유지)"""
+    state = st.session_state.get(state_key)
+    if state is None or state['answered'] is None or state['deck_version'] != card_store.version:
+        return None
+    return state['card_id']
+
+def question_footer(stats: LearningStats, answered: bool, current_pos: int, total_cards: int,
+                    review_mode: bool, key_prefix: str) -> Dict[str, str]:
+    """퀴즈/직접 입력 공통: 정답 수, 다음 문제, 섞기, 복습 모드 버튼"""
+    navigation_actions = {}
+    summary = stats.get_stats_summary()
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        st.caption(f"정답 {summary['correct_answers']} / {summary['questions_answered']}문제")
+    with col2:
+        label = "➡️ 다음 문제" if answered else "⏭️ 건너뛰기"
+        if st.button(label, key=f"{key_prefix}_next", use_container_width=True,
+                     disabled=(not review_mode and current_pos >= total_cards - 1)):
+            navigation_actions['action'] = 'next_question'
+    
+    col3, col4 = st.columns(2)
+    with col3:
+        if st.button("🔀 카드 섞기", help="카드 순서를 무작위로 섞습니다", key=f"{key_prefix}_shuffle",
+                     disabled=review_mode):
+            navigation_actions['action'] = 'shuffle'
+    with col4:
+        if review_mode:
+            if st.button("📚 전체 카드로", help="복습 모드를 끝내고 필터된 카드로 돌아갑니다",
+                         key=f"{key_prefix}_exit_review"):
+                navigation_actions['action'] = 'exit_review'
+        elif st.button("🎯 어려운 카드만", help="어려운 카드들을 복습 일정(간격 반복) 순서로 다시 학습",
+                       key=f"{key_prefix}_difficult_only"):
+            navigation_actions['action'] = 'difficult_only'
+    return navigation_actions
+
+@phase_timer.timed()
+def quiz_controls(card_store: CardStore, card_id: int, current_pos: int, total_cards: int,
+                  stats: LearningStats, review_mode: bool = False) -> Dict[str, str]:
+    """객관식 문제를 그리고 고른 답을 채점합니다."""
+    quiz = get_question_state(card_store, card_id, 'quiz', lambda: {
+        'options': get_distractor_index(card_store, card_store.version).options(
+            card_id, card_store.columns['korean_meaning'], QUIZ_OPTION_COUNT
+        ),
+    })
+    meanings = card_store.columns['korean_meaning']
+    chosen = quiz['answered']
+    navigation_actions = {}
+    
+    render_card(card_store, card_id, 'question' if chosen is None else 'answer')
+    
+    for index, option in enumerate(quiz['options']):
+        if chosen is None:
+            if st.button(meanings[option], key=f"quiz_option_{index}", use_container_width=True):
+                quiz['answered'] = option
+                stats.record_answer(card_id, option == card_id)
+                navigation_actions['action'] = 'answered'
+        else:
+            mark = '✅' if option == card_id else '❌' if option == chosen else '▫️'
+            st.button(f"{mark} {meanings[option]}", key=f"quiz_option_{index}",
+                      use_container_width=True, disabled=True)
+    
+    if chosen is not None:
+        if chosen == card_id:
+            st.success("정답입니다! 🎉")
+        else:
+            st.error(f"오답입니다. 정답: {meanings[card_id]}")
+    
+    footer_actions = question_footer(stats, chosen is not None, current_pos, total_cards, review_mode, 'quiz')
+    return footer_actions or navigation_actions
+
+# --- 8-2) 직접 입력 (뜻을 보고 독일어 쓰기, 허용 답안은 적재 시 계산) ---
+@phase_timer.timed()
+def recall_controls(card_store: CardStore, card_id: int, current_pos: int, total_cards: int,
+                    stats: LearningStats, review_mode: bool = False) -> Dict[str, str]:
+    """뜻을 보여 주고 입력한 독일어를 오타 허용 범위 안에서 채점합니다."""
+    recall = get_question_state(card_store, card_id, 'recall')
+    result = recall['answered']
+    navigation_actions = {}
+    
+    render_card(card_store, card_id, 'meaning' if result is None else 'answer')
+    
+    if result is None:
+        with st.form("recall_form", clear_on_submit=True, border=False):
+            typed = st.text_input("독일어로 입력하세요", key="recall_input",
+                                  placeholder="관사/sich는 생략해도 됩니다")
+            submitted = st.form_submit_button("✔️ 확인", use_container_width=True)
+        if submitted and typed.strip():
+            grade = get_recall_index(card_store, card_store.version).grade(card_id, typed)
+            recall['answered'] = {'typed': typed, 'correct': grade.correct, 'distance': grade.distance}
+            stats.record_answer(card_id, grade.correct)
+            navigation_actions['action'] = 'answered'
+    else:
+        german_word = card_store.value(card_id, 'german_word')
+        if result['correct'] and result['distance'] == 0:
+            st.success("정답입니다! 🎉")
+        elif result['correct']:
+            st.success(f"정답입니다! (오타 {result['distance']}개) 입력: {result['typed']} · 정답: {german_word}")
+        else:
+            st.error(f"오답입니다. 입력: {result['typed']} · 정답: {german_word}")
+    
+    footer_actions = question_footer(stats, result is not None, current_pos, total_cards, review_mode, 'recall')
+    return footer_actions or navigation_actions
+
 # --- 9) 향상된 사이드바 ---
-def create_enhanced_sidebar(df: pd.DataFrame, mapping: Dict[str, str], stats: LearningStats, filters: Dict[str, any]):
+@phase_timer.timed()
+def create_enhanced_sidebar(result: FilterResult, stats: LearningStats, filters: Dict[str, any]):
     """향상된 사이드바를 생성합니다."""
     with st.sidebar:
         st.header("📊 학습 대시보드")
@@ -804,7 +1450,7 @@ def create_enhanced_sidebar(df: pd.DataFrame, mapping: Dict[str, str], stats: Le
         # 메트릭 표시
         col1, col2 = st.columns(2)
         with col1:
-            st.metric("총 단어", len(df), help="현재 필터된 총 단어 수")
+            st.metric("총 단어", len(result.card_ids), help="현재 필터된 총 단어 수")
             st.metric("뒤집기", stats_summary['cards_flipped'], help="총 카드 뒤집기 횟수")
         
         with col2:
@@ -820,16 +1466,14 @@ def create_enhanced_sidebar(df: pd.DataFrame, mapping: Dict[str, str], stats: Le
         st.markdown("---")
         
         # 품사별 분포
-        if 'pos' in mapping and len(df) > 0:
+        if result.pos_chart:
             st.subheader("📈 품사별 분포")
-            pos_counts = df[mapping['pos']].value_counts()
-            st.bar_chart(pos_counts)
+            st.markdown(result.pos_chart, unsafe_allow_html=True)
         
         # 테마별 분포
-        if 'theme' in mapping and len(df) > 0:
+        if result.theme_chart:
             st.subheader("🏷️ 테마별 분포")
-            theme_counts = df[mapping['theme']].value_counts()
-            st.bar_chart(theme_counts)
+            st.markdown(result.theme_chart, unsafe_allow_html=True)
         
         st.markdown("---")
         
@@ -837,6 +1481,9 @@ def create_enhanced_sidebar(df: pd.DataFrame, mapping: Dict[str, str], stats: Le
         st.subheader("🔍 적용된 필터")
         active_filters = []
         
+        if filters.get('query'):
+            active_filters.append(f"검색: {filters['query']}")
+        
         if '전체' not in filters['pos'] and filters['pos']:
             active_filters.append(f"품사: {', '.join(filters['pos'])}")
         
@@ -875,75 +1522,180 @@ def create_enhanced_sidebar(df: pd.DataFrame, mapping: Dict[str, str], stats: Le
             5. **예문 활용**: 예문을 통해 실제 사용법을 익히세요
             """)
 
-# --- 10) 메인 애플리케이션 ---
-def main():
-    """메인 애플리케이션 함수"""
-    
-    # 제목 및 소개
-    st.markdown("""
-    <div style='text-align: center; padding: 20px;'>
-        <h1>🇩🇪 German Grammar Flashcard</h1>
-        <p style='font-size: 1.2em; color: #666;'>
-            독일어 C1 TELC 단어장 - 인터랙티브 학습 도구
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # 데이터 로드
-    df = load_data('c1_telc_voca.csv')
-    if df is None:
-        st.error("데이터를 로드할 수 없습니다. CSV 파일이 있는지 확인해주세요.")
-        st.stop()
-    
-    # 세션 상태 초기화
-    if 'app_initialized' not in st.session_state:
-        st.session_state.df, st.session_state.mapping = standardize_columns(df)
-        if st.session_state.df is None:
-            st.stop()
-        
-        st.session_state.show_answer = False
-        st.session_state.app_initialized = True
-    
-    # 통계 객체 초기화
-    stats = LearningStats()
-    
-    # 필터 섹션
-    filters = create_filter_section(st.session_state.df, st.session_state.mapping)
-    
-    # 필터 적용
-    filtered_df = apply_filters(st.session_state.df, st.session_state.mapping, filters)
-    
-    if len(filtered_df) == 0:
-        st.warning("⚠️ 선택한 조건에 맞는 단어가 없습니다. 필터 조건을 조정해주세요.")
+def render_debug_panel() -> None:
+    """단계별 실행 시간 패널 (URL에 ?debug=1 이 있을 때만 표시)"""
+    if st.query_params.get('debug') != '1':
         return
+    with st.sidebar.expander("⏱️ 단계별 실행 시간 (디버그)", expanded=True):
+        if not phase_timer.enabled:
+            st.caption("측정이 꺼져 있습니다. 서버를 WOCA_TIMING=1 환경 변수로 시작하면 측정합니다.")
+            return
+        snapshot = phase_timer.snapshot()
+        if not snapshot:
+            st.caption("아직 측정값이 없습니다.")
+            return
+        st.dataframe([dict(stats, phase=phase) for phase, stats in snapshot.items()],
+                     column_order=('phase', 'count', 'last_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'),
+                     hide_index=True)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.download_button("JSONL", phase_timer.to_jsonl(), file_name="woca_timings.jsonl",
+                               mime="application/jsonl")
+        with col2:
+            st.download_button("Prometheus", phase_timer.to_prometheus(), file_name="woca_timings.prom",
+                               mime="text/plain")
+        with col3:
+            if st.button("초기화", key="reset_phase_timer"):
+                phase_timer.reset()
+                st.rerun()
+
+def render_session_memory_panel() -> None:
+    """세션별 메모리 사용량 패널 (URL에 ?debug=1 이 있을 때만 표시)"""
+    if st.query_params.get('debug') != '1':
+        return
+    with st.sidebar.expander("🧠 세션 메모리 (디버그)"):
+        registry = get_session_registry()
+        summary = registry.summary()
+        st.caption(f"세션 {summary['sessions']}개 · 디스크로 내보냄 {summary['offloaded']}개 · "
+                   f"메모리 {summary['resident_bytes'] / 1024:,.1f} KB · "
+                   f"디스크 {summary['offloaded_bytes'] / 1024:,.1f} KB")
+        st.markdown("**현재 세션 항목별**")
+        st.dataframe([{'item': key, 'bytes': size}
+                      for key, size in state_breakdown(st.session_state.get('learning_stats', {})).items()],
+                     hide_index=True)
+        st.markdown("**전체 세션**")
+        st.dataframe(registry.memory_report(), hide_index=True)
+
+# 단어장 CSV 경로 (벤치마크 등에서 환경 변수로 바꿀 수 있습니다)
+DECK_PATH = os.environ.get('WOCA_DECK_PATH', 'c1_telc_voca.csv')
+
+def record_startup_timings() -> None:
+    """세션의 첫 화면이 그려지기까지의 단계별 시간을 한 번만 기록합니다."""
+    if 'startup_timings' in st.session_state:
+        return
+    timings = {
+        'import_seconds': round(IMPORT_SECONDS, 4),
+        'load_seconds': round(st.session_state.get('load_seconds', 0.0), 4),
+        'first_paint_seconds': round(time.perf_counter() - SCRIPT_START, 4),
+        'pandas_loaded': 'pandas' in sys.modules,
+    }
+    st.session_state.startup_timings = timings
+    logger.info("startup timings: %s", json.dumps(timings))
+
+# --- 9-1) 카드 영역 프래그먼트 (뒤집기/이동 시 이 부분만 다시 실행) ---
+# st.fragment가 없는 구버전 Streamlit에서는 일반 함수로 동작합니다.
+fragment = getattr(st, 'fragment', None) or (lambda func: func)
+
+def rerun_card_area() -> None:
+    """카드 영역 프래그먼트만 다시 실행합니다 (지원하지 않으면 전체 재실행)."""
+    try:
+        st.rerun(scope="fragment")
+    except (TypeError, StreamlitAPIException):
+        st.rerun()
+
+STUDY_WINDOW_SIZE = 50   # 브라우저에 한 번에 보내는 카드 수
+
+def client_study_window(card_store: CardStore, order: np.ndarray, stats: LearningStats) -> Dict[str, str]:
+    """브라우저 측 학습 창을 그리고 일괄 전송된 학습 결과를 반영합니다."""
+    total = len(order)
+    position = st.session_state.current_position
+    start = position - position % STUDY_WINDOW_SIZE
+    card_ids = order[start:start + STUDY_WINDOW_SIZE].tolist()
+    window_id = hashlib.blake2b(
+        repr((card_store.version, st.session_state.last_filter_key, start, card_ids)).encode('utf-8'),
+        digest_size=8
+    ).hexdigest()
+    cards = [
+        {'card_id': card_id,
+         'front': get_card_html(card_store, card_id, 'question'),
+         'back': get_card_html(card_store, card_id, 'answer')}
+        for card_id in card_ids
+    ]
+    batch = study_window(cards, window_id, card_store.version, start, position, total, APP_CSS,
+                         key="study_window")
     
-    # 필터가 변경된 경우 인덱스 재설정
-    filter_key = str(sorted(filters.items()))
-    if 'last_filter_key' not in st.session_state or st.session_state.last_filter_key != filter_key:
-        st.session_state.filtered_indices = list(range(len(filtered_df)))
-        random.shuffle(st.session_state.filtered_indices)
-        st.session_state.current_position = 0
-        st.session_state.last_filter_key = filter_key
-        st.session_state.show_answer = False
-    
-    # 현재 위치 확인 및 조정
-    if 'current_position' not in st.session_state:
-        st.session_state.current_position = 0
-    
-    if st.session_state.current_position >= len(filtered_df):
-        st.session_state.current_position = 0
+    navigation_actions = {}
+    # 컴포넌트 값은 다음 rerun에도 그대로 남으므로 묶음 ID로 한 번만 반영합니다.
+    if batch and batch.get('batch_id') != st.session_state.get('study_window_batch'):
+        st.session_state.study_window_batch = batch.get('batch_id')
+        if batch.get('deck_version') == card_store.version:
+            stats.apply_events(batch.get('events') or [])
+            if batch.get('window_id') == window_id:
+                st.session_state.current_position = min(max(int(batch.get('position', 0)), 0), total - 1)
+                if batch.get('need_window'):
+                    navigation_actions['action'] = 'window'
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("🔀 카드 섞기", help="카드 순서를 무작위로 섞습니다", key="client_shuffle"):
+            navigation_actions['action'] = 'shuffle'
+    with col2:
+        if st.button("🎯 어려운 카드만", help="어려운 카드들을 복습 일정(간격 반복) 순서로 다시 학습",
+                     key="client_difficult_only"):
+            navigation_actions['action'] = 'difficult_only'
+    return navigation_actions
+
+@fragment
+@session_activity()
+@phase_timer.timed()
+def card_study_area(card_store: CardStore, result: FilterResult, filters: Dict[str, any], stats: LearningStats) -> None:
+    """진행률, 네비게이션, 카드를 그리고 버튼 동작을 처리합니다."""
+    deck = get_deck_registry().current(DECK_PATH)
+    if deck is not None and deck.version != card_store.version:
+        # 프래그먼트만 다시 실행하는 중에 덱이 교체됨: 필터/순서까지 새 덱으로 전체 재실행
+        st.rerun()
+    order = get_study_order(card_store, result, filters, st.session_state.shuffle_seed)
+    
+    study_mode = st.radio("학습 방식", STUDY_MODES, key="study_mode", horizontal=True,
+                          label_visibility="collapsed")
+    question_key = QUESTION_STATE_KEYS.get(study_mode)
+    
+    # 현재 카드 데이터 (복습 모드에서는 스케줄러 큐에서 가장 급한 카드)
+    scheduler = stats.get_scheduler()
+    review_mode = st.session_state.get('review_mode', False)
+    review_card_id = scheduler.peek() if review_mode else None
+    if review_mode and question_key:
+        # 답한 문제는 채점으로 복습 큐가 바뀌어도 '다음 문제'까지 그대로 보여 줌
+        pinned_card_id = pinned_question_card(card_store, question_key)
+        if pinned_card_id is not None:
+            review_card_id = pinned_card_id
+    if review_mode and review_card_id is None:
+        st.session_state.review_mode = review_mode = False
+        st.info("지금 복습할 카드가 없습니다. 전체 카드로 돌아갑니다.")
+    
+    if review_mode:
+        current_pos = 0
+        total_cards = max(1, scheduler.due_count())
+        current_card_id = review_card_id
+    else:
+        current_pos = st.session_state.current_position
+        total_cards = len(order)
+        current_card_id = int(order[current_pos])
+    st.session_state.current_card_id = current_card_id
+    st.session_state.current_card_key = card_store.keys[current_card_id]
     
-    # 현재 카드 데이터
-    current_pos = st.session_state.current_position
-    indices = st.session_state.filtered_indices
-    current_row = filtered_df.iloc[indices[current_pos]]
-    st.session_state.current_card_index = indices[current_pos]
+    # 빠른 넘기기: 카드 창을 브라우저에 보내고 뒤집기/이동은 서버 왕복 없이 처리
+    client_mode = st.toggle(
+        "⚡ 빠른 넘기기 (브라우저에서 처리)", key="client_study_mode", disabled=review_mode or bool(question_key),
+        help=f"카드 {STUDY_WINDOW_SIZE}장을 미리 받아 브라우저에서 넘깁니다. 학습 기록은 모아서 전송됩니다."
+    ) and not review_mode and not question_key
     
-    # 진행률 표시
-    render_progress_section(current_pos, len(filtered_df), stats)
+    # 진행률 표시 (빠른 넘기기에서는 전송된 위치를 반영한 뒤 채움)
+    progress_area = st.container()
     
     # 네비게이션 컨트롤
-    nav_actions = create_navigation_controls(current_pos, len(filtered_df), stats)
+    if client_mode:
+        nav_actions = client_study_window(card_store, order, stats)
+        current_pos = st.session_state.current_position
+    elif question_key:
+        st.markdown("---")
+        controls = quiz_controls if study_mode == STUDY_MODE_QUIZ else recall_controls
+        nav_actions = controls(card_store, current_card_id, current_pos, total_cards, stats, review_mode)
+    else:
+        nav_actions = create_navigation_controls(current_pos, total_cards, stats, review_mode)
+    
+    with progress_area:
+        render_progress_section(current_pos, total_cards, stats)
     
     # 네비게이션 액션 처리
     if nav_actions:
@@ -951,39 +1703,62 @@ def main():
         if action == 'first':
             st.session_state.current_position = 0
             st.session_state.show_answer = False
-            st.rerun()
+            rerun_card_area()
         elif action == 'previous':
             st.session_state.current_position = max(0, current_pos - 1)
             st.session_state.show_answer = False
-            st.rerun()
+            rerun_card_area()
         elif action == 'next':
-            st.session_state.current_position = min(len(filtered_df) - 1, current_pos + 1)
+            if review_mode:
+                stats.review_card(current_card_id, GRADE_GOOD)
+            else:
+                st.session_state.current_position = min(len(order) - 1, current_pos + 1)
             st.session_state.show_answer = False
             stats.increment_cards_seen()
-            st.rerun()
+            rerun_card_area()
+        elif action == 'graded':
+            st.session_state.show_answer = False
+            rerun_card_area()
         elif action == 'last':
-            st.session_state.current_position = len(filtered_df) - 1
+            st.session_state.current_position = len(order) - 1
             st.session_state.show_answer = False
-            st.rerun()
+            rerun_card_area()
         elif action == 'flip':
             st.session_state.show_answer = not st.session_state.show_answer
             stats.increment_flips()
-            st.rerun()
+            rerun_card_area()
         elif action == 'shuffle':
-            random.shuffle(st.session_state.filtered_indices)
+            st.session_state.shuffle_seed = random.getrandbits(63)
             st.session_state.current_position = 0
             st.session_state.show_answer = False
-            st.rerun()
+            rerun_card_area()
         elif action == 'difficult_only':
-            difficult_cards = st.session_state.learning_stats['difficult_cards']
-            if difficult_cards:
-                st.session_state.filtered_indices = list(difficult_cards)
-                st.session_state.current_position = 0
+            scheduler.start_review()
+            if scheduler.peek() is not None:
+                st.session_state.review_mode = True
                 st.session_state.show_answer = False
-                st.success(f"어려운 카드 {len(difficult_cards)}개를 표시합니다!")
-                st.rerun()
+                rerun_card_area()
             else:
                 st.info("아직 어려운 카드로 표시된 것이 없습니다.")
+        elif action == 'exit_review':
+            st.session_state.review_mode = False
+            st.session_state.show_answer = False
+            rerun_card_area()
+        elif action == 'window':
+            # 브라우저가 현재 창 밖으로 이동 -> 새 위치의 카드 창을 보냄
+            rerun_card_area()
+        elif action == 'answered':
+            rerun_card_area()
+        elif action == 'next_question':
+            if not review_mode:
+                st.session_state.current_position = min(len(order) - 1, current_pos + 1)
+            st.session_state[question_key] = None
+            stats.increment_cards_seen()
+            rerun_card_area()
+    
+    if client_mode or question_key:
+        # 카드는 브라우저 학습 창 / 퀴즈·직접 입력 영역이 그립니다.
+        return
     
     st.markdown("---")
     
@@ -994,23 +1769,194 @@ def main():
     if 'show_answer' not in st.session_state:
         st.session_state.show_answer = False
     
-    if st.session_state.show_answer:
-        render_answer_card(current_row, st.session_state.mapping)
-        card_id = "answer"
-    else:
-        render_question_card(current_row, st.session_state.mapping)
-        card_id = "question"
+    face = "answer" if st.session_state.show_answer else "question"
+    render_card(card_store, current_card_id, face)
     
     # 클릭 오버레이 - 개선된 버전
     # 카드 전체 클릭(투명 버튼)으로 뒤집기
     if create_card_click_area():
         st.session_state.show_answer = not st.session_state.show_answer
         stats.increment_flips()
-        st.rerun()
+        rerun_card_area()
 
     
     st.markdown('</div>', unsafe_allow_html=True)
     
+
+# --- 9-2) 카드 내보내기 (청크 단위로 파일에 쓰고, 정적 파일 서빙이 켜져 있으면 디스크에서 바로 내려받음) ---
+# static/ 아래 파일은 server.enableStaticServing이 켜져 있으면 app/static/... 경로로 나눠서 전송됩니다.
+EXPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'exports')
+EXPORT_URL_PREFIX = 'app/static/exports'
+EXPORT_KEEP_SECONDS = float(os.environ.get('WOCA_EXPORT_KEEP_SECONDS', '3600'))
+EXPORT_FIELDS = ('german_word', 'korean_meaning', 'german_example', 'ko_example_translation', 'pos', 'theme')
+EXPORT_FORMAT_LABELS = {'anki': "Anki (TSV)", 'csv': "CSV", 'jsonl': "JSON Lines"}
+EXPORT_SCOPE_FILTERED = "현재 필터 결과"
+EXPORT_SCOPE_DIFFICULT = "어려운 카드"
+
+def cleanup_exports(now: Optional[float] = None) -> None:
+    """EXPORT_KEEP_SECONDS보다 오래된 내보내기 파일을 지웁니다."""
+    now = time.time() if now is None else now
+    try:
+        entries = list(os.scandir(EXPORT_DIR))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if now - entry.stat().st_mtime > EXPORT_KEEP_SECONDS:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        except OSError:
+            pass
+
+def create_export(card_store: CardStore, card_ids: np.ndarray, fmt: str, stats: LearningStats,
+                  with_progress: bool, with_grammar: bool) -> Dict[str, any]:
+    """선택한 카드를 청크 단위로 파일에 씁니다 (전체 출력을 메모리에 만들지 않음)."""
+    cleanup_exports()
+    extension, mime = EXPORT_FORMATS[fmt]
+    # 내려받기 URL을 추측할 수 없도록 임의 이름의 폴더에 저장
+    token = uuid.uuid4().hex
+    file_name = f"woca_{datetime.now():%Y%m%d_%H%M%S}.{extension}"
+    os.makedirs(os.path.join(EXPORT_DIR, token), exist_ok=True)
+    path = os.path.join(EXPORT_DIR, token, file_name)
+    chunks = iter_export(
+        fmt, card_store.columns, card_ids, [field for field in EXPORT_FIELDS if field in card_store.fields],
+        progress=stats.card_progress if with_progress else None,
+        grammar=(lambda card_id: grammar_notes_text(card_store.get(card_id))) if with_grammar else None,
+    )
+    size = write_export(chunks, path)
+    return {'path': path, 'url': f"{EXPORT_URL_PREFIX}/{token}/{file_name}", 'file_name': file_name,
+            'mime': mime, 'rows': len(card_ids), 'bytes': size}
+
+def read_export(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+@fragment
+def render_export_panel(card_store: CardStore, result: FilterResult, stats: LearningStats) -> None:
+    """현재 필터 결과나 어려운 카드를 Anki/CSV/JSON Lines로 내보냅니다."""
+    with st.expander("📤 카드 내보내기"):
+        scope = st.radio("내보낼 카드", (EXPORT_SCOPE_FILTERED, EXPORT_SCOPE_DIFFICULT),
+                         key="export_scope", horizontal=True)
+        fmt = st.selectbox("형식", tuple(EXPORT_FORMAT_LABELS), format_func=EXPORT_FORMAT_LABELS.get,
+                           key="export_format")
+        with_progress = st.checkbox("학습 진행 상황 포함", key="export_progress",
+                                    help="상태(어려움/외움)와 복습 일정(ease, 간격, 예정 시각)")
+        with_grammar = st.checkbox("문법 주석 포함", key="export_grammar",
+                                   help="격 지배, 전치사, 재귀동사 설명")
+        if scope == EXPORT_SCOPE_FILTERED:
+            card_ids = result.card_ids
+        else:
+            card_ids = st.session_state.learning_stats['difficult_cards'].to_array()
+        st.caption(f"{len(card_ids):,}개 카드")
+        
+        if st.button("📦 파일 만들기", key="export_create", disabled=len(card_ids) == 0,
+                     use_container_width=True):
+            try:
+                st.session_state.export_file = create_export(card_store, card_ids, fmt, stats,
+                                                             with_progress, with_grammar)
+            except OSError as e:
+                st.session_state.export_file = None
+                st.error(f"내보내기 파일을 쓸 수 없습니다: {e}")
+        
+        export_file = st.session_state.get('export_file')
+        if not export_file or not os.path.exists(export_file['path']):
+            return
+        st.caption(f"{export_file['file_name']} · {export_file['rows']:,}개 · "
+                   f"{export_file['bytes'] / 1024:,.1f} KB")
+        if st.get_option('server.enableStaticServing'):
+            # 정적 파일 서빙은 디스크에서 나눠 보내므로 파일 크기만큼 서버 메모리를 쓰지 않습니다.
+            st.markdown(f'<a href="{export_file["url"]}" download="{export_file["file_name"]}">⬇️ 내려받기</a>',
+                        unsafe_allow_html=True)
+        else:
+            # 누를 때만 파일을 읽어 전송 (화면을 그릴 때마다 메모리에 올리지 않음)
+            st.download_button("⬇️ 내려받기", data=lambda: read_export(export_file['path']),
+                               file_name=export_file['file_name'], mime=export_file['mime'],
+                               key="export_download", use_container_width=True)
+
+# --- 10) 메인 애플리케이션 ---
+def main():
+    """메인 애플리케이션 함수"""
+    
+    # 제목 및 소개
+    st.markdown("""
+    <div style='text-align: center; padding: 20px;'>
+        <h1>🇩🇪 German Grammar Flashcard</h1>
+        <p style='font-size: 1.2em; color: #666;'>
+            독일어 C1 TELC 단어장 - 인터랙티브 학습 도구
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # 덱 로드 (프로세스 공용: 처음 한 번만 적재, 유효한 스냅샷이 있으면 CSV 파싱 생략)
+    registry = get_deck_registry()
+    deck = registry.current(DECK_PATH)
+    if deck is None:
+        load_start = time.perf_counter()
+        progress_bar = st.progress(0.0, text="📥 단어장을 불러오는 중...")
+        deck = registry.load(
+            DECK_PATH,
+            on_progress=lambda fraction, rows: progress_bar.progress(
+                fraction, text=f"📥 단어장을 불러오는 중... {rows:,}개"
+            )
+        )
+        progress_bar.empty()
+        if deck is None:
+            st.error("데이터를 로드할 수 없습니다. CSV 파일이 있는지 확인해주세요.")
+            st.stop()
+        st.session_state.load_seconds = time.perf_counter() - load_start
+    
+    # 세션에는 덱 버전만 보관합니다.
+    if st.session_state.get('deck_version') != deck.version:
+        if 'deck_version' in st.session_state:
+            st.toast("📚 단어장이 업데이트되었습니다.")
+        st.session_state.deck_version = deck.version
+        st.session_state.show_answer = False
+    card_store = deck.store
+    
+    # 통계 객체 초기화
+    stats = LearningStats(card_store)
+    
+    # 필터 섹션
+    filters = create_filter_section(deck.filter_index)
+    
+    # 필터 적용
+    filter_result = get_filtered_cards(
+        deck.filter_index, deck.version, filters,
+        get_search_index(card_store, card_store.version)
+    )
+    filtered_ids = filter_result.card_ids
+    
+    if len(filtered_ids) == 0:
+        st.warning("⚠️ 선택한 조건에 맞는 단어가 없습니다. 필터 조건을 조정해주세요.")
+        if filters['query']:
+            render_search_suggestions(card_store, filters['query'])
+        return
+    
+    # 학습 순서 (세션에는 시드만 보관)
+    if 'shuffle_seed' not in st.session_state:
+        st.session_state.shuffle_seed = random.getrandbits(63)
+    order = get_study_order(card_store, filter_result, filters, st.session_state.shuffle_seed)
+    
+    # 필터나 덱이 바뀐 경우: 보던 카드가 새 순서에 있으면 그 위치에서 계속, 없으면 처음부터
+    filter_key = (deck.version,) + normalize_filter_key(filters)
+    if st.session_state.get('last_filter_key') != filter_key:
+        current_card_id = card_store.key_index.get(st.session_state.get('current_card_key'))
+        position = locate_card(order, current_card_id)
+        if position is None:
+            position = 0
+            st.session_state.show_answer = False
+        st.session_state.current_position = position
+        st.session_state.last_filter_key = filter_key
+    
+    # 현재 위치 확인 및 조정
+    if 'current_position' not in st.session_state:
+        st.session_state.current_position = 0
+    
+    if st.session_state.current_position >= len(order):
+        st.session_state.current_position = 0
+    
+    # 진행률/네비게이션/카드 (프래그먼트: 카드 조작은 사이드바와 필터를 다시 실행하지 않음)
+    card_study_area(card_store, filter_result, filters, stats)
+    
     # 키보드 단축키 안내
     st.markdown("""
     <div style='background: #f8f9fa; padding: 15px; border-radius: 10px; margin: 20px 0; text-align: center;'>
@@ -1020,7 +1966,18 @@ def main():
     """, unsafe_allow_html=True)
     
     # 향상된 사이드바
-    create_enhanced_sidebar(filtered_df, st.session_state.mapping, stats, filters)
+    create_enhanced_sidebar(filter_result, stats, filters)
+    with st.sidebar:
+        render_export_panel(card_store, filter_result, stats)
+    render_debug_panel()
+    render_session_memory_panel()
+    record_startup_timings()
 
 if __name__ == "__main__":
-    main()
+    try:
+        with phase_timer.phase('rerun'), session_activity():
+            main()
+    finally:
+        # st.rerun()/st.stop()은 제어 흐름 예외로 빠져나오므로 그 rerun도 내보내기에 포함
+        if phase_timer.enabled and TIMING_EXPORT_PATH:
+            phase_timer.export_if_due(TIMING_EXPORT_PATH)